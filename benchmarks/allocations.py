@@ -0,0 +1,46 @@
+"""
+Count the Values Interpreter creates per loop iteration, and time it, on
+the programs of benchmarks.closure_compiler.
+
+    python -m benchmarks.allocations [--iterations N]
+"""
+
+import argparse
+
+from benchmarks.closure_compiler import PROGRAMS, run_interpreter, timed
+from interpreter.error_handler import ErrorHandler
+from interpreter.interpreter import Value
+from interpreter.lexer import Lexer
+from interpreter.parser import Parser
+from interpreter.reader.memory_reader import BytesReader
+
+
+def values_created(function, *args) -> int:
+    created = 0
+    init = Value.__init__
+
+    def counting_init(self, *fields):
+        nonlocal created
+        created += 1
+        init(self, *fields)
+
+    Value.__init__ = counting_init
+    try:
+        function(*args)
+    finally:
+        Value.__init__ = init
+    return created
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--iterations", type=int, default=100_000)
+    args = parser.parse_args()
+
+    for name, source in PROGRAMS.items():
+        error_handler = ErrorHandler()
+        lexer = Lexer(BytesReader(source % args.iterations), error_handler)
+        program = Parser(lexer, error_handler).parse()
+        values = values_created(run_interpreter, program) / args.iterations
+        elapsed = timed(run_interpreter, program)
+        print(f"{name:12} values/iteration {values:6.2f}  {elapsed:6.2f}s")
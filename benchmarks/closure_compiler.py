@@ -0,0 +1,58 @@
+"""
+Time ClosureCompiler against Interpreter on a few loop and call heavy
+programs.
+
+    python -m benchmarks.closure_compiler [--iterations N]
+"""
+
+import argparse
+import time
+
+from interpreter.error_handler import ErrorHandler
+from interpreter.interpreter.closure_compiler import ClosureCompiler
+from interpreter.interpreter.interpreter import Interpreter
+from interpreter.lexer import Lexer
+from interpreter.parser import Parser
+from interpreter.reader.memory_reader import BytesReader
+
+PROGRAMS = {
+    "arithmetic": b"let mut i = 0; let mut s = 0;"
+    b"while i < %d { s = s + i * 2 %% 7; i = i + 1; }",
+    "conditions": b"let mut i = 0; let mut e = 0;"
+    b"while i < %d { if i %% 2 == 0 and not (i < 10) { e = e + 1; } i = i + 1; }",
+    "calls": b"fn add(a, b) { return a + b; } let mut i = 0;"
+    b"while i < %d { i = add(i, 1); }",
+}
+
+
+def run_interpreter(program) -> None:
+    interpreter = Interpreter(ErrorHandler())
+    for statement in program.statements:
+        interpreter.execute(statement)
+
+
+def run_closures(program) -> None:
+    ClosureCompiler(ErrorHandler()).run(program)
+
+
+def timed(function, *args) -> float:
+    start = time.perf_counter()
+    function(*args)
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--iterations", type=int, default=100_000)
+    args = parser.parse_args()
+
+    for name, source in PROGRAMS.items():
+        error_handler = ErrorHandler()
+        lexer = Lexer(BytesReader(source % args.iterations), error_handler)
+        program = Parser(lexer, error_handler).parse()
+        interpreted = timed(run_interpreter, program)
+        compiled = timed(run_closures, program)
+        print(
+            f"{name:12} interpreter {interpreted:6.2f}s  closures {compiled:6.2f}s"
+            f"  x{interpreted / compiled:.2f}"
+        )
@@ -0,0 +1,56 @@
+"""
+Time tokenize_parallel against tokenize_all on a generated source, for an
+increasing number of worker processes.
+
+    python -m benchmarks.parallel_lexing [--statements N]
+"""
+
+import argparse
+import os
+import time
+
+from interpreter.lexer.parallel import tokenize_parallel
+from interpreter.lexer.token_buffer import tokenize_all
+from interpreter.reader.memory_reader import BytesReader
+
+STATEMENT = (
+    b"fn f_%d(n) { if n < 10 { return 'small; one'; } return n * 2.5; }\n"
+    b"let x_%d = f_%d(%d); // sets x }\n"
+)
+
+
+def generate(statements: int) -> bytes:
+    return b"".join(STATEMENT % (i, i, i, i) for i in range(statements))
+
+
+def timed(function, *args, **kwargs):
+    start = time.perf_counter()
+    result = function(*args, **kwargs)
+    return time.perf_counter() - start, result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--statements", type=int, default=100_000)
+    args = parser.parse_args()
+
+    source = generate(args.statements)
+    sequential, expected = timed(tokenize_all, BytesReader(source))
+    print(f"{len(source) / 2**20:.1f} MiB, {len(expected)} tokens")
+    print(f"sequential   {sequential:6.2f}s")
+
+    workers = 1
+    cpus = os.cpu_count() or 1
+    while True:
+        chunk_size = max(len(source) // (workers * 4), 1)
+        elapsed, buffer = timed(
+            tokenize_parallel,
+            BytesReader(source),
+            workers=workers,
+            chunk_size=chunk_size,
+        )
+        assert buffer.types == expected.types and buffer.offsets == expected.offsets
+        print(f"{workers:3} workers  {elapsed:6.2f}s  x{sequential / elapsed:.2f}")
+        if workers >= cpus:
+            break
+        workers = min(workers * 2, cpus)
@@ -0,0 +1,42 @@
+"""
+Time VirtualMachine against Interpreter and ClosureCompiler on the programs
+of benchmarks.closure_compiler.
+
+    python -m benchmarks.vm [--iterations N]
+"""
+
+import argparse
+
+from benchmarks.closure_compiler import (
+    PROGRAMS,
+    run_interpreter,
+    run_closures,
+    timed,
+)
+from interpreter.compiler import VirtualMachine
+from interpreter.error_handler import ErrorHandler
+from interpreter.lexer import Lexer
+from interpreter.parser import Parser
+from interpreter.reader.memory_reader import BytesReader
+
+
+def run_vm(program) -> None:
+    VirtualMachine(ErrorHandler()).run(program)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--iterations", type=int, default=100_000)
+    args = parser.parse_args()
+
+    for name, source in PROGRAMS.items():
+        error_handler = ErrorHandler()
+        lexer = Lexer(BytesReader(source % args.iterations), error_handler)
+        program = Parser(lexer, error_handler).parse()
+        interpreted = timed(run_interpreter, program)
+        compiled = timed(run_closures, program)
+        vm = timed(run_vm, program)
+        print(
+            f"{name:12} interpreter {interpreted:6.2f}s  closures {compiled:6.2f}s"
+            f"  vm {vm:6.2f}s  x{interpreted / vm:.2f}"
+        )
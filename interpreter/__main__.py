@@ -2,45 +2,146 @@ import argparse
 import sys
 from pathlib import Path
 
-from interpreter.comments_filter import CommentsFilter
+from interpreter.compiler import VirtualMachine
 from interpreter.error_formatter import ErrorFormatter
 from interpreter.error_handler import ErrorHandler, CriticalError
+from interpreter.interpreter.closure_compiler import ClosureCompiler
 from interpreter.interpreter.interpreter import Interpreter
-from interpreter.lexer import Lexer
+from interpreter.lexer import (
+    Lexer,
+    RegexLexer,
+    TokenBufferLexer,
+    tokenize_all,
+    tokenize_parallel,
+)
 from interpreter.parser import Parser
-from interpreter.reader import Reader
+from interpreter.program.cache import ProgramCache
+from interpreter.reader import Reader, MmapReader, StreamReader
+
+STDIN = "-"
+# comments are skipped by the lexers, the parser never needs them
+LEXERS = {
+    "char": lambda reader, error_handler: Lexer(
+        reader, error_handler, skip_comments=True
+    ),
+    "regex": lambda reader, error_handler: RegexLexer(
+        reader, error_handler, skip_comments=True
+    ),
+    "buffer": lambda reader, error_handler: TokenBufferLexer(
+        tokenize_all(reader, skip_comments=True), error_handler
+    ),
+    "parallel": lambda reader, error_handler: TokenBufferLexer(
+        tokenize_parallel(reader, skip_comments=True), error_handler
+    ),
+}
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser()
-    parser.add_argument("filename")
+    parser.add_argument("filename", help=f'source file, "{STDIN}" to read stdin')
+    parser.add_argument(
+        "--mmap", action="store_true", help="memory-map the source file"
+    )
+    parser.add_argument(
+        "--lexer",
+        choices=LEXERS,
+        default="char",
+        help="lexer engine, regex scans the whole source at once, buffer also "
+        "keeps its tokens in compact arrays, parallel lexes chunks of a large "
+        "source in worker processes",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="always parse the source, without loading or storing its parsed "
+        "program in __icache__",
+    )
+    parser.add_argument(
+        "--lazy",
+        action="store_true",
+        help="parse a function body on its first call, its syntax errors are "
+        "only reported then",
+    )
+    parser.add_argument(
+        "--check",
+        action="store_true",
+        help="report every syntax error of the source without running it",
+    )
+    backends = parser.add_mutually_exclusive_group()
+    backends.add_argument(
+        "--closures",
+        action="store_true",
+        help="compile each statement into Python closures before running it "
+        "instead of walking its syntax tree",
+    )
+    backends.add_argument(
+        "--vm",
+        action="store_true",
+        help="compile each statement to bytecode run by a stack-based virtual "
+        "machine instead of walking its syntax tree",
+    )
     if len(sys.argv) == 1:
         print("Usage: python -m interpreter <source>")
         sys.exit(1)
     args = parser.parse_args()
+    lazy = args.lazy and not args.check
 
-    path = Path(args.filename)
-    if not path.is_file():
-        print(f"Unable to resolve the path: {args.filename}")
-        exit(0)
+    cache = None
+    if args.filename == STDIN:
+        reader = StreamReader(sys.stdin.buffer)
+    else:
+        path = Path(args.filename)
+        if not path.is_file():
+            print(f"Unable to resolve the path: {args.filename}")
+            exit(0)
+        reader_cls = MmapReader if args.mmap else Reader
+        reader = reader_cls(f"{path}")
+        if not args.no_cache:
+            cache = ProgramCache(path, lazy=lazy)
 
-    with Reader(f"{path}") as reader:
+    with reader:
         error_handler = ErrorHandler()
         error_formatter = ErrorFormatter(reader)
 
-        lexer = Lexer(reader, error_handler)
-        parser = Parser(CommentsFilter(lexer), error_handler)
-        program = parser.parse()
+        program = cache.load() if cache is not None else None
+        if program is not None:
+            statements = program.statements
+        elif args.filename == STDIN and not args.check:
+            # run every statement as soon as it has been parsed
+            lexer = LEXERS[args.lexer](reader, error_handler)
+            statements = Parser(lexer, error_handler, lazy).iter_statements()
+        else:
+            lexer = LEXERS[args.lexer](reader, error_handler)
+            program = Parser(lexer, error_handler, lazy).parse()
+            if cache is not None and len(error_handler.errors) == 0:
+                cache.store(program)
+            statements = program.statements
 
-        if len(error_handler.errors) > 0:
+        if args.check:
             for error in error_handler.errors:
-                msg = error_formatter.get_error_msg(error)
-                print(msg)
-                exit(0)
+                print(error_formatter.get_error_msg(error))
+            exit(1 if error_handler.errors else 0)
 
-        interpreter = Interpreter(error_handler)
+        if args.closures:
+            execute = ClosureCompiler(error_handler).execute
+        elif args.vm:
+            execute = VirtualMachine(error_handler).execute
+        else:
+            execute = Interpreter(error_handler).execute
         try:
-            program.accept(interpreter)
+            for statement in statements:
+                if len(error_handler.errors) > 0:
+                    break
+                execute(statement)
         except CriticalError as error:
+            # syntax errors of a lazily parsed function body come first
+            for syntax_error in error_handler.errors:
+                print(error_formatter.get_error_msg(syntax_error))
             msg = error_formatter.get_error_msg(error)
             print(msg)
             exit(0)
+
+        if len(error_handler.errors) > 0:
+            for error in error_handler.errors:
+                msg = error_formatter.get_error_msg(error)
+                print(msg)
+            exit(0)
@@ -3,16 +3,20 @@ from typing import Optional
 from interpreter.lexer import ILexer
 from interpreter.token import Token, TokenType
 
+COMMENT_TYPES = frozenset((TokenType.MULTILINE_COMMENT, TokenType.ONE_LINE_COMMENT))
+
 
 class CommentsFilter(ILexer):
+    """
+    Drops the comment tokens of a lexer. Lexers built with skip_comments do
+    not produce any in the first place, which saves reading their text.
+    """
+
     def __init__(self, lexer: ILexer):
         self._lexer = lexer
 
     def next_token(self) -> Optional[Token]:
         token = self._lexer.next_token()
-        while token.token_type in [
-            TokenType.MULTILINE_COMMENT,
-            TokenType.ONE_LINE_COMMENT,
-        ]:
+        while token is not None and token.token_type in COMMENT_TYPES:
             token = self._lexer.next_token()
         return token
@@ -0,0 +1,3 @@
+from interpreter.compiler.code import Code, FunctionCode, BytecodeFunction
+from interpreter.compiler.compiler import Compiler
+from interpreter.compiler.vm import VirtualMachine
@@ -0,0 +1,119 @@
+from bisect import bisect_right
+from dataclasses import dataclass, field
+from typing import Any, List, Optional
+
+from interpreter.compiler.opcodes import (
+    OPCODE_NAMES,
+    LOAD_CONST,
+    LOAD_NAME,
+    CHECK_ASSIGNABLE,
+    STORE_NAME,
+    LOAD_FUNCTION,
+    CHECK_UNDEFINED,
+    DEFINE_NAME,
+    MAKE_FUNCTION,
+    MATCH,
+)
+from interpreter.interpreter import Param, Function, Value
+from interpreter.interpreter.cases import Predicate
+from interpreter.position import Position
+from interpreter.program import Block, LazyBlock
+
+# opcodes whose argument indexes the names or the constants
+NAME_OPCODES = {LOAD_NAME, CHECK_ASSIGNABLE, STORE_NAME}
+SHIFTED_NAME_OPCODES = {CHECK_UNDEFINED, DEFINE_NAME}
+CONSTANT_OPCODES = {LOAD_CONST, LOAD_FUNCTION, MAKE_FUNCTION, MATCH}
+
+
+@dataclass(slots=True)
+class Code:
+    """
+    Bytecode of a statement or a function body.
+
+    Instructions take two entries, an opcode and its argument. Positions are
+    only recorded for the instructions that may fail, as the offsets they
+    start at, and looked up when they do.
+    """
+
+    name: str
+    instructions: List[int] = field(default_factory=list)
+    constants: List[Any] = field(default_factory=list)
+    names: List[str] = field(default_factory=list)
+    position_offsets: List[int] = field(default_factory=list)
+    positions: List[Position] = field(default_factory=list)
+
+    def position(self, offset: int) -> Optional[Position]:
+        """
+        :return: source position of the instruction at offset
+        """
+        index = bisect_right(self.position_offsets, offset) - 1
+        return self.positions[index] if index >= 0 else None
+
+    def disassemble(self) -> str:
+        lines = []
+        for offset in range(0, len(self.instructions), 2):
+            opcode, arg = self.instructions[offset : offset + 2]
+            line = f"{offset:4} {OPCODE_NAMES[opcode]:20} {arg}"
+            if opcode in NAME_OPCODES:
+                line += f" ({self.names[arg]})"
+            elif opcode in SHIFTED_NAME_OPCODES:
+                line += f" ({self.names[arg >> 1]})"
+            elif opcode in CONSTANT_OPCODES:
+                constant = self.constants[arg]
+                if isinstance(constant, Value):
+                    constant = constant.value
+                line += f" ({constant!r})"
+            lines.append(line)
+        return "\n".join(lines)
+
+
+@dataclass(slots=True)
+class FunctionCode:
+    """
+    Function definition, its body compiled on the first call when it was
+    parsed lazily.
+    """
+
+    name: str
+    params: List[Param]
+    body: Block | LazyBlock
+    code: Optional[Code] = None
+
+    def __repr__(self) -> str:
+        return f"<function {self.name}>"
+
+
+class BytecodeFunction(Function):
+    def __init__(self, function_code: FunctionCode):
+        super().__init__(function_code.name, function_code.params, function_code.body)
+        self.function_code = function_code
+
+
+@dataclass(slots=True)
+class CallSite:
+    name: str
+    argc: int
+    r_position: Position
+
+    def __repr__(self) -> str:
+        return f"<call {self.name}/{self.argc}>"
+
+
+@dataclass(slots=True)
+class Case:
+    matches: Predicate
+    params: List[Param]
+    target: int
+    position: Position
+
+
+@dataclass(slots=True)
+class MatchSite:
+    argc: int
+    cases: List[Case]
+    default_params: Optional[List[Param]]
+    default_target: int
+
+    def __repr__(self) -> str:
+        targets = [case.target for case in self.cases] + [self.default_target]
+        return f"<match {targets}>"
@@ -0,0 +1,458 @@
+from typing import Any, Callable, Dict, List, Optional
+
+from interpreter.compiler.code import (
+    Code,
+    FunctionCode,
+    CallSite,
+    Case,
+    MatchSite,
+)
+from interpreter.compiler.opcodes import (
+    LOAD_CONST,
+    LOAD_NAME,
+    BINARY_OP,
+    COMPARE_OP,
+    CHECK_ASSIGNABLE,
+    STORE_NAME,
+    POP_JUMP_IF_FALSE,
+    JUMP,
+    LOAD_FUNCTION,
+    CALL,
+    RETURN_VALUE,
+    POP_TOP,
+    JUMP_IF_TRUE_OR_POP,
+    JUMP_IF_FALSE_OR_POP,
+    CHECK_BOOL,
+    NOT,
+    NEGATE,
+    CHECK_UNDEFINED,
+    DEFINE_NAME,
+    MAKE_FUNCTION,
+    MATCH,
+    POP_JUMP_IF_TRUE,
+    SET_FLAGS,
+    CLEAR_FLAGS,
+    JUMP_IF_UNWINDING,
+    JUMP_IF_BREAK,
+    END,
+    MISSING,
+)
+from interpreter.error_handler import ErrorHandler
+from interpreter.interpreter import Param, Value
+from interpreter.interpreter.cases import case_predicate
+from interpreter.position import Position
+from interpreter.program import (
+    IdentifierExpression,
+    Literal,
+    FunctionCallStatement,
+    FunctionDefinitionStatement,
+    MatchStatement,
+    LoopStatement,
+    ConditionalStatement,
+    Assignment,
+    Block,
+    LazyBlock,
+    NegatedFactor,
+    MultiplicativeExpression,
+    AdditiveExpression,
+    RelationalExpression,
+    AndExpression,
+    OrExpression,
+    VarDefinition,
+    CaseStatement,
+    CaseDefaultStatement,
+    ReturnStatement,
+    RelationalOperator,
+    AdditiveOperator,
+    MultiplicativeOperator,
+    UnaryOperator,
+    Statement,
+    Parameter,
+)
+from interpreter.program.program import Program
+from interpreter.program.statement import BreakStatement, ContinueStatement
+
+# arguments of BINARY_OP and COMPARE_OP, indexes of the operations the VM runs
+BINARY_OPERATORS = {
+    AdditiveOperator.ADDITION: 0,
+    AdditiveOperator.SUBTRACTION: 1,
+    MultiplicativeOperator.MULTIPLICATION: 2,
+    MultiplicativeOperator.DIVISION: 3,
+    MultiplicativeOperator.MODULO: 4,
+}
+# the operations from this one on fail on a zero divisor
+DIVIDE = BINARY_OPERATORS[MultiplicativeOperator.DIVISION]
+COMPARISONS = {
+    RelationalOperator.LESS: 0,
+    RelationalOperator.LESS_OR_EQ: 1,
+    RelationalOperator.EQ: 2,
+    RelationalOperator.NOT_EQ: 3,
+    RelationalOperator.GREATER: 4,
+    RelationalOperator.GREATER_OR_EQ: 5,
+}
+# arguments of SET_FLAGS and CLEAR_FLAGS, the return, break and continue
+# flags of Interpreter
+RETURN = 1
+BREAK = 2
+CONTINUE = 4
+
+
+class _Assembler:
+    """
+    Code under construction, with the constants and names it already holds.
+    """
+
+    def __init__(self, name: str):
+        self.code = Code(name)
+        self._constants: Dict[Any, int] = {}
+        self._names: Dict[str, int] = {}
+
+    def emit(self, opcode: int, arg: int = 0, position: Position = None) -> int:
+        """
+        :param position: where the instruction fails, if it may
+        :return: offset of the instruction
+        """
+        code = self.code
+        offset = len(code.instructions)
+        if position is not None and (
+            not code.positions or code.positions[-1] != position
+        ):
+            code.position_offsets.append(offset)
+            code.positions.append(position)
+        code.instructions.append(opcode)
+        code.instructions.append(arg)
+        return offset
+
+    def patch(self, offset: int, target: Optional[int] = None) -> None:
+        """
+        Point the jump at offset to target, the next instruction by default.
+        """
+        if target is None:
+            target = self.offset
+        self.code.instructions[offset + 1] = target
+
+    @property
+    def offset(self) -> int:
+        return len(self.code.instructions)
+
+    def constant(self, value: Any, key: Any = None) -> int:
+        """
+        :param key: identifies the values equal to value, which are stored
+            once, value itself is always added when there is none
+        """
+        if key is not None and key in self._constants:
+            return self._constants[key]
+        index = len(self.code.constants)
+        self.code.constants.append(value)
+        if key is not None:
+            self._constants[key] = index
+        return index
+
+    def name(self, name: str) -> int:
+        index = self._names.get(name)
+        if index is None:
+            index = self._names[name] = len(self.code.names)
+            self.code.names.append(name)
+        return index
+
+
+class Compiler:
+    """
+    Lowers statements to the bytecode the VirtualMachine runs, which behaves
+    as Interpreter does.
+
+    Return, break and continue set flags, a block skips its statements
+    while one is set and a loop stops on the break flag, which is only
+    cleared by the next loop. The else block runs whatever the condition,
+    unless a flag is set, and a call results in the last value its body
+    computed.
+    """
+
+    def __init__(self, error_handler: ErrorHandler):
+        """
+        :param error_handler: the case predicates of match statements raise
+            their errors through it
+        """
+        self._error_handler = error_handler
+        self._assembler: Optional[_Assembler] = None
+        self._compilers: Dict[type, Callable[[Any], None]] = {
+            IdentifierExpression: self._compile_identifier_expression,
+            Literal: self._compile_literal,
+            OrExpression: self._compile_or_expression,
+            AndExpression: self._compile_and_expression,
+            RelationalExpression: self._compile_relational_expression,
+            AdditiveExpression: self._compile_binary_expression,
+            MultiplicativeExpression: self._compile_binary_expression,
+            NegatedFactor: self._compile_negated_expression,
+            Block: self._compile_block,
+            ConditionalStatement: self._compile_conditional_statement,
+            LoopStatement: self._compile_loop_statement,
+            MatchStatement: self._compile_match_statement,
+            FunctionDefinitionStatement: self._compile_function_definition,
+            FunctionCallStatement: self._compile_function_call,
+            ReturnStatement: self._compile_return_statement,
+            ContinueStatement: self._compile_continue_statement,
+            BreakStatement: self._compile_break_statement,
+            VarDefinition: self._compile_var_definition,
+            Assignment: self._compile_assignment,
+        }
+
+    def compile_program(self, program: Program) -> Code:
+        return self._compile_code("<program>", program.statements)
+
+    def compile_statement(self, statement: Statement) -> Code:
+        return self._compile_code("<statement>", [statement])
+
+    def compile_function(self, function_code: FunctionCode) -> Code:
+        """
+        :param function_code: function whose body has been parsed
+        """
+        code = self._compile_code(function_code.name, [function_code.body])
+        function_code.code = code
+        return code
+
+    def _compile_code(self, name: str, statements: List[Statement]) -> Code:
+        enclosing = self._assembler
+        self._assembler = _Assembler(name)
+        try:
+            # the flags do not stop statements of the top level
+            for statement in statements:
+                self._compile_statement(statement)
+            self._assembler.emit(END)
+            return self._assembler.code
+        finally:
+            self._assembler = enclosing
+
+    def _compile(self, node: Statement) -> None:
+        if node is None:
+            # like Interpreter, an expression left out by "return;" or "--1"
+            # only fails once it is evaluated
+            self._assembler.emit(MISSING)
+            return
+        self._compilers[type(node)](node)
+
+    def _compile_statement(self, statement: Statement) -> None:
+        self._compile(statement)
+        if type(statement) is FunctionCallStatement:
+            # the result of a call made for its effects is only the last value
+            self._assembler.emit(POP_TOP)
+
+    def _compile_identifier_expression(self, expression: IdentifierExpression):
+        name = self._assembler.name(expression.name)
+        self._assembler.emit(LOAD_NAME, name, expression.position)
+
+    def _compile_literal(self, expression: Literal):
+        value = Value.from_literal(expression)
+        key = (value.type, type(value.value), value.value)
+        self._assembler.emit(LOAD_CONST, self._assembler.constant(value, key))
+
+    def _compile_or_expression(self, expression: OrExpression):
+        self._compile_short_circuit(expression, JUMP_IF_TRUE_OR_POP)
+
+    def _compile_and_expression(self, expression: AndExpression):
+        self._compile_short_circuit(expression, JUMP_IF_FALSE_OR_POP)
+
+    def _compile_short_circuit(
+        self, expression: OrExpression | AndExpression, jump: int
+    ) -> None:
+        assembler = self._assembler
+        self._compile(expression.left)
+        if expression.right is None:
+            assembler.emit(CHECK_BOOL, 0, expression.position)
+            return
+        short_circuit = assembler.emit(jump, 0, expression.position)
+        self._compile(expression.right)
+        assembler.emit(CHECK_BOOL, 0, expression.position)
+        assembler.patch(short_circuit)
+
+    def _compile_relational_expression(self, expression: RelationalExpression):
+        self._compile(expression.left)
+        self._compile(expression.right)
+        comparison = COMPARISONS[expression.operator]
+        self._assembler.emit(COMPARE_OP, comparison, expression.position)
+
+    def _compile_binary_expression(
+        self, expression: AdditiveExpression | MultiplicativeExpression
+    ):
+        self._compile(expression.left)
+        self._compile(expression.right)
+        operation = BINARY_OPERATORS[expression.operator]
+        self._assembler.emit(BINARY_OP, operation, expression.position)
+
+    def _compile_negated_expression(self, expression: NegatedFactor):
+        self._compile(expression.factor)
+        opcode = NOT if expression.operator == UnaryOperator.NEGATION else NEGATE
+        self._assembler.emit(opcode, 0, expression.position)
+
+    def _compile_block(self, block: Block):
+        assembler = self._assembler
+        skips = []
+        check = True
+        for statement in block.statements:
+            # flags set before the statement skip the rest of the block, they
+            # are only checked again after a statement which may set them
+            if check:
+                skips.append(assembler.emit(JUMP_IF_UNWINDING))
+            self._compile_statement(statement)
+            if type(statement) in (ReturnStatement, BreakStatement, ContinueStatement):
+                break
+            check = _may_unwind(statement)
+        for jump in skips:
+            assembler.patch(jump)
+
+    def _compile_conditional_statement(self, statement: ConditionalStatement):
+        assembler = self._assembler
+        self._compile(statement.condition)
+        skip_if = assembler.emit(POP_JUMP_IF_FALSE)
+        self._compile(statement.if_block)
+        assembler.patch(skip_if)
+        if statement.else_block is not None:
+            # run whatever the condition, as Interpreter does
+            self._compile(statement.else_block)
+
+    def _compile_loop_statement(self, statement: LoopStatement):
+        assembler = self._assembler
+        # a loop which cannot set the flags needs the continue flag cleared
+        # and the break flag checked once
+        may_unwind = _may_unwind(statement.condition) or _may_unwind(statement.body)
+        self._compile(statement.condition)
+        assembler.emit(CLEAR_FLAGS, BREAK)
+        exit_loop = assembler.emit(POP_JUMP_IF_FALSE)
+        if not may_unwind:
+            assembler.emit(CLEAR_FLAGS, CONTINUE)
+        start = assembler.offset
+        if may_unwind:
+            assembler.emit(CLEAR_FLAGS, CONTINUE)
+        self._compile(statement.body)
+        exit_break = assembler.emit(JUMP_IF_BREAK) if may_unwind else None
+        self._compile(statement.condition)
+        assembler.emit(POP_JUMP_IF_TRUE, start)
+        assembler.patch(exit_loop)
+        if exit_break is not None:
+            assembler.patch(exit_break)
+
+    def _compile_continue_statement(self, statement: ContinueStatement):
+        self._assembler.emit(SET_FLAGS, CONTINUE)
+
+    def _compile_break_statement(self, statement: BreakStatement):
+        self._assembler.emit(SET_FLAGS, BREAK)
+
+    def _compile_match_statement(self, statement: MatchStatement):
+        assembler = self._assembler
+        for arg in statement.args:
+            self._compile(arg)
+        cases = [
+            Case(
+                case_predicate(case.identifier, self._error_handler),
+                _params(case.params),
+                0,
+                case.identifier.position,
+            )
+            for case in statement.case_stmts
+        ]
+        default = statement.default_stmt
+        site = MatchSite(
+            len(statement.args),
+            cases,
+            None if default is None else _params(default.params),
+            0,
+        )
+        assembler.emit(MATCH, assembler.constant(site), statement.position)
+
+        ends = []
+        for case, case_statement in zip(cases, statement.case_stmts):
+            case.target = assembler.offset
+            self._compile_case_body(case_statement)
+            ends.append(assembler.emit(JUMP))
+        site.default_target = assembler.offset
+        if default is not None:
+            self._compile_case_body(default)
+        for jump in ends:
+            assembler.patch(jump)
+
+    def _compile_case_body(self, case: CaseStatement | CaseDefaultStatement):
+        # unlike a block, the flags do not stop the statements of a case
+        for statement in case.body.statements:
+            self._compile_statement(statement)
+
+    def _compile_function_definition(self, statement: FunctionDefinitionStatement):
+        function_code = FunctionCode(
+            statement.name, _params(statement.params), statement.body
+        )
+        # a lazily parsed body is compiled by the VM on the first call
+        if not isinstance(statement.body, LazyBlock):
+            self.compile_function(function_code)
+        self._assembler.emit(MAKE_FUNCTION, self._assembler.constant(function_code))
+
+    def _compile_function_call(self, call: FunctionCallStatement):
+        assembler = self._assembler
+        site = CallSite(call.name, len(call.arguments), call.r_position)
+        assembler.emit(LOAD_FUNCTION, assembler.constant(site), call.position)
+        for argument in call.arguments:
+            self._compile(argument)
+        assembler.emit(CALL, len(call.arguments), call.position)
+
+    def _compile_return_statement(self, statement: ReturnStatement):
+        self._compile(statement.expression)
+        self._assembler.emit(RETURN_VALUE)
+
+    def _compile_var_definition(self, statement: VarDefinition):
+        assembler = self._assembler
+        name = assembler.name(statement.name) << 1 | statement.mut
+        assembler.emit(CHECK_UNDEFINED, name, statement.position)
+        self._compile(statement.expression)
+        assembler.emit(DEFINE_NAME, name)
+
+    def _compile_assignment(self, statement: Assignment):
+        assembler = self._assembler
+        name = assembler.name(statement.name)
+        assembler.emit(CHECK_ASSIGNABLE, name, statement.position)
+        self._compile(statement.expression)
+        assembler.emit(STORE_NAME, name)
+
+
+def _params(parameters: List[Parameter]) -> List[Param]:
+    return [Param(parameter.name, parameter.mut) for parameter in parameters]
+
+
+def _may_unwind(node: Optional[Statement]) -> bool:
+    """
+    :return: whether running node may set the return, break or continue
+        flag, as any call may
+    """
+    match node:
+        case (
+            FunctionCallStatement()
+            | ReturnStatement()
+            | BreakStatement()
+            | ContinueStatement()
+        ):
+            return True
+        case VarDefinition() | Assignment():
+            return _may_unwind(node.expression)
+        case (
+            OrExpression()
+            | AndExpression()
+            | RelationalExpression()
+            | AdditiveExpression()
+            | MultiplicativeExpression()
+        ):
+            return _may_unwind(node.left) or _may_unwind(node.right)
+        case NegatedFactor():
+            return _may_unwind(node.factor)
+        case ConditionalStatement():
+            return (
+                _may_unwind(node.condition)
+                or _may_unwind(node.if_block)
+                or _may_unwind(node.else_block)
+            )
+        case LoopStatement():
+            return _may_unwind(node.condition) or _may_unwind(node.body)
+        case MatchStatement():
+            cases = node.case_stmts + [node.default_stmt]
+            return any(_may_unwind(arg) for arg in node.args) or any(
+                _may_unwind(case.body) for case in cases if case is not None
+            )
+        case Block():
+            return any(_may_unwind(statement) for statement in node.statements)
+    return False
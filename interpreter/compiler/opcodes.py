@@ -0,0 +1,68 @@
+"""
+Opcodes of the bytecode. Every instruction is an opcode followed by a single
+int argument, unused by some of them.
+"""
+
+# push constants[arg]
+LOAD_CONST = 0
+# push the value of the variable names[arg]
+LOAD_NAME = 1
+# pop y and x, push x <operation arg> y, see vm.BINARY_OPERATIONS
+BINARY_OP = 2
+# pop y and x, push x <comparison arg> y, see vm.COMPARISONS
+COMPARE_OP = 3
+# fail unless the variable names[arg] can be assigned to
+CHECK_ASSIGNABLE = 4
+# pop a value into the mutable variable names[arg] of the current scope and
+# the last value
+STORE_NAME = 5
+# pop a value into the last value, jump to arg if it is falsy
+POP_JUMP_IF_FALSE = 6
+JUMP = 7
+# push the function of the call site constants[arg], checking its arguments
+LOAD_FUNCTION = 8
+# call the function below the arg topmost values with them as its arguments
+CALL = 9
+# pop a value into the last value and set the return flag
+RETURN_VALUE = 10
+# pop a value into the last value
+POP_TOP = 11
+# keep a true bool and jump to arg, pop a false one
+JUMP_IF_TRUE_OR_POP = 12
+# keep a false bool and jump to arg, pop a true one
+JUMP_IF_FALSE_OR_POP = 13
+# fail unless the topmost value is a bool
+CHECK_BOOL = 14
+NOT = 15
+NEGATE = 16
+# fail if the variable names[arg >> 1] is defined
+CHECK_UNDEFINED = 17
+# pop a value into a new variable names[arg >> 1], mutable if arg & 1, and
+# the last value
+DEFINE_NAME = 18
+# define the function constants[arg] in the current scope, its last
+# parameter becomes the last value
+MAKE_FUNCTION = 19
+# pop the arguments of the match site constants[arg], the last one into the
+# last value, bind the parameters of the case they fall into and jump to its
+# body
+MATCH = 20
+# pop a value into the last value, jump to arg if it is truthy
+POP_JUMP_IF_TRUE = 21
+# set and clear the flags arg, see compiler.RETURN, BREAK and CONTINUE
+SET_FLAGS = 22
+CLEAR_FLAGS = 23
+# jump to arg if any flag is set
+JUMP_IF_UNWINDING = 24
+# jump to arg if the break flag is set
+JUMP_IF_BREAK = 25
+# return the last value to the caller, clearing the return flag
+END = 26
+# fail as evaluating an expression the parser left out does in Interpreter
+MISSING = 27
+
+OPCODE_NAMES = {
+    value: name
+    for name, value in list(globals().items())
+    if name.isupper() and type(value) is int
+}
@@ -0,0 +1,398 @@
+import operator
+from typing import Callable, Dict, List
+
+from interpreter.compiler.code import (
+    Code,
+    FunctionCode,
+    BytecodeFunction,
+    CallSite,
+    MatchSite,
+)
+from interpreter.compiler.compiler import Compiler, DIVIDE, RETURN, BREAK
+from interpreter.compiler.opcodes import (
+    LOAD_CONST,
+    LOAD_NAME,
+    BINARY_OP,
+    COMPARE_OP,
+    CHECK_ASSIGNABLE,
+    STORE_NAME,
+    POP_JUMP_IF_FALSE,
+    JUMP,
+    LOAD_FUNCTION,
+    CALL,
+    RETURN_VALUE,
+    POP_TOP,
+    JUMP_IF_TRUE_OR_POP,
+    JUMP_IF_FALSE_OR_POP,
+    CHECK_BOOL,
+    NOT,
+    NEGATE,
+    CHECK_UNDEFINED,
+    DEFINE_NAME,
+    MAKE_FUNCTION,
+    MATCH,
+    POP_JUMP_IF_TRUE,
+    SET_FLAGS,
+    CLEAR_FLAGS,
+    JUMP_IF_UNWINDING,
+    JUMP_IF_BREAK,
+    END,
+    MISSING,
+)
+from interpreter.error_handler import ErrorHandler
+from interpreter.interpreter import Var, Function, Value, DataType
+from interpreter.interpreter.builtins import BUILTINS
+from interpreter.interpreter.builtins.input import Input
+from interpreter.interpreter.builtins.print import Print
+from interpreter.interpreter.builtins.str import ToStr
+from interpreter.interpreter.interpreter import MAXIMUM_RECURSION_DEPTH
+from interpreter.interpreter.value import NULL
+from interpreter.parser.parser import parse_lazy_block
+from interpreter.position import Position
+from interpreter.program import Statement
+from interpreter.program.program import Program
+
+# indexed by the arguments of BINARY_OP and COMPARE_OP
+BINARY_OPERATIONS = (
+    operator.add,
+    operator.sub,
+    operator.mul,
+    operator.truediv,
+    operator.mod,
+)
+COMPARISONS = (
+    operator.lt,
+    operator.le,
+    operator.eq,
+    operator.ne,
+    operator.gt,
+    operator.ge,
+)
+
+NUM = DataType.NUM
+BOOL = DataType.BOOL
+
+
+class VirtualMachine:
+    """
+    Runs the bytecode of Compiler with a dispatch loop over a stack of
+    Values. Calls do not recurse into the loop, each one pushes a frame, so
+    MAXIMUM_RECURSION_DEPTH is the only limit to recursion.
+
+    Programs behave as in Interpreter, which stays the reference: values,
+    scopes, errors, the flags and the last value described by Compiler, and
+    the recursion depth, which builtin calls raise for good.
+    """
+
+    def __init__(self, error_handler: ErrorHandler):
+        self._error_handler = error_handler
+        self._compiler = Compiler(error_handler)
+        self._globals: Dict[str, Var | Function] = {}
+        # the flags of Compiler and the recursion depth, kept between the
+        # statements run
+        self._unwinding: int = 0
+        self._recursion_depth: int = 0
+        for builtin in BUILTINS:
+            fn = builtin()
+            self._globals[fn.name] = fn
+        self._builtins: Dict[type, Callable[[List[Value], Position], Value]] = {
+            Print: self._print,
+            ToStr: self._to_str,
+            Input: self._input,
+        }
+
+    def run(self, program: Program) -> None:
+        self.run_code(self._compiler.compile_program(program))
+
+    def execute(self, statement: Statement) -> None:
+        self.run_code(self._compiler.compile_statement(statement))
+
+    def run_code(self, code: Code) -> Value:
+        """
+        Run code in the global scope.
+
+        :return: the last value of code
+        """
+        error_handler = self._error_handler
+        glob = self._globals
+        local = glob
+        frames = []
+        stack = []
+        instructions = code.instructions
+        constants = code.constants
+        names = code.names
+        pc = 0
+        last = None
+        unwinding = self._unwinding
+        depth = self._recursion_depth
+
+        try:
+            while True:
+                opcode = instructions[pc]
+                arg = instructions[pc + 1]
+                pc += 2
+
+                if opcode == LOAD_NAME:
+                    var = local.get(names[arg]) or glob.get(names[arg])
+                    if var is None:
+                        error_handler.not_defined(code.position(pc - 2), names[arg])
+                    stack.append(var.value)
+
+                elif opcode == LOAD_CONST:
+                    stack.append(constants[arg])
+
+                elif opcode == BINARY_OP:
+                    y = stack.pop()
+                    x = stack[-1]
+                    if x.type is not y.type:
+                        error_handler.operation_bad_types(code.position(pc - 2))
+                    if arg >= DIVIDE and y.value == 0:
+                        error_handler.zero_division(code.position(pc - 2))
+                    # the sum of two strings is a num, as in Interpreter
+                    stack[-1] = Value(NUM, BINARY_OPERATIONS[arg](x.value, y.value))
+
+                elif opcode == COMPARE_OP:
+                    y = stack.pop()
+                    x = stack[-1]
+                    if x.type is not y.type:
+                        error_handler.operation_bad_types(code.position(pc - 2))
+                    stack[-1] = Value(BOOL, COMPARISONS[arg](x.value, y.value))
+
+                elif opcode == POP_JUMP_IF_FALSE:
+                    last = stack.pop()
+                    if not last.value:
+                        pc = arg
+
+                elif opcode == POP_JUMP_IF_TRUE:
+                    last = stack.pop()
+                    if last.value:
+                        pc = arg
+
+                elif opcode == JUMP_IF_UNWINDING:
+                    if unwinding:
+                        pc = arg
+
+                elif opcode == JUMP:
+                    pc = arg
+
+                elif opcode == CHECK_ASSIGNABLE:
+                    var = local.get(names[arg]) or glob.get(names[arg])
+                    if var is None:
+                        error_handler.not_defined(code.position(pc - 2), names[arg])
+                    if not var.mutable:
+                        error_handler.assign_mut(code.position(pc - 2), names[arg])
+
+                elif opcode == STORE_NAME:
+                    # set in the current scope, even when the variable is global
+                    last = stack.pop()
+                    local[names[arg]] = Var(names[arg], last, True)
+
+                elif opcode == LOAD_FUNCTION:
+                    site: CallSite = constants[arg]
+                    fn = local.get(site.name) or glob.get(site.name)
+                    if fn is None:
+                        error_handler.not_defined(code.position(pc - 2), site.name)
+                    if not isinstance(fn, Function):
+                        error_handler.not_callable(code.position(pc - 2), site.name)
+                    if site.argc != fn.params_len:
+                        if site.argc < fn.params_len:
+                            name = fn.params[site.argc].name
+                            error_handler.missing_parameter(site.r_position, name)
+                        error_handler.unexpected_argument(site.r_position)
+                    stack.append(fn)
+
+                elif opcode == CALL:
+                    args = stack[len(stack) - arg :]
+                    del stack[len(stack) - arg :]
+                    fn = stack.pop()
+                    if type(fn) is not BytecodeFunction:
+                        # builtins count towards the recursion depth for good,
+                        # as they do in Interpreter
+                        depth += 1
+                        if depth > MAXIMUM_RECURSION_DEPTH:
+                            error_handler.max_recursion_depth(code.position(pc - 2))
+                        builtin = self._builtins[type(fn)]
+                        stack.append(builtin(args, code.position(pc - 2)))
+                        continue
+
+                    function_code = fn.function_code
+                    body = function_code.code
+                    if body is None:
+                        body = self._compile_lazy_body(
+                            function_code, code.position(pc - 2)
+                        )
+                    depth += 1
+                    if depth > MAXIMUM_RECURSION_DEPTH:
+                        error_handler.max_recursion_depth(code.position(pc - 2))
+
+                    frames.append((code, pc, stack, local))
+                    local = {}
+                    for param, value in zip(fn.params, args):
+                        local[param.name] = Var(param.name, value, param.mut)
+                    local[fn.name] = fn
+                    code = body
+                    instructions = code.instructions
+                    constants = code.constants
+                    names = code.names
+                    stack = []
+                    pc = 0
+                    last = NULL
+
+                elif opcode == END:
+                    if not frames:
+                        return last
+                    code, pc, stack, local = frames.pop()
+                    instructions = code.instructions
+                    constants = code.constants
+                    names = code.names
+                    stack.append(last)
+                    unwinding &= ~RETURN
+                    depth -= 1
+
+                elif opcode == RETURN_VALUE:
+                    last = stack.pop()
+                    unwinding |= RETURN
+
+                elif opcode == POP_TOP:
+                    last = stack.pop()
+
+                elif opcode == JUMP_IF_BREAK:
+                    if unwinding & BREAK:
+                        pc = arg
+
+                elif opcode == SET_FLAGS:
+                    unwinding |= arg
+
+                elif opcode == CLEAR_FLAGS:
+                    unwinding &= ~arg
+
+                elif opcode == JUMP_IF_TRUE_OR_POP or opcode == JUMP_IF_FALSE_OR_POP:
+                    value = stack[-1]
+                    if value.type is not BOOL:
+                        error_handler.unexpected_type(
+                            code.position(pc - 2), value.type, BOOL
+                        )
+                    if value.value is (opcode == JUMP_IF_TRUE_OR_POP):
+                        pc = arg
+                    else:
+                        stack.pop()
+
+                elif opcode == CHECK_BOOL:
+                    value = stack[-1]
+                    if value.type is not BOOL:
+                        error_handler.unexpected_type(
+                            code.position(pc - 2), value.type, BOOL
+                        )
+
+                elif opcode == NOT:
+                    value = stack[-1]
+                    if value.type is not BOOL:
+                        error_handler.operation_bad_types(code.position(pc - 2))
+                    stack[-1] = Value(BOOL, not value.value)
+
+                elif opcode == NEGATE:
+                    value = stack[-1]
+                    if value.type is not NUM:
+                        error_handler.operation_bad_types(code.position(pc - 2))
+                    stack[-1] = Value(NUM, -value.value)
+
+                elif opcode == CHECK_UNDEFINED:
+                    name = names[arg >> 1]
+                    if local.get(name) or glob.get(name):
+                        error_handler.already_defined(code.position(pc - 2), name)
+
+                elif opcode == DEFINE_NAME:
+                    name = names[arg >> 1]
+                    last = stack.pop()
+                    local[name] = Var(name, last, bool(arg & 1))
+
+                elif opcode == MAKE_FUNCTION:
+                    function_code: FunctionCode = constants[arg]
+                    if function_code.params:
+                        last = function_code.params[-1]
+                    local[function_code.name] = BytecodeFunction(function_code)
+
+                elif opcode == MATCH:
+                    site: MatchSite = constants[arg]
+                    args = stack[len(stack) - site.argc :]
+                    del stack[len(stack) - site.argc :]
+                    if args:
+                        last = args[-1]
+                    pc = self._match(site, args, local, code.position(pc - 2))
+
+                elif opcode == MISSING:
+                    raise AttributeError("'NoneType' object has no attribute 'accept'")
+
+                else:
+                    raise ValueError(
+                        f"unknown opcode {opcode} at {pc - 2} of {code.name}"
+                    )
+        finally:
+            self._unwinding = unwinding
+            self._recursion_depth = depth
+
+    def _match(
+        self,
+        site: MatchSite,
+        args: List[Value],
+        local: Dict[str, Var | Function],
+        position: Position,
+    ) -> int:
+        """
+        Bind the parameters of the case the arguments fall into.
+
+        :return: offset of the body of the case
+        """
+        if len(args) < 1:
+            self._error_handler.missing_parameter(position, "")
+        for case in site.cases:
+            if case.matches(args):
+                params, target = case.params, case.target
+                break
+        else:
+            if site.default_params is None:
+                return site.default_target
+            params, target = site.default_params, site.default_target
+            case = None
+
+        if len(params) > len(args):
+            position = position if case is None else case.position
+            self._error_handler.unexpected_argument(position)
+        for value, param in zip(args, params):
+            local[param.name] = Var(param.name, value, param.mut)
+        return target
+
+    def _compile_lazy_body(self, function_code: FunctionCode, position: Position):
+        """
+        Parse and compile the body of a function on its first call, its
+        syntax errors are reported then.
+        """
+        errors = len(self._error_handler.errors)
+        function_code.body = parse_lazy_block(function_code.body, self._error_handler)
+        if len(self._error_handler.errors) > errors:
+            self._error_handler.invalid_function_body(position, function_code.name)
+        return self._compiler.compile_function(function_code)
+
+    def _print(self, args: List[Value], position: Position) -> Value:
+        value = args[0]
+        if value.type != DataType.STR:
+            self._error_handler.unexpected_type(position, value.type, DataType.STR)
+        print(value.value, end="")
+        return NULL
+
+    def _to_str(self, args: List[Value], position: Position) -> Value:
+        value = args[0]
+        match value.type:
+            case DataType.STR:
+                # the argument itself, as Interpreter returns it
+                return Var("arg", value, False)
+            case DataType.NUM:
+                number = value.value
+                number = int(number) if number // 1 == number else number
+                return Value(DataType.STR, str(number))
+            case DataType.BOOL:
+                return Value(DataType.STR, "true" if value.value else "false")
+        return Value(DataType.STR, "null")
+
+    def _input(self, args: List[Value], position: Position) -> Value:
+        return Value(DataType.STR, input())
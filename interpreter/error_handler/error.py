@@ -20,6 +20,7 @@ class ErrorType(Enum):
     RIGHT_BRACKET_EXPECTED = (auto(),)
     RIGHT_CURLY_BRACKET_EXPECTED = (auto(),)
     DEFAULT_STATEMENT_EXPECTED = (auto(),)
+    STATEMENT_EXPECTED = (auto(),)
     NO_EFFECT = (auto(),)
     OPERATION_BAD_TYPES = (auto(),)
     ZERO_DIVISION = (auto(),)
@@ -83,3 +84,7 @@ class AlreadyDefined(CriticalError):
 
 class RecusionDepth(CriticalError):
     ...
+
+
+class InvalidFunctionBody(CriticalError):
+    ...
@@ -12,6 +12,7 @@ from interpreter.error_handler.error import (
     NotCallable,
     MissingParameter,
     UnexpectedArgument,
+    InvalidFunctionBody,
 )
 from interpreter.interpreter.value import DataType
 from interpreter.position import Position
@@ -88,6 +89,10 @@ class ErrorHandler:
         msg = "default statement expected"
         self._errors.append(Error(ErrorType.DEFAULT_STATEMENT_EXPECTED, msg, position))
 
+    def statement_expected(self, position: Position):
+        msg = "Error: Statement expected"
+        self._errors.append(Error(ErrorType.STATEMENT_EXPECTED, msg, position))
+
     def no_effect(self, position: Position):
         msg = "statement seems to have no effect"
         self._errors.append(Error(ErrorType.NO_EFFECT, msg, position))
@@ -141,3 +146,8 @@ class ErrorHandler:
     def max_recursion_depth(position: Position):
         msg = f"reached maximum recursion depth"
         raise AlreadyDefined(position, msg)
+
+    @staticmethod
+    def invalid_function_body(position: Position, name: str):
+        msg = f"function {name} has syntax errors"
+        raise InvalidFunctionBody(position, msg)
@@ -2,4 +2,5 @@ from interpreter.interpreter.scope import Scope
 from interpreter.interpreter.var import Var
 from interpreter.interpreter.function import Function, Param
 from interpreter.interpreter.global_scope import GlobalScope
+from interpreter.interpreter.slot_scope import SlotScope
 from interpreter.interpreter.value import Value, DataType
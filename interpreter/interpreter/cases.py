@@ -0,0 +1,69 @@
+from typing import Callable, List
+
+from interpreter.error_handler import ErrorHandler
+from interpreter.interpreter.value import Value, DataType
+from interpreter.position import Position
+from interpreter.program import CaseIdentifier, Literal, LiteralType
+from interpreter.program.operator import CaseOperator
+
+Predicate = Callable[[List[Value]], bool]
+
+QUARTERS = {
+    CaseOperator.IS_QUARTERO: lambda x, y: (x > 0) and (y > 0),
+    CaseOperator.IS_QUARTERTW: lambda x, y: (x < 0) and (y > 0),
+    CaseOperator.IS_QUARTERTH: lambda x, y: (x < 0) and (y < 0),
+    CaseOperator.IS_QUARTERF: lambda x, y: (x > 0) and (y < 0),
+}
+
+
+def case_predicate(
+    identifier: CaseIdentifier, error_handler: ErrorHandler
+) -> Predicate:
+    """
+    :return: whether the arguments of a match statement fall into the case,
+        as Interpreter._pick_case decides it, for the backends that decide it
+        without visiting the case identifier
+    """
+    case = identifier.identifier
+    position = identifier.position
+
+    def check_type(position: Position, value: Value, expected: DataType) -> None:
+        if value.type != expected:
+            error_handler.unexpected_type(position, value.type, expected)
+
+    if case in (CaseOperator.IS_ODD, CaseOperator.IS_EVEN):
+        odd = case == CaseOperator.IS_ODD
+
+        def parity(args: List[Value]) -> bool:
+            check_type(position, args[0], DataType.NUM)
+            return (args[0].value % 2 != 0) is odd
+
+        return parity
+
+    if isinstance(case, CaseOperator) and case in QUARTERS:
+        quarter = QUARTERS[case]
+
+        def in_quarter(args: List[Value]) -> bool:
+            if len(args) < 2:
+                error_handler.missing_parameter(position, "for Quarter operator")
+            check_type(position, args[0], DataType.NUM)
+            check_type(position, args[1], DataType.NUM)
+            return quarter(args[0].value, args[1].value)
+
+        return in_quarter
+
+    if isinstance(case, LiteralType):
+        data_type = DataType.from_literal_type(case)
+        return lambda args: args[0].type == data_type
+
+    if isinstance(case, Literal):
+        data_type = DataType.from_literal_type(case.type)
+        literal = case.value
+
+        def equals(args: List[Value]) -> bool:
+            check_type(position, args[0], data_type)
+            return args[0].value == literal
+
+        return equals
+
+    return lambda args: False
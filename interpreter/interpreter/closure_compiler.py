@@ -0,0 +1,564 @@
+import operator
+from typing import Any, Callable, Dict, List, Optional
+
+from interpreter.error_handler import ErrorHandler
+from interpreter.interpreter import GlobalScope, Scope, Var, Param, Function, Value
+from interpreter.interpreter import DataType
+from interpreter.interpreter.builtins import BUILTINS
+from interpreter.interpreter.builtins.input import Input
+from interpreter.interpreter.builtins.print import Print
+from interpreter.interpreter.builtins.str import ToStr
+from interpreter.interpreter.cases import case_predicate
+from interpreter.interpreter.interpreter import MAXIMUM_RECURSION_DEPTH
+from interpreter.parser.parser import parse_lazy_block
+from interpreter.position import Position
+from interpreter.program import (
+    IdentifierExpression,
+    Literal,
+    FunctionCallStatement,
+    FunctionDefinitionStatement,
+    MatchStatement,
+    LoopStatement,
+    ConditionalStatement,
+    Assignment,
+    Block,
+    LazyBlock,
+    NegatedFactor,
+    MultiplicativeExpression,
+    AdditiveExpression,
+    RelationalExpression,
+    AndExpression,
+    OrExpression,
+    VarDefinition,
+    ReturnStatement,
+    RelationalOperator,
+    AdditiveOperator,
+    MultiplicativeOperator,
+    UnaryOperator,
+    Statement,
+)
+from interpreter.program.program import Program
+from interpreter.program.statement import BreakStatement, ContinueStatement
+
+Code = Callable[[], Any]
+
+# bits of ClosureCompiler._unwinding, the return, break and continue flags
+# of Interpreter
+RETURN = 1
+BREAK = 2
+CONTINUE = 4
+
+RELATIONAL_OPERATORS = {
+    RelationalOperator.LESS: operator.lt,
+    RelationalOperator.LESS_OR_EQ: operator.le,
+    RelationalOperator.EQ: operator.eq,
+    RelationalOperator.NOT_EQ: operator.ne,
+    RelationalOperator.GREATER: operator.gt,
+    RelationalOperator.GREATER_OR_EQ: operator.ge,
+}
+ADDITIVE_OPERATORS = {
+    AdditiveOperator.ADDITION: operator.add,
+    AdditiveOperator.SUBTRACTION: operator.sub,
+}
+MULTIPLICATIVE_OPERATORS = {
+    MultiplicativeOperator.MULTIPLICATION: operator.mul,
+    MultiplicativeOperator.DIVISION: operator.truediv,
+    MultiplicativeOperator.MODULO: operator.mod,
+}
+
+
+class CompiledFunction(Function):
+    """
+    Function defined by compiled code, code runs its body once it has been
+    parsed and compiled.
+    """
+
+    def __init__(
+        self, name: str, params: List[Param], body: Block | LazyBlock, code: Code
+    ):
+        super().__init__(name, params, body)
+        self.code = code
+
+
+class ClosureCompiler:
+    """
+    Runs programs like Interpreter, which stays the reference, but turns each
+    statement once into nested closures instead of visiting its nodes every
+    time it runs. An expression closure returns its value, so there is no
+    accept() dispatch, operator matching or _last_value side channel on the
+    way.
+
+    The scope, the return, break and continue flags, the value a function
+    call results in and every error are those of Interpreter.
+    """
+
+    def __init__(self, error_handler: ErrorHandler):
+        self._error_handler = error_handler
+        self._scope = GlobalScope()
+        for builtin in BUILTINS:
+            self._scope.update(builtin())
+        self._last_value: Optional[Value] = None
+        self._unwinding: int = 0
+        self._recursion_depth: int = 0
+        # compiled bodies of lazily parsed functions, by their parsed block
+        self._lazy_code: Dict[int, Code] = {}
+        self._compilers: Dict[type, Callable[[Any], Code]] = {
+            IdentifierExpression: self._compile_identifier_expression,
+            Literal: self._compile_literal,
+            OrExpression: self._compile_or_expression,
+            AndExpression: self._compile_and_expression,
+            RelationalExpression: self._compile_relational_expression,
+            AdditiveExpression: self._compile_additive_expression,
+            MultiplicativeExpression: self._compile_multiplicative_expression,
+            NegatedFactor: self._compile_negated_expression,
+            Block: self._compile_block,
+            ConditionalStatement: self._compile_conditional_statement,
+            LoopStatement: self._compile_loop_statement,
+            MatchStatement: self._compile_match_statement,
+            FunctionDefinitionStatement: self._compile_function_definition,
+            FunctionCallStatement: self._compile_function_call_statement,
+            ReturnStatement: self._compile_return_statement,
+            ContinueStatement: self._compile_continue_statement,
+            BreakStatement: self._compile_break_statement,
+            VarDefinition: self._compile_var_definition,
+            Assignment: self._compile_assignment,
+        }
+        self._builtins: Dict[type, Callable[[Dict[str, Var], Position], Any]] = {
+            Print: self._print,
+            ToStr: self._to_str,
+            Input: self._input,
+        }
+
+    def run(self, program: Program) -> None:
+        for statement in program.statements:
+            self.execute(statement)
+
+    def execute(self, statement: Statement) -> None:
+        self.compile(statement)()
+
+    def compile(self, node: Statement) -> Code:
+        """
+        :param node: statement or expression of a program parsed without
+            syntax errors
+        :return: closure running the node, an expression one returns its value
+        """
+        if node is None:
+            # like Interpreter, an expression left out by "return;" only
+            # fails once it is evaluated
+            return _missing
+        return self._compilers[type(node)](node)
+
+    def _compile_identifier_expression(self, expression: IdentifierExpression) -> Code:
+        name = expression.name
+        position = expression.position
+        stack = self._scope.stack
+        glob = self._scope.glob.var
+        not_defined = self._error_handler.not_defined
+
+        def identifier():
+            var = (stack and stack[-1].var.get(name)) or glob.get(name)
+            if var is None:
+                not_defined(position, name)
+            return var.value
+
+        return identifier
+
+    def _compile_literal(self, expression: Literal) -> Code:
+        value = Value.from_literal(expression)
+        return lambda: value
+
+    def _compile_or_expression(self, expression: OrExpression) -> Code:
+        left = self.compile(expression.left)
+        right = None if expression.right is None else self.compile(expression.right)
+        position = expression.position
+        unexpected_type = self._error_handler.unexpected_type
+
+        def or_():
+            value = left()
+            if value.type is not DataType.BOOL:
+                unexpected_type(position, value.type, DataType.BOOL)
+            if value.value is True:
+                return Value(DataType.BOOL, True)
+            if right is None:
+                return Value(DataType.BOOL, value.value)
+            value = right()
+            if value.type is not DataType.BOOL:
+                unexpected_type(position, value.type, DataType.BOOL)
+            return Value(DataType.BOOL, value.value is True)
+
+        return or_
+
+    def _compile_and_expression(self, expression: AndExpression) -> Code:
+        left = self.compile(expression.left)
+        right = None if expression.right is None else self.compile(expression.right)
+        position = expression.position
+        unexpected_type = self._error_handler.unexpected_type
+
+        def and_():
+            value = left()
+            if value.type is not DataType.BOOL:
+                unexpected_type(position, value.type, DataType.BOOL)
+            if value.value is False:
+                return Value(DataType.BOOL, False)
+            if right is None:
+                return Value(DataType.BOOL, value.value)
+            value = right()
+            if value.type is not DataType.BOOL:
+                unexpected_type(position, value.type, DataType.BOOL)
+            return Value(DataType.BOOL, value.value is not False)
+
+        return and_
+
+    def _compile_relational_expression(self, expression: RelationalExpression) -> Code:
+        compare = RELATIONAL_OPERATORS[expression.operator]
+        return self._compile_binary(expression, DataType.BOOL, compare)
+
+    def _compile_additive_expression(self, expression: AdditiveExpression) -> Code:
+        # the sum of two strings is a num, as in Interpreter
+        operation = ADDITIVE_OPERATORS[expression.operator]
+        return self._compile_binary(expression, DataType.NUM, operation)
+
+    def _compile_multiplicative_expression(
+        self, expression: MultiplicativeExpression
+    ) -> Code:
+        operation = MULTIPLICATIVE_OPERATORS[expression.operator]
+        if expression.operator == MultiplicativeOperator.MULTIPLICATION:
+            return self._compile_binary(expression, DataType.NUM, operation)
+
+        left = self.compile(expression.left)
+        right = self.compile(expression.right)
+        position = expression.position
+        operation_bad_types = self._error_handler.operation_bad_types
+        zero_division = self._error_handler.zero_division
+
+        def divide():
+            x = left()
+            y = right()
+            if x.type is not y.type:
+                operation_bad_types(position)
+            if y.value == 0:
+                zero_division(position)
+            return Value(DataType.NUM, operation(x.value, y.value))
+
+        return divide
+
+    def _compile_binary(
+        self,
+        expression: RelationalExpression | AdditiveExpression,
+        data_type: DataType,
+        operation: Callable[[Any, Any], Any],
+    ) -> Code:
+        left = self.compile(expression.left)
+        right = self.compile(expression.right)
+        position = expression.position
+        operation_bad_types = self._error_handler.operation_bad_types
+
+        def binary():
+            x = left()
+            y = right()
+            if x.type is not y.type:
+                operation_bad_types(position)
+            return Value(data_type, operation(x.value, y.value))
+
+        return binary
+
+    def _compile_negated_expression(self, expression: NegatedFactor) -> Code:
+        factor = self.compile(expression.factor)
+        position = expression.position
+        operation_bad_types = self._error_handler.operation_bad_types
+
+        if expression.operator == UnaryOperator.NEGATION:
+
+            def negation():
+                value = factor()
+                if value.type is not DataType.BOOL:
+                    operation_bad_types(position)
+                return Value(DataType.BOOL, not value.value)
+
+            return negation
+
+        def minus():
+            value = factor()
+            if value.type is not DataType.NUM:
+                operation_bad_types(position)
+            return Value(DataType.NUM, -value.value)
+
+        return minus
+
+    def _compile_block(self, block: Block) -> Code:
+        statements = [self.compile(statement) for statement in block.statements]
+
+        def run_block():
+            for statement in statements:
+                # a return, break or continue skips the rest of the block
+                if self._unwinding:
+                    return
+                statement()
+
+        return run_block
+
+    def _compile_conditional_statement(self, statement: ConditionalStatement) -> Code:
+        condition = self.compile(statement.condition)
+        if_block = self.compile(statement.if_block)
+        else_block = (
+            None if statement.else_block is None else self.compile(statement.else_block)
+        )
+
+        def conditional():
+            value = self._last_value = condition()
+            if value.value:
+                if_block()
+            # run whatever the condition, as Interpreter does
+            if else_block is not None:
+                else_block()
+
+        return conditional
+
+    def _compile_loop_statement(self, statement: LoopStatement) -> Code:
+        condition = self.compile(statement.condition)
+        body = self.compile(statement.body)
+
+        def loop():
+            value = self._last_value = condition()
+            self._unwinding &= ~BREAK
+            while value.value:
+                self._unwinding &= ~CONTINUE
+                body()
+                if self._unwinding & BREAK:
+                    break
+                value = self._last_value = condition()
+
+        return loop
+
+    def _compile_match_statement(self, statement: MatchStatement) -> Code:
+        args = [self.compile(arg) for arg in statement.args]
+        position = statement.position
+        cases = [
+            (
+                case_predicate(case.identifier, self._error_handler),
+                case,
+                [self.compile(stmt) for stmt in case.body.statements],
+            )
+            for case in statement.case_stmts
+        ]
+        default = statement.default_stmt
+        if default is not None:
+            default = (default, [self.compile(s) for s in default.body.statements])
+        stack = self._scope.stack
+        glob = self._scope.glob.var
+
+        def match():
+            values = []
+            for arg in args:
+                value = self._last_value = arg()
+                values.append(value)
+            if len(values) < 1:
+                self._error_handler.missing_parameter(position, "")
+
+            for matches, case, body in cases:
+                if matches(values):
+                    break
+            else:
+                if default is None:
+                    return
+                case, body = default
+
+            if len(case.params) > len(values):
+                self._error_handler.unexpected_argument(case.identifier.position)
+            frame = stack[-1].var if stack else glob
+            for value, param in zip(values, case.params):
+                frame[param.name] = Var(param.name, value, param.mut)
+            for stmt in body:
+                stmt()
+
+        return match
+
+    def _compile_function_definition(
+        self, statement: FunctionDefinitionStatement
+    ) -> Code:
+        name = statement.name
+        params = [Param(param.name, param.mut) for param in statement.params]
+        body = statement.body
+        # a lazily parsed body is compiled on the first call
+        code = None if isinstance(body, LazyBlock) else self.compile(body)
+        stack = self._scope.stack
+        glob = self._scope.glob.var
+
+        def define():
+            if params:
+                # visiting the parameters leaves the last one in _last_value
+                self._last_value = params[-1]
+            frame = stack[-1].var if stack else glob
+            frame[name] = CompiledFunction(name, params, body, code)
+
+        return define
+
+    def _compile_function_call_statement(
+        self, statement: FunctionCallStatement
+    ) -> Code:
+        name = statement.name
+        position = statement.position
+        r_position = statement.r_position
+        arguments = [self.compile(argument) for argument in statement.arguments]
+        args_len = len(arguments)
+        stack = self._scope.stack
+        glob = self._scope.glob.var
+        error_handler = self._error_handler
+
+        def call():
+            fn = (stack and stack[-1].var.get(name)) or glob.get(name)
+            if fn is None:
+                error_handler.not_defined(position, name)
+            if not isinstance(fn, Function):
+                error_handler.not_callable(position, name)
+            params = fn.params
+            if args_len != fn.params_len:
+                if args_len < fn.params_len:
+                    error_handler.missing_parameter(r_position, params[args_len].name)
+                error_handler.unexpected_argument(r_position)
+
+            frame = {}
+            for argument, param in zip(arguments, params):
+                frame[param.name] = Var(param.name, argument(), param.mut)
+
+            if type(fn) is not CompiledFunction:
+                # builtins count towards the recursion depth for good, as they
+                # do in Interpreter
+                self._recursion_depth += 1
+                if self._recursion_depth > MAXIMUM_RECURSION_DEPTH:
+                    error_handler.max_recursion_depth(position)
+                self._last_value = Value(DataType.NULL, None)
+                self._builtins[type(fn)](frame, position)
+                return self._last_value
+
+            code = fn.code
+            if code is None:
+                code = self._compile_lazy_body(fn, statement)
+            self._recursion_depth += 1
+            if self._recursion_depth > MAXIMUM_RECURSION_DEPTH:
+                error_handler.max_recursion_depth(position)
+
+            frame[fn.name] = fn
+            scope = Scope()
+            scope.var = frame
+            stack.append(scope)
+            self._last_value = Value(DataType.NULL, None)
+            code()
+            stack.pop()
+            self._unwinding &= ~RETURN
+            self._recursion_depth -= 1
+            return self._last_value
+
+        return call
+
+    def _compile_lazy_body(
+        self, fn: CompiledFunction, statement: FunctionCallStatement
+    ) -> Code:
+        """
+        Parse and compile the body of a function on its first call, its
+        syntax errors are reported then.
+        """
+        errors = len(self._error_handler.errors)
+        block = parse_lazy_block(fn.body, self._error_handler)
+        if len(self._error_handler.errors) > errors:
+            self._error_handler.invalid_function_body(
+                statement.position, statement.name
+            )
+        code = self._lazy_code.get(id(block))
+        if code is None:
+            code = self._lazy_code[id(block)] = self.compile(block)
+        fn.body = block
+        fn.code = code
+        return code
+
+    def _compile_return_statement(self, statement: ReturnStatement) -> Code:
+        expression = self.compile(statement.expression)
+
+        def return_():
+            self._last_value = expression()
+            self._unwinding |= RETURN
+
+        return return_
+
+    def _compile_continue_statement(self, statement: ContinueStatement) -> Code:
+        def continue_():
+            self._unwinding |= CONTINUE
+
+        return continue_
+
+    def _compile_break_statement(self, statement: BreakStatement) -> Code:
+        def break_():
+            self._unwinding |= BREAK
+
+        return break_
+
+    def _compile_var_definition(self, statement: VarDefinition) -> Code:
+        name = statement.name
+        position = statement.position
+        mutable = statement.mut
+        expression = self.compile(statement.expression)
+        stack = self._scope.stack
+        glob = self._scope.glob.var
+
+        def var_definition():
+            if (stack and stack[-1].var.get(name)) or glob.get(name):
+                self._error_handler.already_defined(position, name)
+            value = self._last_value = expression()
+            frame = stack[-1].var if stack else glob
+            frame[name] = Var(name, value, mutable)
+
+        return var_definition
+
+    def _compile_assignment(self, statement: Assignment) -> Code:
+        name = statement.name
+        position = statement.position
+        expression = self.compile(statement.expression)
+        stack = self._scope.stack
+        glob = self._scope.glob.var
+        error_handler = self._error_handler
+
+        def assignment():
+            var = (stack and stack[-1].var.get(name)) or glob.get(name)
+            if var is None:
+                error_handler.not_defined(position, name)
+            if not var.mutable:
+                error_handler.assign_mut(position, name)
+            value = self._last_value = expression()
+            # the variable is set in the current scope, even a global one
+            frame = stack[-1].var if stack else glob
+            frame[name] = Var(name, value, var.mutable)
+
+        return assignment
+
+    def _check_type(self, position: Position, value: Value, expected: DataType) -> bool:
+        if value.type != expected:
+            self._error_handler.unexpected_type(position, value.type, expected)
+            return False
+        return True
+
+    def _print(self, frame: Dict[str, Var], position: Position):
+        value = frame["arg"].value
+        self._check_type(position, value, DataType.STR)
+        print(value.value, end="")
+
+    def _to_str(self, frame: Dict[str, Var], position: Position):
+        arg = frame["arg"]
+        match arg.value.type:
+            case DataType.STR:
+                self._last_value = arg
+            case DataType.NUM:
+                arg_val = arg.value.value
+                value = int(arg_val) if arg_val // 1 == arg_val else arg_val
+                self._last_value = Value(DataType.STR, str(value))
+            case DataType.BOOL:
+                value = "true" if arg.value.value else "false"
+                self._last_value = Value(DataType.STR, value)
+            case DataType.NULL:
+                self._last_value = Value(DataType.STR, "null")
+
+    def _input(self, frame: Dict[str, Var], position: Position):
+        self._last_value = Value(DataType.STR, input())
+
+
+def _missing():
+    raise AttributeError("'NoneType' object has no attribute 'accept'")
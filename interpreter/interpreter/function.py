@@ -1,6 +1,6 @@
-from typing import List
+from typing import List, Optional
 
-from interpreter.program import Block
+from interpreter.program import Block, FunctionDefinitionStatement
 from dataclasses import dataclass
 
 
@@ -16,11 +16,20 @@ class Function:
     params: List[Param]
     params_len: int
     body: Block
+    # statement defining the function, which the Resolver stores the layout
+    # of its frame on, None for builtins
+    definition: Optional[FunctionDefinitionStatement]
 
     def __init__(
-        self, name: str, params: List["Parameter"], body: Block, param_len: int = None
+        self,
+        name: str,
+        params: List["Parameter"],
+        body: Block,
+        param_len: int = None,
+        definition: Optional[FunctionDefinitionStatement] = None,
     ):
         self.name = name
         self.params = params
         self.params_len = param_len if param_len else len(params)
         self.body = body
+        self.definition = definition
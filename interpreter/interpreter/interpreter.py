@@ -1,13 +1,16 @@
 from typing import Optional, Any, List
 
 from interpreter.error_handler import ErrorHandler
-from interpreter.interpreter import GlobalScope, Var, Param, Function, Value, DataType
+from interpreter.interpreter import SlotScope, Var, Param, Function, Value, DataType
 from interpreter.interpreter.builtins import Builtins, BUILTINS
 from interpreter.interpreter.builtins.input import Input
 from interpreter.interpreter.builtins.str import ToStr
 from interpreter.interpreter.builtins.print import Print
+from interpreter.interpreter.value import TRUE, FALSE, NULL
+from interpreter.parser.parser import parse_lazy_block
 from interpreter.position import Position
 from interpreter.program import (
+    Expression,
     IdentifierExpression,
     Literal,
     FunctionCallStatement,
@@ -20,6 +23,7 @@ from interpreter.program import (
     ConditionalStatement,
     Assignment,
     Block,
+    LazyBlock,
     Parameter,
     NegatedFactor,
     MultiplicativeExpression,
@@ -34,22 +38,48 @@ from interpreter.program import (
     MultiplicativeOperator,
     UnaryOperator,
     LiteralType,
+    Statement,
 )
 from interpreter.program.operator import CaseOperator
 from interpreter.program.program import Program
 from interpreter.program.statement import BreakStatement, ContinueStatement
+from interpreter.resolver import Resolver, LOCAL, GLOBAL
 from interpreter.visitor.visitor import Visitor
 
 num = int | float
 
 MAXIMUM_RECURSION_DEPTH = 900
 
+# slots of the frame of a builtin call, which visit_print and the others
+# look their argument up in
+BUILTIN_SLOTS = {"arg": 0}
+
+
+class _VarType:
+    """
+    Operand type of the Var to_str results in for a str. The Var has no
+    type, comparing this one fails as reading it would, so that an operation
+    only fails on it once all its operands have been evaluated.
+    """
+
+    def __eq__(self, other):
+        raise AttributeError("'Var' object has no attribute 'type'")
+
+    __ne__ = __eq__
+    __hash__ = object.__hash__
+
+
+_VAR_TYPE = _VarType()
+
 
 class Interpreter(Visitor, Builtins):
     def __init__(self, error_handler: ErrorHandler):
-        self._scope = GlobalScope()
+        self._resolver = Resolver(error_handler)
+        self._scope = SlotScope(self._resolver.global_slots)
         self._error_handler = error_handler
         self._last_value: Optional[Value] = None
+        # the type of the last operand evaluated by _operand
+        self._operand_type: Optional[DataType] = None
         [self._scope.update(b()) for b in BUILTINS]
         self._last_position: Optional[Position] = None
         self._return: bool = False
@@ -59,16 +89,67 @@ class Interpreter(Visitor, Builtins):
 
     def visit_program(self, program: Program):
         for stmt in program.statements:
-            stmt.accept(self)
+            self.execute(stmt)
+
+    def execute(self, statement: Statement) -> None:
+        """
+        Resolve a statement of the top level and run it.
+        """
+        try:
+            self._resolver.resolve(statement)
+        finally:
+            # even the globals of a statement failing to resolve get a slot
+            self._scope.grow()
+        statement.accept(self)
+
+    def _look_up(
+        self, depth: int, slot: Optional[int], name: str
+    ) -> Optional[Var | Function]:
+        if depth == LOCAL:
+            # a local variable not set yet reads the global of the same name
+            return self._scope.frame[slot] or self._scope.look_up_global(name)
+        if depth == GLOBAL:
+            return self._scope.glob[slot]
+        return None
 
     def visit_identifier_expression(self, expression: IdentifierExpression) -> Any:
-        var = self._scope.look_up(expression.name)
+        self._last_value = self._variable(expression).value
+
+    def _variable(self, expression: IdentifierExpression) -> Var | Function:
+        # _look_up inlined, variables are read the most
+        if expression.depth == LOCAL:
+            var = self._scope.frame[expression.slot] or self._scope.look_up_global(
+                expression.name
+            )
+        elif expression.depth == GLOBAL:
+            var = self._scope.glob[expression.slot]
+        else:
+            var = None
         if var is None:
             self._error_handler.not_defined(expression.position, expression.name)
-        self._last_value = var.value
+        return var
+
+    def _identifier(self, expression: IdentifierExpression) -> Any:
+        value = self._variable(expression).value
+        try:
+            self._operand_type = value.type
+        except AttributeError:
+            self._operand_type = _VAR_TYPE
+        return value.value
 
     def visit_literal(self, expression: Literal):
-        self._last_value = Value.from_literal(expression)
+        self._last_value = self._constant(expression)
+
+    def _constant(self, literal: Literal) -> Value:
+        value = literal.constant
+        if value is None:
+            value = literal.constant = Value.from_literal(literal)
+        return value
+
+    def _literal(self, expression: Literal) -> Any:
+        value = self._constant(expression)
+        self._operand_type = value.type
+        return value.value
 
     def visit_or_expression(self, expression: OrExpression):
         expression.left.accept(self)
@@ -76,11 +157,11 @@ class Interpreter(Visitor, Builtins):
         self._check_type(expression.position, left, DataType.BOOL)
 
         if left.value is True:
-            self._last_value = Value(DataType.BOOL, True)
+            self._last_value = TRUE
             return
 
         if expression.right is None:
-            self._last_value = Value(DataType.BOOL, left.value)
+            self._last_value = Value.from_bool(left.value)
             return
 
         expression.right.accept(self)
@@ -88,9 +169,9 @@ class Interpreter(Visitor, Builtins):
         self._check_type(expression.position, right, DataType.BOOL)
 
         if right.value is True:
-            self._last_value = Value(DataType.BOOL, True)
+            self._last_value = TRUE
             return
-        self._last_value = Value(DataType.BOOL, False)
+        self._last_value = FALSE
 
     def visit_and_expression(self, expression: AndExpression):
         expression.left.accept(self)
@@ -98,11 +179,11 @@ class Interpreter(Visitor, Builtins):
         self._check_type(expression.position, left, DataType.BOOL)
 
         if left.value is False:
-            self._last_value = Value(DataType.BOOL, False)
+            self._last_value = FALSE
             return
 
         if expression.right is None:
-            self._last_value = Value(DataType.BOOL, left.value)
+            self._last_value = Value.from_bool(left.value)
             return
 
         expression.right.accept(self)
@@ -110,103 +191,144 @@ class Interpreter(Visitor, Builtins):
         self._check_type(expression.position, right, DataType.BOOL)
 
         if right.value is False:
-            self._last_value = Value(DataType.BOOL, False)
+            self._last_value = FALSE
             return
-        self._last_value = Value(DataType.BOOL, True)
+        self._last_value = TRUE
+
+    def _operand(self, expression: Expression) -> Any:
+        """
+        Evaluate an operand of an arithmetic or relational expression and
+        leave its type in _operand_type.
+
+        :return: the raw value, an arithmetic operand never gets a Value
+        """
+        unboxed = _UNBOXED.get(expression.__class__)
+        if unboxed is not None:
+            return unboxed(self, expression)
+        expression.accept(self)
+        value = self._last_value
+        try:
+            self._operand_type = value.type
+        except AttributeError:
+            self._operand_type = _VAR_TYPE
+        return value.value
 
     def visit_relational_expression(self, expression: RelationalExpression):
-        expression.left.accept(self)
-        left = self._last_value
-        expression.right.accept(self)
-        right = self._last_value
+        left = self._operand(expression.left)
+        left_type = self._operand_type
+        right = self._operand(expression.right)
 
-        if left.type != right.type:
+        if left_type != self._operand_type:
             self._error_handler.operation_bad_types(expression.position)
             return
         match expression.operator:
             case RelationalOperator.LESS:
-                self._last_value = Value(DataType.BOOL, left.value < right.value)
+                self._last_value = Value.from_bool(left < right)
                 return
             case RelationalOperator.LESS_OR_EQ:
-                self._last_value = Value(DataType.BOOL, left.value <= right.value)
+                self._last_value = Value.from_bool(left <= right)
                 return
             case RelationalOperator.EQ:
-                self._last_value = Value(DataType.BOOL, left.value == right.value)
+                self._last_value = Value.from_bool(left == right)
                 return
             case RelationalOperator.NOT_EQ:
-                self._last_value = Value(DataType.BOOL, left.value != right.value)
+                self._last_value = Value.from_bool(left != right)
                 return
             case RelationalOperator.GREATER:
-                self._last_value = Value(DataType.BOOL, left.value > right.value)
+                self._last_value = Value.from_bool(left > right)
                 return
             case RelationalOperator.GREATER_OR_EQ:
-                self._last_value = Value(DataType.BOOL, left.value >= right.value)
+                self._last_value = Value.from_bool(left >= right)
                 return
-        self._last_value = Value(DataType.BOOL, False)
+        self._last_value = FALSE
 
     def visit_additive_expression(self, expression: AdditiveExpression):
-        expression.left.accept(self)
-        left = self._last_value
-        expression.right.accept(self)
-        right = self._last_value
+        self._last_value = Value(DataType.NUM, self._additive(expression))
+
+    def _additive(self, expression: AdditiveExpression) -> Any:
+        left = self._operand(expression.left)
+        left_type = self._operand_type
+        right = self._operand(expression.right)
 
-        if left.type != right.type:
+        if left_type != self._operand_type:
             self._error_handler.operation_bad_types(expression.position)
             return
+        self._operand_type = DataType.NUM
         match expression.operator:
             case AdditiveOperator.ADDITION:
-                self._last_value = Value(DataType.NUM, left.value + right.value)
-                return
-
+                return left + right
             case AdditiveOperator.SUBTRACTION:
-                self._last_value = Value(DataType.NUM, left.value - right.value)
-                return
+                return left - right
 
     def visit_multiplicative_expression(self, expression: MultiplicativeExpression):
-        expression.left.accept(self)
-        left = self._last_value
-        expression.right.accept(self)
-        right = self._last_value
+        self._last_value = Value(DataType.NUM, self._multiplicative(expression))
 
-        if left.type != right.type:
+    def _multiplicative(self, expression: MultiplicativeExpression) -> Any:
+        left = self._operand(expression.left)
+        left_type = self._operand_type
+        right = self._operand(expression.right)
+
+        if left_type != self._operand_type:
             self._error_handler.operation_bad_types(expression.position)
             return
+        self._operand_type = DataType.NUM
         match expression.operator:
             case MultiplicativeOperator.MULTIPLICATION:
-                self._last_value = Value(DataType.NUM, left.value * right.value)
-                return
+                return left * right
             case MultiplicativeOperator.DIVISION:
-                if right.value == 0:
+                if right == 0:
                     self._error_handler.zero_division(expression.position)
                     return
-                self._last_value = Value(DataType.NUM, left.value / right.value)
+                return left / right
             case MultiplicativeOperator.MODULO:
-                if right.value == 0:
+                if right == 0:
                     self._error_handler.zero_division(expression.position)
                     return
-                self._last_value = Value(DataType.NUM, left.value % right.value)
-                return
+                return left % right
 
     def visit_negated_expression(self, expression: NegatedFactor):
-        expression.factor.accept(self)
-        operand = self._last_value
+        value = self._negated(expression)
+        if self._operand_type == DataType.BOOL:
+            self._last_value = Value.from_bool(value)
+            return
+        self._last_value = Value(DataType.NUM, value)
+
+    def _negated(self, expression: NegatedFactor) -> Any:
+        # the result has the type of the operand
+        operand = self._operand(expression.factor)
         match expression.operator:
             case UnaryOperator.NEGATION:
-                if not operand.type == DataType.BOOL:
+                if not self._operand_type == DataType.BOOL:
                     self._error_handler.operation_bad_types(expression.position)
                     return
-                self._last_value = Value(DataType.BOOL, not operand.value)
-                return
+                return not operand
             case UnaryOperator.MINUS:
-                if not operand.type == DataType.NUM:
+                if not self._operand_type == DataType.NUM:
                     self._error_handler.operation_bad_types(expression.position)
                     return
-                self._last_value = Value(DataType.NUM, -operand.value)
-                return
+                return -operand
 
     def visit_parameter(self, parameter: Parameter):
         self._last_value = Param(parameter.name, parameter.mut)
 
+    def visit_lazy_block(self, block: LazyBlock):
+        parse_lazy_block(block, self._error_handler).accept(self)
+
+    def _parse_lazy_block(
+        self, block: LazyBlock, statement: FunctionCallStatement
+    ) -> Block:
+        """
+        Parse the body of a function on its first call, its syntax errors
+        are reported then.
+        """
+        errors = len(self._error_handler.errors)
+        parsed = parse_lazy_block(block, self._error_handler)
+        if len(self._error_handler.errors) > errors:
+            self._error_handler.invalid_function_body(
+                statement.position, statement.name
+            )
+        return parsed
+
     def visit_block(self, statements: Block) -> Any:
         for stmt in statements.statements:
             if self._return is True or self._break is True or self._continue is True:
@@ -270,8 +392,7 @@ class Interpreter(Visitor, Builtins):
             self._error_handler.unexpected_argument(case_stmt.identifier.position)
 
         for arg, param in zip(match_args, case_stmt.params):
-            var = Var(param.name, arg, param.mut)
-            self._scope.update(var)
+            self._scope.frame[param.slot] = Var(param.name, arg, param.mut)
         case_stmt.accept(self)
 
     def _pick_case(
@@ -356,11 +477,11 @@ class Interpreter(Visitor, Builtins):
         for p in statement.params:
             p.accept(self)
             params.append(self._last_value)
-        fn = Function(name, params, statement.body)
-        self._scope.update(fn)
+        fn = Function(name, params, statement.body, definition=statement)
+        self._scope.frame[statement.slot] = fn
 
     def visit_function_call_statement(self, statement: FunctionCallStatement):
-        fn = self._scope.look_up(statement.name)
+        fn = self._look_up(statement.depth, statement.slot, statement.name)
         if fn is None:
             self._error_handler.not_defined(statement.position, statement.name)
             return
@@ -381,19 +502,32 @@ class Interpreter(Visitor, Builtins):
             arg.accept(self)
             args.append(Var(param.name, self._last_value, param.mut))
 
+        if isinstance(fn.body, LazyBlock):
+            fn.body = self._parse_lazy_block(fn.body, statement)
+        if fn.definition is not None and fn.definition.locals is None:
+            self._resolver.resolve_function(fn.definition)
+            self._scope.grow()
+
         self._recursion_depth += 1
         if self._recursion_depth > MAXIMUM_RECURSION_DEPTH:
             self._error_handler.max_recursion_depth(statement.position)
             return
 
-        self._scope.fn_call(fn, *args)
-        self._last_value = Value(DataType.NULL, None)
-        if type(fn) != Function:
+        self._last_value = NULL
+        if fn.definition is None:
+            self._scope.fn_call(args, BUILTIN_SLOTS)
             self._last_position = statement.position
             fn.accept(self)
             self._scope.fn_return()
             return
 
+        definition = fn.definition
+        slots = definition.locals
+        frame = [None] * len(slots)
+        for var, param in zip(args, definition.params):
+            frame[param.slot] = var
+        frame[slots[fn.name]] = fn
+        self._scope.fn_call(frame, slots)
         fn.body.accept(self)
         self._scope.fn_return()
         self._return = False
@@ -405,19 +539,19 @@ class Interpreter(Visitor, Builtins):
 
     def visit_var_definition(self, statement: VarDefinition):
         name = statement.name
-        if self._scope.look_up(name):
+        if self._look_up(LOCAL, statement.slot, name):
             self._error_handler.already_defined(statement.position, name)
             return
 
         statement.expression.accept(self)
         expr = self._last_value
         mutable = statement.mut
-        self._scope.update(Var(name, expr, mutable))
+        self._scope.frame[statement.slot] = Var(name, expr, mutable)
 
     def visit_assignment(self, statement: Assignment):
         name = statement.name
 
-        if not (var := self._scope.look_up(name)):
+        if not (var := self._look_up(LOCAL, statement.slot, name)):
             self._error_handler.not_defined(statement.position, name)
             return
         if not var.mutable:
@@ -425,7 +559,8 @@ class Interpreter(Visitor, Builtins):
             return
         statement.expression.accept(self)
         expr = self._last_value
-        self._scope.update(Var(name, expr, var.mutable))
+        # set in the current scope, even when the variable is global
+        self._scope.frame[statement.slot] = Var(name, expr, var.mutable)
 
     def _check_type(self, position: Position, value: Value, expected: DataType) -> bool:
         if value.type != expected:
@@ -464,3 +599,14 @@ class Interpreter(Visitor, Builtins):
     def visit_input(self, fn: Input):
         res = input()
         self._last_value = Value(DataType.STR, res)
+
+
+# operands evaluated to a raw value without visiting them, the result of
+# arithmetic is only put in a Value at its root
+_UNBOXED = {
+    IdentifierExpression: Interpreter._identifier,
+    Literal: Interpreter._literal,
+    AdditiveExpression: Interpreter._additive,
+    MultiplicativeExpression: Interpreter._multiplicative,
+    NegatedFactor: Interpreter._negated,
+}
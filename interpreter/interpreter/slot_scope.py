@@ -0,0 +1,62 @@
+from typing import Dict, List, Optional, Tuple
+
+from interpreter.interpreter.function import Function
+from interpreter.interpreter.var import Var
+
+Frame = List[Optional[Var | Function]]
+
+
+class SlotScope:
+    """
+    Variables kept in lists at the slots the Resolver gave them: glob holds
+    the globals and frame the variables of the running call, glob itself
+    outside of any.
+    """
+
+    def __init__(self, global_slots: Dict[str, int]):
+        """
+        :param global_slots: slots of the globals by name, which the Resolver
+            adds to
+        """
+        self.global_slots = global_slots
+        self.glob: Frame = []
+        self.frame: Frame = self.glob
+        # the frames of the calls along with their slots by name
+        self.stack: List[Tuple[Frame, Dict[str, int]]] = []
+        self.grow()
+
+    def grow(self) -> None:
+        """
+        Make room for the globals resolved since the last time.
+        """
+        self.glob.extend([None] * (len(self.global_slots) - len(self.glob)))
+
+    def look_up(self, name: str) -> Optional[Var | Function]:
+        if self.stack:
+            frame, slots = self.stack[-1]
+            slot = slots.get(name)
+            if slot is not None and frame[slot] is not None:
+                return frame[slot]
+        return self.look_up_global(name)
+
+    def look_up_global(self, name: str) -> Optional[Var | Function]:
+        slot = self.global_slots.get(name)
+        return None if slot is None else self.glob[slot]
+
+    def update(self, var: Var | Function) -> None:
+        if self.stack:
+            frame, slots = self.stack[-1]
+            frame[slots[var.name]] = var
+            return
+        self.glob[self.global_slots[var.name]] = var
+
+    def fn_call(self, frame: Frame, slots: Dict[str, int]) -> None:
+        self.stack.append((frame, slots))
+        self.frame = frame
+
+    def fn_return(self) -> bool:
+        if len(self.stack) == 0:
+            return False
+        self.stack.pop()
+        self.frame = self.stack[-1][0] if self.stack else self.glob
+        return True
@@ -34,12 +34,30 @@ class DataType(Enum):
                 return "null"
 
 
-@dataclass
+@dataclass(slots=True)
 class Value:
+    """
+    Values are never changed once created, so equal ones may be shared.
+    """
+
     type: DataType
     value: str | int | float | bool | None
 
     @staticmethod
     def from_literal(literal: Literal) -> "Value":
+        match literal.type:
+            case LiteralType.BOOL:
+                return Value.from_bool(literal.value)
+            case LiteralType.NULL:
+                return NULL
         data_type = DataType.from_literal_type(literal.type)
         return Value(data_type, literal.value)
+
+    @staticmethod
+    def from_bool(value: bool) -> "Value":
+        return TRUE if value else FALSE
+
+
+TRUE = Value(DataType.BOOL, True)
+FALSE = Value(DataType.BOOL, False)
+NULL = Value(DataType.NULL, None)
@@ -1,2 +1,10 @@
 from interpreter.lexer.lexer import Lexer
 from interpreter.lexer.ilexer import ILexer
+from interpreter.lexer.regex_lexer import RegexLexer
+from interpreter.lexer.token_buffer import (
+    TokenBuffer,
+    TokenBufferLexer,
+    TokenListLexer,
+    tokenize_all,
+)
+from interpreter.lexer.parallel import tokenize_parallel
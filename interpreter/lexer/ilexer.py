@@ -1,10 +1,41 @@
 from abc import ABC, abstractmethod
-from typing import Optional
+from typing import Optional, Sequence, Tuple
 
-from interpreter.token import Token
+from interpreter.token import Token, TokenType
 
 
 class ILexer(ABC):
     @abstractmethod
     def next_token(self) -> Optional[Token]:
         ...
+
+    def skip_block(
+        self, token: Token
+    ) -> Tuple[Sequence[Token], bool, Optional[Token]]:
+        """
+        Read the tokens of a code block without parsing them.
+
+        :param token: the current token, the "{" the block starts with
+        :return: the tokens up to the matching "}" followed by an EOF token,
+            or up to the end of the source when the block is never closed,
+            whether it was closed and the token that follows them
+        """
+        tokens = [token]
+        depth = 1
+        while depth:
+            token = self.next_token()
+            if token is None or token.token_type == TokenType.EOF:
+                break
+            tokens.append(token)
+            if token.token_type == TokenType.LEFT_CURLY_BRACKET:
+                depth += 1
+            elif token.token_type == TokenType.RIGHT_CURLY_BRACKET:
+                depth -= 1
+        else:
+            token = self.next_token()
+
+        if token is not None and token.token_type == TokenType.EOF:
+            tokens.append(token)
+        else:
+            tokens.append(Token(TokenType.EOF, tokens[-1].position))
+        return tokens, depth == 0, token
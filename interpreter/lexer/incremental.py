@@ -0,0 +1,278 @@
+from array import array
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass, replace
+from typing import Any, List, Optional, Set, Tuple
+
+from interpreter.error_handler.error import Error
+from interpreter.error_handler.error_handler import ErrorHandler
+from interpreter.lexer.regex_lexer import Source, scan
+from interpreter.lexer.symbol_table import SymbolTable
+from interpreter.lexer.token_buffer import (
+    TokenBuffer,
+    TOKEN_TYPE_CODES,
+    NO_TOKEN,
+    tokenize_all,
+)
+from interpreter.position import Position
+from interpreter.reader.line_index import NEWLINE_PATTERN
+from interpreter.reader.memory_reader import BytesReader
+from interpreter.token import TokenType
+
+# single character tokens, which are never produced from the middle of a
+# string or a comment: lexing can restart in front of one of them, and stop
+# once it produces one where the old stream had it
+RESTART_TYPES = frozenset(
+    TOKEN_TYPE_CODES[token_type]
+    for token_type in (
+        TokenType.SEMICOLON,
+        TokenType.LEFT_CURLY_BRACKET,
+        TokenType.RIGHT_CURLY_BRACKET,
+        TokenType.LEFT_BRACKET,
+        TokenType.RIGHT_BRACKET,
+        TokenType.COMMA,
+        TokenType.COLON,
+    )
+)
+
+
+# bytes past the edit lexed at first
+WINDOW = 4096
+
+# type code, byte offset, row, column and value of a buffer entry
+Entry = Tuple[int, int, int, int, Any]
+
+
+@dataclass
+class Edit:
+    """
+    Bytes start..old_end of the old source replaced by bytes start..new_end
+    of the new one.
+    """
+
+    start: int
+    old_end: int
+    new_end: int
+
+    @property
+    def delta(self) -> int:
+        return self.new_end - self.old_end
+
+
+@dataclass
+class _Shift:
+    """
+    Moves the positions that follow an edit, columns only change on the row
+    the edit ends on.
+    """
+
+    offset: int
+    rows: int
+    columns: int
+    row: int
+
+    def position(self, position: Position) -> Position:
+        column = position.column
+        if position.row == self.row:
+            column += self.columns
+        return Position(
+            position.position + self.offset, position.row + self.rows, column
+        )
+
+
+def relex(
+    buffer: TokenBuffer,
+    source: bytes,
+    edit: Edit,
+    symbol_table: Optional[SymbolTable] = None,
+) -> TokenBuffer:
+    """
+    Update the token buffer of a source after an edit, in place.
+
+    Lexing restarts in front of the last punctuation token before the edit
+    and stops once it produces a punctuation token at the same spot as an old
+    one past the edit. From a token boundary the lexer only depends on the
+    text that follows, which the edit left as it was, so the old entries from
+    there on are kept with shifted positions.
+
+    :param source: the whole source after the edit
+    :return: the updated buffer
+    """
+    match = NEWLINE_PATTERN.search(source)
+    newline_symbol = match.group().decode() if match is not None else None
+    if newline_symbol != buffer.newline_symbol:
+        # the line breaks of the whole source are told apart differently now
+        reader = BytesReader(source)
+        retokenized = tokenize_all(reader, symbol_table, buffer.skip_comments)
+        vars(buffer).update(vars(retokenized))
+        return buffer
+
+    error_entries = {index for index, _ in buffer.errors}
+    first = _restart_entry(buffer, edit.start, error_entries)
+    start = Position(0, 1, 1)
+    if first is None:
+        first = 0
+    else:
+        # the token is one character wide, so its position is one past it
+        start = Position(
+            buffer.offsets[first] - 1, buffer.rows[first], buffer.columns[first] - 1
+        )
+
+    # lex a window of the source after the restart point, the tokens before
+    # an old entry coming up all lie within it, otherwise try a larger one
+    window = WINDOW
+    while True:
+        window_end = max(edit.new_end, start.position) + window
+        data = source[start.position : window_end]
+        text = data.decode(errors="surrogateescape")
+        entries, errors, end, shift = _lex_until_known(
+            buffer,
+            Source(text, newline_symbol, start),
+            edit,
+            first,
+            error_entries,
+            symbol_table,
+        )
+        if shift is not None or window_end >= len(source):
+            break
+        window *= 2
+    _splice(buffer, first, end, entries, errors, shift)
+    return buffer
+
+
+def _restart_entry(
+    buffer: TokenBuffer, offset: int, error_entries: Set[int]
+) -> Optional[int]:
+    """
+    :return: index of the last punctuation entry that ends before the offset
+    """
+    index = min(bisect_right(buffer.offsets, offset), len(buffer)) - 1
+    while index >= 0:
+        if (
+            buffer.types[index] in RESTART_TYPES
+            and buffer.offsets[index] <= offset
+            and index not in error_entries
+        ):
+            return index
+        index -= 1
+    return None
+
+
+def _old_entry(
+    buffer: TokenBuffer,
+    code: int,
+    offset: int,
+    first: int,
+    error_entries: Set[int],
+) -> Optional[int]:
+    """
+    :return: index of the old entry of the given type and offset, if any
+    """
+    index = bisect_left(buffer.offsets, offset, first)
+    while index < len(buffer) and buffer.offsets[index] == offset:
+        if buffer.types[index] == code and index not in error_entries:
+            return index
+        index += 1
+    return None
+
+
+def _lex_until_known(
+    buffer: TokenBuffer,
+    source: Source,
+    edit: Edit,
+    first: int,
+    error_entries: Set[int],
+    symbol_table: Optional[SymbolTable],
+) -> Tuple[List[Entry], List[Tuple[int, Error]], int, Optional[_Shift]]:
+    """
+    Lex from the restart point until an entry of the old buffer comes up.
+
+    :return: the new entries, the errors reported with them, the index of the
+        first old entry that is kept and the shift of its position
+    """
+    error_handler = ErrorHandler()
+    reported = error_handler.errors
+    locate = source.locator()
+    entries = []
+    errors = []
+    stuck_at = None
+    for token_type, index, value in scan(
+        source,
+        error_handler,
+        symbol_table=symbol_table,
+        skip_comments=buffer.skip_comments,
+    ):
+        if len(reported) > len(errors):
+            errors.extend((len(entries), error) for error in reported[len(errors) :])
+        if token_type is None:
+            if stuck_at == index:
+                break
+            stuck_at = index
+            code = NO_TOKEN
+        else:
+            stuck_at = None
+            code = TOKEN_TYPE_CODES[token_type]
+        offset, row, column = locate(index)
+        if (
+            code in RESTART_TYPES
+            and offset - 1 >= edit.new_end
+            and not (errors and errors[-1][0] == len(entries))
+        ):
+            known = _old_entry(buffer, code, offset - edit.delta, first, error_entries)
+            if known is not None:
+                row_shift = row - buffer.rows[known]
+                column_shift = column - buffer.columns[known]
+                shift = _Shift(edit.delta, row_shift, column_shift, buffer.rows[known])
+                return entries, errors, known, shift
+        entries.append((code, offset, row, column, value))
+        if token_type == TokenType.EOF:
+            break
+    return entries, errors, len(buffer), None
+
+
+def _splice(
+    buffer: TokenBuffer,
+    first: int,
+    end: int,
+    entries: List[Entry],
+    errors: List[Tuple[int, Error]],
+    shift: Optional[_Shift],
+) -> None:
+    """
+    Replace the entries first..end of the buffer with the new ones and shift
+    the positions of the entries that follow.
+    """
+    if shift is not None:
+        _shift_entries(buffer, end, shift)
+    codes, offsets, rows, columns, values = zip(*entries) if entries else ([],) * 5
+    buffer.types[first:end] = array("B", codes)
+    buffer.offsets[first:end] = array("I", offsets)
+    buffer.rows[first:end] = array("I", rows)
+    buffer.columns[first:end] = array("I", columns)
+    value_ids = (0 if value is None else buffer._value_id(value) for value in values)
+    buffer.value_ids[first:end] = array("I", value_ids)
+
+    moved = first + len(entries) - end
+    buffer.errors = (
+        [(index, error) for index, error in buffer.errors if index < first]
+        + [(first + index, error) for index, error in errors]
+        + [
+            (index + moved, replace(error, position=shift.position(error.position)))
+            for index, error in buffer.errors
+            if index >= end
+        ]
+    )
+
+
+def _shift_entries(buffer: TokenBuffer, first: int, shift: _Shift) -> None:
+    if shift.offset:
+        buffer.offsets[first:] = array(
+            "I", [offset + shift.offset for offset in buffer.offsets[first:]]
+        )
+    index = first
+    while shift.columns and index < len(buffer) and buffer.rows[index] == shift.row:
+        buffer.columns[index] += shift.columns
+        index += 1
+    if shift.rows:
+        buffer.rows[first:] = array(
+            "I", [row + shift.rows for row in buffer.rows[first:]]
+        )
@@ -1,7 +1,10 @@
-from typing import Optional, Literal, Tuple
+import re
+from typing import Optional, Literal
 
 from interpreter.lexer.ilexer import ILexer
+from interpreter.lexer.symbol_table import SymbolTable
 from interpreter.error_handler.error_handler import ErrorHandler
+from interpreter.position import Position
 from interpreter.reader.reader import Reader
 from interpreter.token import Token, TokenType
 
@@ -10,6 +13,9 @@ INT_LEN = 39
 SingleQuote = Literal["'"]
 DoubleQuote = Literal['"']
 
+# characters a string literal is scanned up to in one step
+STRING_STOP_PATTERNS = {quote: re.compile(rb"[\\%c]" % ord(quote)) for quote in "'\""}
+
 
 class Lexer(ILexer):
     keywords = {
@@ -83,17 +89,38 @@ class Lexer(ILexer):
         "\\f": "\f",
     }
 
-    def __init__(self, reader: Reader, error_handler: ErrorHandler):
+    def __init__(
+        self,
+        reader: Reader,
+        error_handler: ErrorHandler,
+        symbol_table: Optional[SymbolTable] = None,
+        skip_comments: bool = False,
+    ):
+        """
+        :param skip_comments: skip comments like whitespace, without reading
+            their text, instead of producing comment tokens
+        """
         self._reader = reader
         self._error_handler = error_handler
+        self._symbol_table = SymbolTable() if symbol_table is None else symbol_table
+        self._skip_comments = skip_comments
         self._char = self._next_char()
 
+    @property
+    def symbol_table(self) -> SymbolTable:
+        return self._symbol_table
+
     def _next_char(self) -> Optional[str]:
         self._char = self._reader.get_char()
         return self._char
 
     def next_token(self) -> Optional[Token]:
         self._skip_whitespaces()
+        if self._skip_comments:
+            while self._char == "/" and self._reader.peek_char() in ("/", "*"):
+                if not self._skip_comment():
+                    return None
+                self._skip_whitespaces()
 
         return (
             self._build_eof()
@@ -115,14 +142,16 @@ class Lexer(ILexer):
         position = self._reader.position
         if base is None:
             return None
-        value = float(base)
+        literal = str(base)
         if self._char == ".":
             self._next_char()
-            if self._char.isdigit():
-                fraction = self._build_fraction()
-                value += fraction
-                return Token(TokenType.NUM, position, value)
-        return Token(TokenType.NUM, position, value)
+            if self._char is not None and self._char.isdigit():
+                fraction = self._build_digit_sequence()
+                if fraction is None:
+                    return None
+                literal = f"{base}.{fraction}"
+        # converting the whole literal rounds it correctly
+        return Token(TokenType.NUM, position, float(literal))
 
     def _build_base(self) -> Optional[int]:
         if int(self._char) == 0:
@@ -131,28 +160,28 @@ class Lexer(ILexer):
                 return None
             return 0
 
-        res = self._build_digit_sequence()
-        if res is not None:
-            return res[0]
+        digits = self._build_digit_sequence()
+        if digits is not None:
+            return int(digits)
         return None
 
-    def _build_fraction(self) -> float:
-        value, radix = self._build_digit_sequence()
-        return value / (10**radix)
-
-    def _build_digit_sequence(self) -> Optional[Tuple[int, int]]:
-        length = 0
-        value = 0
-        while self._char is not None and self._char.isdigit():
-            value = value * 10 + int(self._char)
-            length += 1
-            if length > INT_LEN:
-                self._error_handler.num_overflow_error(self._reader.position)
-                while self._char is not None and self._char.isdigit():
-                    self._next_char()
-                return None
-            self._next_char()
-        return value, length
+    def _build_digit_sequence(self) -> Optional[str]:
+        """
+        Read the run of digits starting at the current char at once.
+
+        :return: the digits, None if there are more than INT_LEN of them
+        """
+        start = self._reader.position
+        digits = self._char + self._reader.read_digits()
+        self._next_char()
+        if len(digits) > INT_LEN:
+            # reported once the first digit too many has been read
+            offset = start.position + len(digits[1 : INT_LEN + 1].encode())
+            self._error_handler.num_overflow_error(
+                Position(offset, start.row, start.column + INT_LEN)
+            )
+            return None
+        return digits
 
     def _build_div_operator_or_comment(self) -> Optional[Token]:
         if self._char != "/":
@@ -177,6 +206,27 @@ class Lexer(ILexer):
             self._next_char()
             return Token(TokenType.MULTILINE_COMMENT, position, comment)
 
+    def _skip_comment(self) -> bool:
+        """
+        Skip the comment starting at the current char, scanning the source
+        straight to its end.
+
+        :return: False if a multiline comment is not terminated
+        """
+        position = self._reader.position
+        if self._next_char() == "/":
+            self._reader.skip_line()
+            self._next_char()
+            return True
+        if not self._reader.skip_to(b"*/"):
+            self._next_char()
+            self._error_handler.unexpected_end_of_text(position)
+            return False
+        self._next_char()
+        self._next_char()
+        self._next_char()
+        return True
+
     def _build_str(self) -> Optional[Token]:
         return self._build_str_quote('"') or self._build_str_quote("'")
 
@@ -185,29 +235,31 @@ class Lexer(ILexer):
             position = self._reader.position
             string = self._build_string_quote(quote)
             if string is not None:
+                string = self._symbol_table.intern_string(string)
                 return Token(TokenType.STR, position, string)
 
     def _build_string_quote(self, quote: SingleQuote | DoubleQuote) -> Optional[str]:
-        string = ""
-        while self._next_char() != quote:
+        parts = []
+        while True:
+            # the run of plain characters up to the next quote or backslash
+            parts.append(self._reader.read_until(STRING_STOP_PATTERNS[quote]))
+            if self._next_char() == quote:
+                break
             if self._char is None:
                 self._error_handler.unexpected_end_of_text(self._reader.position)
                 return None
-            if self._char == "\\":
-                next_char = self._reader.read_char()
-                if next_char is None:
-                    self._error_handler.unexpected_end_of_text(self._reader.position)
-                    return None
-                escape_char = self.escape_chars.get(self._char + next_char)
-                if escape_char is not None:
-                    string += escape_char
-                    self._next_char()
-                else:
-                    string += "\\"
+            next_char = self._reader.read_char()
+            if next_char is None:
+                self._error_handler.unexpected_end_of_text(self._reader.position)
+                return None
+            escape_char = self.escape_chars.get(self._char + next_char)
+            if escape_char is not None:
+                parts.append(escape_char)
+                self._next_char()
             else:
-                string += self._char
+                parts.append("\\")
         self._next_char()
-        return string
+        return "".join(parts)
 
     def _build_operator(self) -> Optional[Token]:
         position = self._reader.position
@@ -241,7 +293,8 @@ class Lexer(ILexer):
                 buffer += self._char
             if buffer in self.keywords:
                 return Token(self.keywords[buffer], position)
-            return Token(TokenType.IDENTIFIER, position, buffer)
+            name = self._symbol_table.intern(buffer)
+            return Token(TokenType.IDENTIFIER, position, name)
 
     def _build_eof(self) -> Optional[Token]:
         if self._char is None:
@@ -0,0 +1,207 @@
+import re
+from array import array
+from bisect import bisect_left
+from concurrent.futures import ProcessPoolExecutor
+from typing import Container, List, Optional, Tuple
+
+from interpreter.lexer.regex_lexer import Source
+from interpreter.lexer.symbol_table import SymbolTable
+from interpreter.lexer.token_buffer import TokenBuffer, tokenize_source
+from interpreter.position import Position
+from interpreter.reader.reader import Reader
+
+# characters of the tokens the source is split after
+SPLIT_PATTERN = re.compile(r"[;}]")
+# strings and comments, which split points are looked for outside of; a
+# chunk that was split within one all the same is lexed again sequentially
+LITERAL_PATTERN = re.compile(
+    r"""
+    "[^"\\]*(?:\\.[^"\\]*)*"?
+  | '[^'\\]*(?:\\.[^'\\]*)*'?
+  | //[^\r\n]*
+  | /\*.*?(?:\*/|\Z)
+    """,
+    re.VERBOSE | re.DOTALL,
+)
+
+# characters lexed by a worker at once
+CHUNK_SIZE = 1 << 20
+
+
+def tokenize_parallel(
+    reader: Reader,
+    symbol_table: Optional[SymbolTable] = None,
+    workers: Optional[int] = None,
+    chunk_size: int = CHUNK_SIZE,
+    skip_comments: bool = False,
+) -> TokenBuffer:
+    """
+    Tokenize the rest of the reader's source like tokenize_all, lexing chunks
+    of it in worker processes.
+
+    The source is split after a semicolon or a right curly bracket every
+    chunk_size characters. A worker lexes its chunk and goes on past its end
+    up to the first semicolon or right curly bracket token, the handoff. A
+    split point may lie within a string or a comment, so the tokens of the
+    next chunk are only kept from the handoff on, once that chunk produced
+    the same token there: from a token boundary the lexer only depends on the
+    text that follows. Where it did not, lexing goes on sequentially up to a
+    later handoff.
+
+    :param workers: number of worker processes, as many as CPUs by default
+    :param skip_comments: leave comments out of the buffer
+    """
+    source = Source.from_reader(reader)
+    text = source.text
+    if symbol_table is None:
+        symbol_table = SymbolTable()
+    bounds = _split_points(text, chunk_size)
+    if len(bounds) == 1:
+        buffer, _ = tokenize_source(source, symbol_table, skip_comments=skip_comments)
+        return buffer
+
+    locate = source.locator(Position)
+    # a worker lexes up to the end of the chunk after its own at most
+    ends = bounds[2:] + [len(text)] * 2
+    buffer = TokenBuffer()
+    buffer.newline_symbol = source.newline_symbol
+    buffer.skip_comments = skip_comments
+    with ProcessPoolExecutor(workers) as executor:
+        futures = []
+        for index, (bound, end) in enumerate(zip(bounds, ends)):
+            chunk = Source(text[bound:end], source.newline_symbol, locate(bound))
+            stops: Container[int] = ()
+            if index + 1 < len(bounds):
+                stops = range(bounds[index + 1] - bound, end - bound + 1)
+            futures.append(
+                executor.submit(
+                    _lex_chunk,
+                    chunk,
+                    stops,
+                    symbol_table.max_string_length,
+                    skip_comments,
+                )
+            )
+
+        index = 0
+        # index of the character lexing has reached, at a token boundary
+        reached = 0
+        while True:
+            chunk_buffer, chunk_table, handoff = futures[index].result()
+            first = _resync(buffer, chunk_buffer, reached - bounds[index])
+            if first is not None and (handoff is not None or ends[index] == len(text)):
+                _append(buffer, chunk_buffer, first, chunk_table, symbol_table)
+                if handoff is None:
+                    break
+                reached = bounds[index] + handoff
+                index += 1
+                continue
+
+            # the chunk was lexed differently, from a split point within a
+            # string or a comment, or the handoff lies too far past its end
+            start = source.start
+            if len(buffer):
+                start = buffer.position(len(buffer) - 1)
+            rest = Source(text[reached:], source.newline_symbol, start)
+            handoffs = {}
+            for later in range(index, len(bounds) - 1):
+                later_handoff = futures[later].result()[2]
+                if later_handoff is not None:
+                    handoffs[bounds[later] + later_handoff - reached] = later
+            rest_table = SymbolTable(symbol_table.max_string_length)
+            rest_buffer, stop = tokenize_source(
+                rest, rest_table, handoffs, skip_comments
+            )
+            _append(buffer, rest_buffer, 0, rest_table, symbol_table)
+            if stop is None:
+                break
+            reached += stop
+            index = handoffs[stop] + 1
+        for future in futures:
+            future.cancel()
+    return buffer
+
+
+def _split_points(text: str, chunk_size: int) -> List[int]:
+    """
+    :return: indices the chunks of the text start at, each one right after a
+        semicolon or a right curly bracket that is not within one of the
+        strings and comments found by LITERAL_PATTERN
+    """
+    bounds = [0]
+    target = chunk_size - 1
+    code_start = 0
+    literals = LITERAL_PATTERN.finditer(text)
+    while True:
+        literal = next(literals, None)
+        code_end = len(text) if literal is None else literal.start()
+        while target < code_end:
+            split = SPLIT_PATTERN.search(text, max(target, code_start), code_end)
+            if split is None:
+                break
+            if split.end() == len(text):
+                return bounds
+            bounds.append(split.end())
+            target = split.end() + chunk_size - 1
+        if literal is None:
+            return bounds
+        code_start = literal.end()
+
+
+def _lex_chunk(
+    chunk: Source, stops: Container[int], max_string_length: int, skip_comments: bool
+) -> Tuple[TokenBuffer, SymbolTable, Optional[int]]:
+    symbol_table = SymbolTable(max_string_length)
+    buffer, handoff = tokenize_source(chunk, symbol_table, stops, skip_comments)
+    return buffer, symbol_table, handoff
+
+
+def _resync(buffer: TokenBuffer, chunk: TokenBuffer, reached: int) -> Optional[int]:
+    """
+    :param reached: index of the chunk's text lexing has reached, right after
+        the last token of the buffer
+    :return: index of the chunk's first entry that follows that token, None
+        if the chunk does not have it
+    """
+    if reached == 0:
+        return 0
+    last = len(buffer) - 1
+    code, offset = buffer.types[last], buffer.offsets[last]
+    index = bisect_left(chunk.offsets, offset)
+    while index < len(chunk) and chunk.offsets[index] == offset:
+        if chunk.types[index] == code:
+            return index + 1
+        index += 1
+    return None
+
+
+def _append(
+    buffer: TokenBuffer,
+    chunk: TokenBuffer,
+    first: int,
+    chunk_table: SymbolTable,
+    symbol_table: SymbolTable,
+) -> None:
+    """
+    Append the entries of a chunk's buffer from first on, moving their values
+    to the buffer and interning the names among them in the symbol table.
+    """
+    moved = len(buffer) - first
+    buffer.errors.extend(
+        (index + moved, error) for index, error in chunk.errors if index >= first
+    )
+    value_ids = [0] * len(chunk.values)
+    # in the order of their first use, like the sequential lexer adds them
+    for value_id in dict.fromkeys(chunk.value_ids[first:]):
+        value = chunk.values[value_id]
+        if value is not None:
+            if value in chunk_table:
+                value = symbol_table.intern(value)
+            value_ids[value_id] = buffer._value_id(value)
+    buffer.types.extend(chunk.types[first:])
+    buffer.offsets.extend(chunk.offsets[first:])
+    buffer.rows.extend(chunk.rows[first:])
+    buffer.columns.extend(chunk.columns[first:])
+    buffer.value_ids.extend(
+        array("I", map(value_ids.__getitem__, chunk.value_ids[first:]))
+    )
@@ -0,0 +1,344 @@
+import re
+from dataclasses import dataclass, field
+from typing import Any, Callable, Iterator, Optional, Tuple, TypeVar
+
+from interpreter.error_handler.error_handler import ErrorHandler
+from interpreter.lexer.ilexer import ILexer
+from interpreter.lexer.lexer import Lexer, INT_LEN
+from interpreter.lexer.symbol_table import SymbolTable
+from interpreter.position import Position
+from interpreter.reader.reader import (
+    Reader,
+    DEFAULT_NEW_LINE_SYMBOL,
+    INVALID_BYTE_PATTERN,
+    INVALID_BYTES,
+)
+from interpreter.token import Token, TokenType
+
+OPERATORS = {
+    **Lexer.two_char_logical_operators,
+    **Lexer.one_char_logical_operators,
+    **Lexer.one_char_arithmetic_operators,
+}
+
+# token alternatives tried once the previous number turned out to be invalid,
+# in the order Lexer.next_token falls through its builders
+_FALLBACK_ALTERNATIVES = r"""
+    (?P<str>"[^"\\]*(?:\\.[^"\\]*)*"|'[^'\\]*(?:\\.[^'\\]*)*')
+  | (?P<unterminated_str>["'])
+  | (?P<operator>[=!<>]=?|[-+*/%{}():;,])
+  | (?P<name>[^\W\d]\w*)
+"""
+
+TOKEN_PATTERN = re.compile(
+    rf"""
+    \s*
+    (?:
+        (?P<comment>//|/\*)
+      | (?P<num>\d+(?:\.\d*)?)
+      | {_FALLBACK_ALTERNATIVES}
+    )?
+    """,
+    re.VERBOSE | re.DOTALL,
+)
+FALLBACK_PATTERN = re.compile(_FALLBACK_ALTERNATIVES, re.VERBOSE | re.DOTALL)
+
+STRING_BODY_PATTERNS = {
+    quote: re.compile(rf"[^{quote}\\]*(?:\\.[^{quote}\\]*)*", re.DOTALL)
+    for quote in "\"'"
+}
+ESCAPE_PATTERN = re.compile(r"\\[\\'\"nrtbf]")
+
+# Lexer ends a one line comment on the newline symbol and on a bare "\n"
+ONE_LINE_COMMENT_PATTERNS = {
+    None: re.compile(r"[^\n]*"),
+    "\n": re.compile(r"[^\n]*"),
+    "\r": re.compile(r"[^\r\n]*"),
+    "\r\n": re.compile(r"(?:[^\r\n]|\r(?!\n))*"),
+}
+
+
+T = TypeVar("T")
+
+
+def location(offset: int, row: int, column: int) -> Tuple[int, int, int]:
+    return offset, row, column
+
+
+# one result of next_token: the token type, the index of the character whose
+# position the token takes and the value; None in place of the type when no
+# token is produced, along with the index the scan stopped at
+RawToken = Tuple[Optional[TokenType], int, Any]
+
+
+@dataclass
+class Source:
+    """
+    Source text decoded at once, the input of the regex engine. Bytes that
+    are not valid UTF-8 are decoded as lone surrogates, so that each of them
+    still stands for one character.
+    """
+
+    text: str
+    newline_symbol: Optional[str] = None
+    start: Position = field(default_factory=lambda: Position(0, 1, 1))
+
+    def __post_init__(self):
+        self.invalid_bytes = INVALID_BYTE_PATTERN.search(self.text) is not None
+
+    @classmethod
+    def from_reader(cls, reader: Reader) -> "Source":
+        start = reader.position
+        text = reader.read_remaining().decode(errors="surrogateescape")
+        symbol = reader.newline_symbol
+        return cls(text, symbol.decode() if symbol is not None else None, start)
+
+    def locator(
+        self, build: Callable[[int, int, int], T] = location
+    ) -> Callable[[int], T]:
+        """
+        :param build: called with the byte offset, row and column of a lookup
+        :return: function mapping a character index of the text to the
+            location Reader reports once that many characters have been read.
+            Lookups are cheapest in increasing order, as they resume where
+            the previous one stopped.
+        """
+        text, newline_symbol, start = self.text, self.newline_symbol, self.start
+        ascii_text = text.isascii()
+        never = len(text) + 1
+        row = line_start = next_newline = byte_index = byte_offset = 0
+
+        def find_newline(index: int) -> int:
+            if newline_symbol is None:
+                return never
+            found = text.find(newline_symbol, index)
+            return never if found == -1 else found
+
+        def reset():
+            nonlocal row, line_start, next_newline, byte_index, byte_offset
+            row = start.row
+            # index of the first character of the current line
+            line_start = 1 - start.column
+            next_newline = find_newline(0)
+            byte_index, byte_offset = 0, start.position
+
+        def locate(index: int) -> T:
+            nonlocal row, line_start, next_newline, byte_index, byte_offset
+            if index < line_start or index < byte_index:
+                reset()
+            while index > next_newline:
+                row += 1
+                line_start = next_newline + len(newline_symbol)
+                next_newline = find_newline(line_start)
+            if ascii_text:
+                return build(start.position + index, row, index - line_start + 1)
+            byte_offset += len(text[byte_index:index].encode(errors="surrogateescape"))
+            byte_index = index
+            return build(byte_offset, row, index - line_start + 1)
+
+        reset()
+        return locate
+
+    def decode(self, value: str) -> str:
+        """
+        :return: value as Reader would have returned it, with U+FFFD for
+            invalid bytes and "\\n" for the newline symbol
+        """
+        if self.invalid_bytes:
+            value = value.translate(INVALID_BYTES)
+        symbol = self.newline_symbol
+        if symbol is not None and symbol != DEFAULT_NEW_LINE_SYMBOL:
+            value = value.replace(symbol, DEFAULT_NEW_LINE_SYMBOL)
+        return value
+
+
+def scan(
+    source: Source,
+    error_handler: ErrorHandler,
+    position: Optional[Callable[[int], Position]] = None,
+    symbol_table: Optional[SymbolTable] = None,
+    skip_comments: bool = False,
+) -> Iterator[RawToken]:
+    """
+    Yield the results of Lexer.next_token for the source, without building
+    Token and Position objects. After the end of the text it keeps yielding
+    EOF, and it keeps yielding no token once stuck on a character that does
+    not start any token, like Lexer.
+
+    :param skip_comments: skip comments without decoding their text, like
+        Lexer in that mode
+    """
+    text = source.text
+    end = len(text)
+    symbol = source.newline_symbol
+    position = position or source.locator(Position)
+    match_token = TOKEN_PATTERN.match
+    keywords = Lexer.keywords
+    if symbol_table is None:
+        symbol_table = SymbolTable()
+    intern = symbol_table.intern
+    index = 0
+    fallback = None
+
+    def after(index: int) -> int:
+        """
+        :return: index once the character at the given one has been read
+        """
+        if index >= end:
+            return end
+        if symbol is not None and text.startswith(symbol, index):
+            return index + len(symbol)
+        return index + 1
+
+    def is_digit(index: int) -> bool:
+        """
+        Lexer takes any str.isdigit character, such as superscripts, for a
+        digit, while the regex only matches decimal ones
+        """
+        return index < end and text[index].isdigit()
+
+    while True:
+        if fallback is None:
+            match = match_token(text, index)
+        else:
+            # Lexer goes on with its remaining builders after a bad number
+            index, fallback = fallback, None
+            match = FALLBACK_PATTERN.match(text, index)
+            if match is None:
+                yield None, index, None
+                continue
+
+        kind = match.lastgroup
+        if kind is None:
+            index = match.end()
+            # a character no token starts with is left in place
+            yield (TokenType.EOF if index == end else None), index, None
+            continue
+
+        start, index = match.span(kind)
+        if kind == "name":
+            name = match[kind]
+            if not name.isascii():
+                name = _identifier_prefix(name)
+                index = start + len(name)
+                if not name:
+                    yield None, index, None
+                    continue
+            token_type = keywords.get(name)
+            if token_type is None:
+                yield TokenType.IDENTIFIER, start + 1, intern(name)
+            else:
+                yield token_type, start + 1, None
+        elif kind == "operator":
+            yield OPERATORS[match[kind]], start + 1, None
+        elif kind == "num":
+            integer, _, fraction = match[kind].partition(".")
+            integer_end = start + len(integer)
+            if int(integer[0]) == 0 and (
+                integer_end > start + 1 or is_digit(start + 1)
+            ):
+                error_handler.leading_zero(position(after(start + 1)))
+                fallback = start + 1
+                continue
+            if len(integer) > INT_LEN:
+                error_handler.num_overflow_error(position(after(start + INT_LEN)))
+                fallback = integer_end
+                while is_digit(fallback):
+                    fallback += 1
+                continue
+            if len(fraction) > INT_LEN:
+                error_handler.num_overflow_error(
+                    position(after(integer_end + 1 + INT_LEN))
+                )
+                fallback = index
+                while is_digit(fallback):
+                    fallback += 1
+                continue
+            yield TokenType.NUM, after(integer_end), float(match[kind])
+        elif kind == "str":
+            string = text[start + 1 : index - 1]
+            if "\\" in string:
+                string = ESCAPE_PATTERN.sub(_unescape, string)
+            string = symbol_table.intern_string(source.decode(string))
+            yield TokenType.STR, start + 1, string
+        elif kind == "comment":
+            if match[kind] == "//":
+                pattern = ONE_LINE_COMMENT_PATTERNS[symbol]
+                index = pattern.match(text, index).end()
+                if skip_comments:
+                    continue
+                comment = source.decode(text[start + 2 : index])
+                yield TokenType.ONE_LINE_COMMENT, start + 1, comment
+                continue
+            comment_end = text.find("*/", index)
+            if comment_end == -1:
+                index = end
+                error_handler.unexpected_end_of_text(position(start + 1))
+                yield None, index, None
+                continue
+            index = comment_end + 2
+            if skip_comments:
+                continue
+            comment = source.decode(text[start + 2 : comment_end])
+            yield TokenType.MULTILINE_COMMENT, start + 1, comment
+        else:
+            # unterminated string, Lexer stops in front of a backslash that
+            # escapes the end of the text
+            pattern = STRING_BODY_PATTERNS[match[kind]]
+            index = pattern.match(text, start + 1).end()
+            error_handler.unexpected_end_of_text(position(end))
+            yield None, index, None
+
+
+class RegexLexer(ILexer):
+    """
+    Lexer engine matching one master regex with a named group per token kind
+    over the whole decoded source, instead of reading it char by char.
+
+    Produces the same tokens, positions and errors as Lexer.
+    """
+
+    def __init__(
+        self,
+        reader: Reader,
+        error_handler: ErrorHandler,
+        symbol_table: Optional[SymbolTable] = None,
+        skip_comments: bool = False,
+    ):
+        source = Source.from_reader(reader)
+        self._symbol_table = SymbolTable() if symbol_table is None else symbol_table
+        self._position = source.locator(Position)
+        self._tokens = scan(
+            source,
+            error_handler,
+            self._position,
+            self._symbol_table,
+            skip_comments,
+        )
+
+    @property
+    def symbol_table(self) -> SymbolTable:
+        return self._symbol_table
+
+    def next_token(self) -> Optional[Token]:
+        token_type, index, value = next(self._tokens)
+        if token_type is None:
+            return None
+        return Token(token_type, self._position(index), value)
+
+
+def _unescape(escape: re.Match) -> str:
+    return Lexer.escape_chars[escape.group()]
+
+
+def _identifier_prefix(name: str) -> str:
+    """
+    Trim a non-ASCII match of the name group to what Lexer accepts: the
+    regex word class also admits numeric characters that are not letters.
+    """
+    if not (name[0].isalpha() or name[0] == "_"):
+        return ""
+    for index, char in enumerate(name):
+        if not (char.isalpha() or char.isdigit() or char == "_"):
+            return name[:index]
+    return name
@@ -0,0 +1,40 @@
+from typing import Dict, Iterator
+
+
+class SymbolTable:
+    """
+    Per-compilation table of the names in a program. Every occurrence of a
+    name shares one string object, as with sys.intern but only for the
+    lifetime of the table, so that later stages compare names by identity
+    and hash them without rehashing copies.
+
+    String literals up to max_string_length characters are interned as well,
+    0 disables that.
+    """
+
+    def __init__(self, max_string_length: int = 0):
+        self.max_string_length = max_string_length
+        self._names: Dict[str, str] = {}
+
+    def intern(self, name: str) -> str:
+        """
+        :return: the shared string object equal to name
+        """
+        return self._names.setdefault(name, name)
+
+    def intern_string(self, string: str) -> str:
+        if len(string) > self.max_string_length:
+            return string
+        return self.intern(string)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._names
+
+    def __iter__(self) -> Iterator[str]:
+        """
+        :return: iterator over the names in the order they were interned
+        """
+        return iter(self._names)
+
+    def __len__(self) -> int:
+        return len(self._names)
@@ -0,0 +1,275 @@
+import re
+from array import array
+from typing import Any, Container, Dict, List, Optional, Sequence, Tuple
+
+from interpreter.error_handler.error import Error
+from interpreter.error_handler.error_handler import ErrorHandler
+from interpreter.lexer.ilexer import ILexer
+from interpreter.lexer.regex_lexer import Source, scan
+from interpreter.lexer.symbol_table import SymbolTable
+from interpreter.position import Position
+from interpreter.reader.reader import Reader
+from interpreter.token import Token, TokenType
+
+TOKEN_TYPES: List[TokenType] = list(TokenType)
+TOKEN_TYPE_CODES = {token_type: code for code, token_type in enumerate(TOKEN_TYPES)}
+# code of an entry for which next_token returned no token
+NO_TOKEN = 255
+# tokens tokenize_source can be told to stop after
+STOP_TYPES = frozenset((TokenType.SEMICOLON, TokenType.RIGHT_CURLY_BRACKET))
+LEFT_CURLY_BRACKET_CODE = TOKEN_TYPE_CODES[TokenType.LEFT_CURLY_BRACKET]
+# type codes of curly brackets, searched for in the types array
+CURLY_BRACKET_PATTERN = re.compile(
+    b"[%s]"
+    % re.escape(
+        bytes(
+            (
+                LEFT_CURLY_BRACKET_CODE,
+                TOKEN_TYPE_CODES[TokenType.RIGHT_CURLY_BRACKET],
+            )
+        )
+    )
+)
+
+
+class TokenBuffer:
+    """
+    Token stream stored column-wise: a typed array per token field and a side
+    table holding every distinct value once, instead of a Token and a
+    Position object per token.
+    """
+
+    def __init__(self):
+        self.types = array("B")
+        self.offsets = array("I")
+        self.rows = array("I")
+        self.columns = array("I")
+        # index into values, 0 for a token without a value
+        self.value_ids = array("I")
+        self.values: List[Any] = [None]
+        self._value_ids: Dict[Any, int] = {}
+        # errors along with the index of the entry they were reported at
+        self.errors: List[Tuple[int, Error]] = []
+        self.newline_symbol: Optional[str] = None
+        # whether comments were skipped instead of stored as tokens
+        self.skip_comments = False
+
+    def append(
+        self,
+        token_type: Optional[TokenType],
+        offset: int = 0,
+        row: int = 0,
+        column: int = 0,
+        value: Any = None,
+    ) -> None:
+        """
+        :param token_type: None for an entry without a token, positioned where
+            the lexer stopped
+        """
+        self.types.append(
+            NO_TOKEN if token_type is None else TOKEN_TYPE_CODES[token_type]
+        )
+        self.offsets.append(offset)
+        self.rows.append(row)
+        self.columns.append(column)
+        self.value_ids.append(self._value_id(value))
+
+    def _value_id(self, value: Any) -> int:
+        if value is None:
+            return 0
+        value_id = self._value_ids.get(value)
+        if value_id is None:
+            value_id = self._value_ids[value] = len(self.values)
+            self.values.append(value)
+        return value_id
+
+    def __len__(self) -> int:
+        return len(self.types)
+
+    def token_type(self, index: int) -> Optional[TokenType]:
+        code = self.types[index]
+        return None if code == NO_TOKEN else TOKEN_TYPES[code]
+
+    def position(self, index: int) -> Position:
+        return Position(self.offsets[index], self.rows[index], self.columns[index])
+
+    def value(self, index: int) -> Any:
+        return self.values[self.value_ids[index]]
+
+    def __getitem__(self, index: int) -> Optional[Token]:
+        token_type = self.token_type(index)
+        if token_type is None:
+            return None
+        return Token(token_type, self.position(index), self.value(index))
+
+    def slice(self, start: int, stop: int) -> "TokenBuffer":
+        """
+        :return: buffer of the entries start..stop, sharing the values of
+            this one, without the errors
+        """
+        buffer = TokenBuffer()
+        buffer.types = self.types[start:stop]
+        buffer.offsets = self.offsets[start:stop]
+        buffer.rows = self.rows[start:stop]
+        buffer.columns = self.columns[start:stop]
+        buffer.value_ids = self.value_ids[start:stop]
+        buffer.values = self.values
+        buffer._value_ids = self._value_ids
+        buffer.newline_symbol = self.newline_symbol
+        buffer.skip_comments = self.skip_comments
+        return buffer
+
+
+def tokenize_all(
+    reader: Reader,
+    symbol_table: Optional[SymbolTable] = None,
+    skip_comments: bool = False,
+) -> TokenBuffer:
+    """
+    Tokenize the rest of the reader's source at once with the regex engine.
+    The buffer ends with the EOF token, or with the entry after which the
+    lexer would be stuck returning no token.
+
+    :param symbol_table: table identifiers and short strings are interned in
+    :param skip_comments: leave comments out of the buffer
+    """
+    source = Source.from_reader(reader)
+    buffer, _ = tokenize_source(source, symbol_table, skip_comments=skip_comments)
+    return buffer
+
+
+def tokenize_source(
+    source: Source,
+    symbol_table: Optional[SymbolTable] = None,
+    stops: Container[int] = (),
+    skip_comments: bool = False,
+) -> Tuple[TokenBuffer, Optional[int]]:
+    """
+    Tokenize a decoded source like tokenize_all.
+
+    :param stops: character indices after which a semicolon or a right curly
+        bracket ends the buffer
+    :return: the buffer and the index it was ended at by one of the stops
+    """
+    error_handler = ErrorHandler()
+    errors = error_handler.errors
+    buffer = TokenBuffer()
+    buffer.newline_symbol = source.newline_symbol
+    buffer.skip_comments = skip_comments
+    locate = source.locator()
+    codes = TOKEN_TYPE_CODES
+    value_id = buffer._value_id
+    append_type = buffer.types.append
+    append_offset = buffer.offsets.append
+    append_row = buffer.rows.append
+    append_column = buffer.columns.append
+    append_value_id = buffer.value_ids.append
+    stuck_at = None
+    for token_type, index, value in scan(
+        source, error_handler, symbol_table=symbol_table, skip_comments=skip_comments
+    ):
+        if errors and len(errors) > len(buffer.errors):
+            buffer.errors.extend(
+                (len(buffer), error) for error in errors[len(buffer.errors) :]
+            )
+        if token_type is None:
+            if stuck_at == index:
+                break
+            stuck_at = index
+            buffer.append(None, *locate(index))
+            continue
+        stuck_at = None
+        offset, row, column = locate(index)
+        append_type(codes[token_type])
+        append_offset(offset)
+        append_row(row)
+        append_column(column)
+        append_value_id(0 if value is None else value_id(value))
+        if token_type == TokenType.EOF:
+            break
+        if index in stops and token_type in STOP_TYPES:
+            return buffer, index
+    return buffer, None
+
+
+class TokenBufferLexer(ILexer):
+    """
+    Hands out the entries of a TokenBuffer one at a time, so that Parser can
+    consume it like any lexer. The last entry is repeated once the buffer is
+    exhausted, and errors are reported when the entry they were found at is
+    reached, as the lexer would have reported them.
+    """
+
+    def __init__(self, buffer: TokenBuffer, error_handler: ErrorHandler):
+        self._buffer = buffer
+        self._error_handler = error_handler
+        self._index = 0
+        self._reported = 0
+
+    def next_token(self) -> Optional[Token]:
+        buffer = self._buffer
+        index = self._index
+        errors = buffer.errors
+        while self._reported < len(errors) and errors[self._reported][0] <= index:
+            self._error_handler.errors.append(errors[self._reported][1])
+            self._reported += 1
+        if index < len(buffer) - 1:
+            self._index += 1
+        return buffer[index]
+
+    def skip_block(self, token: Token) -> Tuple[Sequence[Token], bool, Optional[Token]]:
+        """
+        Like ILexer.skip_block, matching the curly brackets in the types
+        array instead of handing out every token of the block.
+        """
+        buffer = self._buffer
+        # the "{" is never the last entry, which is EOF or no token
+        start = self._index - 1
+        depth = 0
+        for bracket in CURLY_BRACKET_PATTERN.finditer(memoryview(buffer.types), start):
+            if buffer.types[bracket.start()] == LEFT_CURLY_BRACKET_CODE:
+                depth += 1
+                continue
+            depth -= 1
+            if depth == 0:
+                stop = bracket.end()
+                self._index = stop
+                block = buffer.slice(start, stop)
+                _append_eof(block, block, len(block) - 1)
+                return block, True, self.next_token()
+
+        # never closed, the block runs up to the last entry
+        stop = len(buffer) - 1
+        self._index = stop
+        block = buffer.slice(start, stop)
+        if buffer.types[stop] == TOKEN_TYPE_CODES[TokenType.EOF]:
+            _append_eof(block, buffer, stop)
+        else:
+            _append_eof(block, block, len(block) - 1)
+        return block, False, self.next_token()
+
+
+def _append_eof(block: TokenBuffer, source: TokenBuffer, index: int) -> None:
+    """
+    End a skipped block with an EOF positioned like the entry index of source.
+    """
+    block.append(
+        TokenType.EOF, source.offsets[index], source.rows[index], source.columns[index]
+    )
+
+
+class TokenListLexer(ILexer):
+    """
+    Hands out a list of tokens one at a time, repeating the last one once
+    the list is exhausted.
+    """
+
+    def __init__(self, tokens: List[Token]):
+        self._tokens = tokens
+        self._index = 0
+
+    def next_token(self) -> Optional[Token]:
+        index = self._index
+        if index < len(self._tokens) - 1:
+            self._index += 1
+        return self._tokens[index]
@@ -1,8 +1,8 @@
-from collections.abc import Iterable
-from typing import List, Optional
+from enum import Enum
+from typing import Callable, Container, Dict, Iterator, List, Optional, Tuple, Type
 
 from interpreter.error_handler import ErrorHandler
-from interpreter.lexer import ILexer
+from interpreter.lexer import ILexer, TokenListLexer
 from interpreter.program import (
     Program,
     Statement,
@@ -29,6 +29,7 @@ from interpreter.program import (
     NegatedFactor,
     Literal,
     Block,
+    LazyBlock,
 )
 from interpreter.program.operator import (
     CaseOperator,
@@ -38,53 +39,184 @@ from interpreter.program.operator import (
     UnaryOperator,
 )
 from interpreter.program.statement import ContinueStatement, BreakStatement
+from interpreter.position import Position
 from interpreter.token import Token, TokenType
 
 
+def _binary_operators(
+    power: int, node: Type[Expression], operator_type: Type[Enum], token_types
+) -> Dict[TokenType, Tuple[int, Type[Expression], Enum]]:
+    return {
+        token_type: (power, node, operator_type.from_token(Token(token_type, None)))
+        for token_type in token_types
+    }
+
+
+# binding power, node and operator of each binary operator, one power per
+# level of the grammar from or_expression up to multiplicative_expression
+BINARY_OPERATORS: Dict[TokenType, Tuple[int, Type[Expression], Optional[Enum]]] = {
+    TokenType.OR_OPERATOR: (1, OrExpression, None),
+    TokenType.AND_OPERATOR: (2, AndExpression, None),
+    **_binary_operators(
+        3, RelationalExpression, RelationalOperator, Token.RELATIONAL_OPERATORS
+    ),
+    **_binary_operators(
+        4, AdditiveExpression, AdditiveOperator, Token.ADDITIVE_OPERATORS
+    ),
+    **_binary_operators(
+        5,
+        MultiplicativeExpression,
+        MultiplicativeOperator,
+        Token.MULTIPLICATIVE_OPERATORS,
+    ),
+}
+MAX_BINDING_POWER = 5
+
+# keywords a statement starts with, where skipping a bad one stops
+STATEMENT_KEYWORDS = frozenset(
+    (
+        TokenType.LET,
+        TokenType.IF,
+        TokenType.WHILE,
+        TokenType.MATCH,
+        TokenType.FN,
+        TokenType.RETURN,
+        TokenType.BREAK,
+        TokenType.CONTINUE,
+    )
+)
+PROGRAM_END = frozenset((TokenType.EOF,))
+BLOCK_END = frozenset((TokenType.RIGHT_CURLY_BRACKET, TokenType.EOF))
+
+# tokens a literal starts with
+LITERAL_TOKENS = frozenset(
+    (
+        TokenType.NUM,
+        TokenType.STR,
+        TokenType.TRUE_VAL,
+        TokenType.FALSE_VAL,
+        TokenType.NULL_VAL,
+    )
+)
+
+
 class Parser:
-    def __init__(self, lexer: ILexer, error_handler: ErrorHandler):
+    def __init__(
+        self, lexer: ILexer, error_handler: ErrorHandler, lazy_functions=False
+    ):
+        """
+        :param lazy_functions: only brace-match function bodies, leaving them
+            to parse_lazy_block until the function is first called
+        """
         self._error_handler = error_handler
         self._lexer = lexer
-        self._token = lexer.next_token()
+        self._lazy_functions = lazy_functions
+        self._token = None
+        self.__consume()
+        # parse routine of each token a statement starts with
+        self._statement_parsers: Dict[TokenType, Callable[[], Optional[Statement]]] = {
+            TokenType.LET: self._parse_var_definition,
+            TokenType.IF: self._parse_conditional_statement,
+            TokenType.WHILE: self._parse_loop_statement,
+            TokenType.MATCH: self._parse_match_statement,
+            TokenType.IDENTIFIER: self._parse_assignment_or_function_call,
+            TokenType.FN: self._parse_function_definition,
+            TokenType.RETURN: self._parse_return_statement,
+            TokenType.BREAK: self._parse_break_statement,
+            TokenType.CONTINUE: self._parse_continue_statement,
+        }
 
     def parse(self) -> Program:
-        statements = []
-        while statement := self._parse_statement():
-            statements.append(statement)
+        return Program(list(self.iter_statements()))
 
-        return Program(statements)
+    def iter_statements(self) -> Iterator[Statement]:
+        """
+        Parse top-level statements one at a time, reading only as much of the
+        source as the next statement needs.
+        """
+        return self._parse_statements(PROGRAM_END)
+
+    def _parse_statements(self, ends: Container[TokenType]) -> Iterator[Statement]:
+        """
+        Parse statements up to one of the ends. Where no statement starts,
+        the error is reported and the tokens up to the next statement are
+        skipped, so that every syntax error is found in one pass.
+        """
+        errors = self._error_handler.errors
+        while self._token.token_type not in ends:
+            statement = self._parse_statement()
+            if statement is not None:
+                yield statement
+                continue
+            if self._token.token_type in ends:
+                continue
+            position = self._token.position
+            # the statement that was just parsed may have reported it already
+            if not errors or errors[-1].position != position:
+                self._error_handler.statement_expected(position)
+            self._synchronize(ends)
+
+    def _synchronize(self, ends: Container[TokenType]) -> None:
+        """
+        Skip tokens up to a keyword a statement starts with or one of the
+        ends, or past a ";" or a "}" that does not close a skipped "{".
+        """
+        depth = 0
+        while True:
+            token_type = self._token.token_type
+            if token_type == TokenType.EOF:
+                return
+            if depth == 0 and (token_type in ends or token_type in STATEMENT_KEYWORDS):
+                return
+            self._token = self.__consume()
+            if token_type == TokenType.LEFT_CURLY_BRACKET:
+                depth += 1
+            elif token_type == TokenType.RIGHT_CURLY_BRACKET:
+                if depth == 0:
+                    return
+                depth -= 1
+            elif token_type == TokenType.SEMICOLON and depth == 0:
+                return
 
     def _parse_statement(self) -> Optional[Statement]:
-        return (
-            self._parse_var_definition()
-            or self._parse_conditional_statement()
-            or self._parse_loop_statement()
-            or self._parse_match_statement()
-            or self._parse_assignment_or_function_call()
-            or self._parse_function_definition()
-            or self._parse_return_statement()
-            or self._parse_break_statement()
-            or self._parse_continue_statement()
-        )
-
-    def _consume_if(self, token_type: TokenType | Iterable[TokenType]) -> bool:
-        if type(token_type) is TokenType:
-            return self.__consume_if(self._token.token_type == token_type)
-        if isinstance(token_type, Iterable):
-            return self.__consume_if(self._token.token_type in token_type)
-        raise Exception("Unexpected token_type type")
-
-    def __consume_if(self, condition: bool) -> bool:
-        if condition:
-            self.__consume()
-            return True
-        return False
-
-    def __consume(self) -> Optional[Token]:
-        token = self._lexer.next_token()
-        self._token = token
+        """
+        Parse the statement the current token starts, looked up in
+        _statement_parsers instead of trying every statement in turn.
+        """
+        parse_statement = self._statement_parsers.get(self._token.token_type)
+        if parse_statement is None:
+            return None
+        return parse_statement()
+
+    def _consume_if(self, token_type: TokenType) -> bool:
+        if self._token.token_type != token_type:
+            return False
+        self._token = self.__consume()
+        return True
+
+    def _consume_if_any(self, token_types: Container[TokenType]) -> bool:
+        if self._token.token_type not in token_types:
+            return False
+        self._token = self.__consume()
+        return True
+
+    def __consume(self) -> Token:
+        self._token = self._lexer.next_token() or self._end_of_input()
         return self._token
 
+    def _end_of_input(self) -> Token:
+        """
+        The lexer stops at an error it has reported, which ends the input.
+        """
+        errors = self._error_handler.errors
+        if errors:
+            position = errors[-1].position
+        elif self._token is not None:
+            position = self._token.position
+        else:
+            position = Position(0, 1, 1)
+        return Token(TokenType.EOF, position)
+
     def _parse_var_definition(self) -> Optional[VarDefinition]:
         """
         assignment = "let", [ "mut"], identifier, assign_operator, expression, ";" ;
@@ -269,14 +401,20 @@ class Parser:
         if not self._consume_if(TokenType.RIGHT_BRACKET):
             self._error_handler.right_bracket_expected(self._token.position)
 
-        function_body = self._parse_block()
+        if self._lazy_functions:
+            function_body = self._skip_block()
+        else:
+            function_body = self._parse_block()
         return FunctionDefinitionStatement(name, params, function_body)
 
     def _parse_assignment_or_function_call(
         self,
     ) -> Optional[Assignment | FunctionCallStatement]:
         stmt = self._parse_identifier_or_assignment_or_function_call()
-        if stmt is None or type(stmt) == IdentifierExpression:
+        if stmt is None:
+            return None
+        if type(stmt) == IdentifierExpression:
+            self._error_handler.no_effect(stmt.position)
             return None
         if not self._consume_if(TokenType.SEMICOLON):
             self._error_handler.semicolon_expected(self._token.position)
@@ -339,118 +477,43 @@ class Parser:
             self._error_handler.semicolon_expected(self._token.position)
         return BreakStatement()
 
-    def _parse_expression(self) -> Optional[Expression]:
+    def _parse_expression(self, min_power: int = 0) -> Optional[Expression]:
         """
         expression = or_expression;
 
-        :return:
-        """
-        return self._parse_or_expression()
-
-    def _parse_or_expression(self) -> Optional[Expression]:
-        """
-        or_expression = and_expression, { "or", and_expression };
-
-        :return:
-        """
-        left = self._parse_and_expression()
-        if left is None:
-            return None
-
-        position = self._token.position
-        while self._consume_if(TokenType.OR_OPERATOR):
-            right = self._parse_and_expression()
-            if right is None:
-                self._error_handler.expression_expected(self._token.position)
-            left = OrExpression(left, right, position)
-            position = self._token.position
-
-        return left
-
-    def _parse_and_expression(self) -> Optional[Expression]:
-        """
-        and_expression = relational_expression, { "and", relational_expression };
-        :return:
-        """
-        left = self._parse_relational_expression()
-        if left is None:
-            return None
-
-        position = self._token.position
-        while self._consume_if(TokenType.AND_OPERATOR):
-            right = self._parse_relational_expression()
-            if right is None:
-                self._error_handler.expression_expected(self._token.position)
-            left = AndExpression(left, right, position)
-            position = self._token.position
+        All the binary expression levels are parsed by precedence climbing
+        over BINARY_OPERATORS, instead of by a method per level. Only the
+        operators binding tighter than min_power are taken.
 
-        return left
+        Like the grammar, every level is left associative, and an operand is
+        never extended by an operator of a higher level than the one it is
+        an operand of, even when a right operand turns out to be missing.
 
-    def _parse_relational_expression(self) -> Optional[Expression]:
-        """
-        relational_expression = additive_expression, { relational_operator, additive_expression};
         :return:
         """
-        left = self._parse_additive_expression()
+        left = self._parse_unary_expression()
         if left is None:
             return None
 
-        position = self._token.position
-        while self._token.token_type in Token.RELATIONAL_OPERATORS:
-            operator = RelationalOperator.from_token(self._token)
-            self._token = self.__consume()
+        max_power = MAX_BINDING_POWER
+        while True:
+            binary_operator = BINARY_OPERATORS.get(self._token.token_type)
+            if binary_operator is None:
+                return left
+            power, node, operator = binary_operator
+            if not min_power < power <= max_power:
+                return left
 
-            right = self._parse_additive_expression()
-            if right is None:
-                self._error_handler.expression_expected(self._token.position)
-            left = RelationalExpression(operator, left, right, position)
             position = self._token.position
-
-        return left
-
-    def _parse_additive_expression(self) -> Optional[Expression]:
-        """
-        additive_expression = multiplicative_expression, { additive_operator, multiplicative_expression };
-        :return:
-        """
-        left = self._parse_multiplicative_expression()
-        if left is None:
-            return None
-
-        position = self._token.position
-        while self._token.token_type in Token.ADDITIVE_OPERATORS:
-            operator = AdditiveOperator.from_token(self._token)
             self._token = self.__consume()
-
-            right = self._parse_multiplicative_expression()
+            right = self._parse_expression(power)
             if right is None:
                 self._error_handler.expression_expected(self._token.position)
-            left = AdditiveExpression(operator, left, right, position)
-            position = self._token.position
-
-        return left
-
-    def _parse_multiplicative_expression(self) -> Optional[Expression]:
-        """
-        multiplicative_expression = unary_expression, { multiplicative_operator, unary_expression };
-        :return:
-        """
-        left = self._parse_unary_expression()
-        if left is None:
-            return None
-
-        position = self._token.position
-        while self._token.token_type in Token.MULTIPLICATIVE_OPERATORS:
-            operator = MultiplicativeOperator.from_token(self._token)
-            self._token = self.__consume()
-
-            right = self._parse_unary_expression()
-            if right is None:
-                self._error_handler.expression_expected(self._token.position)
-            left = MultiplicativeExpression(operator, left, right, position)
-            position = self._token.position
-
-        return left
+            if operator is None:
+                left = node(left, right, position)
+            else:
+                left = node(operator, left, right, position)
+            max_power = power
 
     def _parse_unary_expression(self) -> Optional[Expression]:
         """
@@ -460,7 +523,7 @@ class Parser:
 
         unary_operator = self._token
         position = self._token.position
-        negated = self._consume_if(Token.UNARY_OPERATORS)
+        negated = self._consume_if_any(Token.UNARY_OPERATORS)
         factor = self._parse_factor()
         if negated:
             return NegatedFactor(
@@ -477,15 +540,15 @@ class Parser:
         :return:
         """
 
-        expression = (
-            self._parse_literal()
-            or self._parse_identifier_or_assignment_or_function_call()
-            or self._parse_parenthesis()
-        )
-
-        if expression is None:
-            return None
-        return expression
+        # the first token tells the alternative apart
+        token_type = self._token.token_type
+        if token_type in LITERAL_TOKENS:
+            return self._parse_literal()
+        if token_type == TokenType.IDENTIFIER:
+            return self._parse_identifier_or_assignment_or_function_call()
+        if token_type == TokenType.LEFT_BRACKET:
+            return self._parse_parenthesis()
+        return None
 
     def _parse_literal(self) -> Optional[Literal]:
         """
@@ -567,12 +630,36 @@ class Parser:
         if not self._consume_if(TokenType.LEFT_CURLY_BRACKET):
             return None
 
-        statements = []
-        while statement := self._parse_statement():
-            statements.append(statement)
+        statements = list(self._parse_statements(BLOCK_END))
 
         if not self._consume_if(TokenType.RIGHT_CURLY_BRACKET):
             self._error_handler.right_curly_bracket_expected(self._token.position)
             return None
 
         return Block(statements)
+
+    def _skip_block(self) -> Optional[Block | LazyBlock]:
+        """
+        Brace-match a code block, keeping its tokens instead of parsing it. A
+        block that is never closed is parsed right away, so that its errors
+        are reported where eager parsing would report them.
+        """
+        if self._token.token_type != TokenType.LEFT_CURLY_BRACKET:
+            return None
+
+        tokens, closed, token = self._lexer.skip_block(self._token)
+        self._token = token or self._end_of_input()
+        block = LazyBlock(tokens)
+        if not closed:
+            return parse_lazy_block(block, self._error_handler)
+        return block
+
+
+def parse_lazy_block(block: LazyBlock, error_handler: ErrorHandler) -> Optional[Block]:
+    """
+    Parse a function body left by a lazy parser, once.
+    """
+    if block.block is None:
+        lexer = TokenListLexer(block.tokens)
+        block.block = Parser(lexer, error_handler, lazy_functions=True)._parse_block()
+    return block.block
@@ -1,8 +1,61 @@
-from dataclasses import dataclass
+ROW_BITS = 32
+COLUMN_BITS = 32
+_ROW_MASK = (1 << ROW_BITS) - 1
+_COLUMN_MASK = (1 << COLUMN_BITS) - 1
 
 
-@dataclass
-class Position:
-    position: int
-    row: int
-    column: int
+class Position(int):
+    """
+    Byte offset, row and column of a character packed into a single int, the
+    offset in the high bits. Every token and AST node holds one, so it takes
+    one small int object instead of an object and three ints.
+
+    Positions are only equal to positions, and the packed value orders them
+    by offset.
+    """
+
+    __slots__ = ()
+
+    def __new__(cls, position: int, row: int, column: int):
+        if position < 0 or row >> ROW_BITS or column >> COLUMN_BITS:
+            raise ValueError(f"position out of range: {position}, {row}, {column}")
+        return int.__new__(
+            cls, position << (ROW_BITS + COLUMN_BITS) | row << COLUMN_BITS | column
+        )
+
+    @property
+    def position(self) -> int:
+        return int(self) >> (ROW_BITS + COLUMN_BITS)
+
+    @property
+    def row(self) -> int:
+        return int(self) >> COLUMN_BITS & _ROW_MASK
+
+    @property
+    def column(self) -> int:
+        return int(self) & _COLUMN_MASK
+
+    def __getnewargs__(self):
+        return self.position, self.row, self.column
+
+    def __eq__(self, other):
+        # not NotImplemented, which would fall back to comparing ints
+        return isinstance(other, Position) and int(self) == int(other)
+
+    def __ne__(self, other):
+        return not self == other
+
+    __hash__ = int.__hash__
+
+    def __bool__(self) -> bool:
+        return True
+
+    def __repr__(self) -> str:
+        return (
+            f"Position(position={self.position}, row={self.row}, column={self.column})"
+        )
+
+    __str__ = __repr__
+
+    def __format__(self, format_spec: str) -> str:
+        return format(repr(self), format_spec)
@@ -15,6 +15,7 @@ from interpreter.program.program import Program
 from interpreter.program.statement import (
     Parameter,
     Block,
+    LazyBlock,
     Statement,
     Assignment,
     ConditionalStatement,
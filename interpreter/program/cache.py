@@ -0,0 +1,231 @@
+import dataclasses
+import gc
+import hashlib
+import json
+import os
+import sys
+import tempfile
+from contextlib import contextmanager
+from enum import Enum
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+from interpreter.position import Position
+from interpreter.program.expression import (
+    IdentifierExpression,
+    Literal,
+    OrExpression,
+    AndExpression,
+    RelationalExpression,
+    AdditiveExpression,
+    MultiplicativeExpression,
+    NegatedFactor,
+    LiteralType,
+    CaseIdentifier,
+)
+from interpreter.program.operator import (
+    RelationalOperator,
+    AdditiveOperator,
+    MultiplicativeOperator,
+    UnaryOperator,
+    CaseOperator,
+)
+from interpreter.program.program import Program
+from interpreter.program.statement import (
+    Parameter,
+    Block,
+    LazyBlock,
+    VarDefinition,
+    Assignment,
+    ConditionalStatement,
+    LoopStatement,
+    CaseStatement,
+    CaseDefaultStatement,
+    MatchStatement,
+    FunctionDefinitionStatement,
+    FunctionCallStatement,
+    ReturnStatement,
+    ContinueStatement,
+    BreakStatement,
+)
+from interpreter.token import Token, TokenType
+
+# bumped whenever the AST classes, the parser output or the file format
+# change, so that programs cached by an older interpreter are parsed again
+CACHE_VERSION = 5
+CACHE_TAG = f"interpreter-{CACHE_VERSION}-{sys.implementation.cache_tag}"
+CACHE_DIRECTORY = "__icache__"
+
+# the only classes a cache file can make, with the fields stored for each,
+# the ones the resolver and the interpreter fill in are left out
+_NODES = {
+    cls.__name__: (
+        cls,
+        [field.name for field in dataclasses.fields(cls) if field.compare],
+    )
+    for cls in (
+        Program,
+        Parameter,
+        Block,
+        LazyBlock,
+        VarDefinition,
+        Assignment,
+        ConditionalStatement,
+        LoopStatement,
+        CaseStatement,
+        CaseDefaultStatement,
+        MatchStatement,
+        FunctionDefinitionStatement,
+        FunctionCallStatement,
+        ReturnStatement,
+        ContinueStatement,
+        BreakStatement,
+        IdentifierExpression,
+        Literal,
+        OrExpression,
+        AndExpression,
+        RelationalExpression,
+        AdditiveExpression,
+        MultiplicativeExpression,
+        NegatedFactor,
+        CaseIdentifier,
+        Token,
+    )
+}
+_ENUMS = {
+    cls.__name__: cls
+    for cls in (
+        LiteralType,
+        RelationalOperator,
+        AdditiveOperator,
+        MultiplicativeOperator,
+        UnaryOperator,
+        CaseOperator,
+        TokenType,
+    )
+}
+
+
+class ProgramCache:
+    """
+    Parsed programs stored next to their sources, like __pycache__: a source
+    whose content hash matches the one stored along with its program is not
+    lexed and parsed again.
+
+    Programs are stored as JSON, not pickled, since anyone able to write to
+    __icache__ could make unpickling run any code. Loading one only builds
+    the syntax tree classes of _NODES and _ENUMS from plain data.
+
+    Failing to read or write a cache file is never an error, the source is
+    just parsed as if it was not cached.
+    """
+
+    def __init__(
+        self, source: Path, directory: Optional[Path] = None, lazy: bool = False
+    ):
+        """
+        :param directory: where the cache file is kept, __icache__ next to
+            the source by default
+        :param lazy: the program was parsed with lazy function bodies, which
+            is cached apart
+        """
+        if directory is None:
+            directory = source.parent / CACHE_DIRECTORY
+        variant = ".lazy" if lazy else ""
+        self.path = directory / f"{source.name}.{CACHE_TAG}{variant}.json"
+        self.digest = source_digest(source)
+
+    def load(self) -> Optional[Program]:
+        """
+        :return: the program cached for the source, None if there is none
+            or the source changed since
+        """
+        try:
+            with open(self.path, "rb") as file:
+                # a stale program is not decoded at all
+                if file.read(len(self.digest)) != self.digest:
+                    return None
+                with _gc_paused():
+                    program = json.load(file, object_hook=_decode)
+        except Exception:
+            return None
+        return program if isinstance(program, Program) else None
+
+    def store(self, program: Program) -> None:
+        try:
+            data = json.dumps(
+                program, default=_encode, check_circular=False, separators=(",", ":")
+            ).encode()
+        except RecursionError:
+            # too deeply nested to encode, parsing it again is fine
+            return
+        try:
+            self.path.parent.mkdir(exist_ok=True)
+            # written aside and renamed, so that a concurrent run never
+            # loads a partial file
+            fd, temporary = tempfile.mkstemp(dir=self.path.parent)
+            try:
+                with os.fdopen(fd, "wb") as file:
+                    file.write(self.digest)
+                    file.write(data)
+                os.replace(temporary, self.path)
+            except BaseException:
+                os.unlink(temporary)
+                raise
+        except OSError:
+            pass
+
+
+def _encode(node: Any) -> Dict[str, Any]:
+    """
+    :return: a node as {class name: its fields}, an enum member as
+        {enum name: member name}, positions are stored as the ints they are
+    """
+    if isinstance(node, Enum):
+        return {type(node).__name__: node.name}
+    name = type(node).__name__
+    return {name: [getattr(node, field) for field in _NODES[name][1]]}
+
+
+def _decode(data: Dict[str, Any]) -> Any:
+    """
+    Make the node or the enum member an object of the file stands for.
+    Any other class name fails.
+    """
+    ((name, value),) = data.items()
+    if name in _ENUMS:
+        return _ENUMS[name][value]
+    cls, _ = _NODES[name]
+    return cls(*_positions(value))
+
+
+def _positions(values: List[Any]) -> List[Any]:
+    # ints only ever stand for positions, JSON gives every num literal a float
+    return [
+        int.__new__(Position, value) if type(value) is int else value
+        for value in values
+    ]
+
+
+def source_digest(source: Path) -> bytes:
+    digest = hashlib.blake2b(digest_size=16)
+    with open(source, "rb") as file:
+        while chunk := file.read(1 << 20):
+            digest.update(chunk)
+    return digest.digest()
+
+
+@contextmanager
+def _gc_paused() -> Iterator[None]:
+    """
+    Keep the cyclic garbage collector from scanning the objects of a program
+    over and over while they are created one by one, which takes most of the
+    time of loading a large one.
+    """
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
@@ -1,6 +1,7 @@
 from abc import ABC
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from enum import Enum, auto
+from typing import Any, Optional
 
 from interpreter.position import Position
 from interpreter.program.operator import (
@@ -43,14 +44,16 @@ class LiteralType(Enum):
 
 
 class Expression(Statement, ABC):
-    ...
+    __slots__ = ()
 
 
-@dataclass
+@dataclass(slots=True)
 class Literal(Expression):
     type: LiteralType
     value: int | float | str | bool | None
     position: Position
+    # its Value, made by the Interpreter the first time it is evaluated
+    constant: Any = field(default=None, compare=False, repr=False)
 
     def accept(self, visitor: "Visitor"):
         visitor.visit_literal(self)
@@ -59,7 +62,7 @@ class Literal(Expression):
         return Literal(self.type, self.value, self.position)
 
 
-@dataclass
+@dataclass(slots=True)
 class OrExpression(Expression):
     left: Expression
     right: Expression
@@ -69,7 +72,7 @@ class OrExpression(Expression):
         visitor.visit_or_expression(self)
 
 
-@dataclass
+@dataclass(slots=True)
 class AndExpression(Expression):
     left: Expression
     right: Expression
@@ -79,7 +82,7 @@ class AndExpression(Expression):
         visitor.visit_and_expression(self)
 
 
-@dataclass
+@dataclass(slots=True)
 class RelationalExpression(Expression):
     operator: RelationalOperator
     left: Expression
@@ -90,7 +93,7 @@ class RelationalExpression(Expression):
         visitor.visit_relational_expression(self)
 
 
-@dataclass
+@dataclass(slots=True)
 class AdditiveExpression(Expression):
     operator: AdditiveOperator
     left: Expression
@@ -101,7 +104,7 @@ class AdditiveExpression(Expression):
         visitor.visit_additive_expression(self)
 
 
-@dataclass
+@dataclass(slots=True)
 class MultiplicativeExpression(Expression):
     operator: MultiplicativeOperator
     left: Expression
@@ -112,7 +115,7 @@ class MultiplicativeExpression(Expression):
         visitor.visit_multiplicative_expression(self)
 
 
-@dataclass
+@dataclass(slots=True)
 class NegatedFactor(Expression):
     operator: UnaryOperator
     factor: Expression
@@ -122,16 +125,19 @@ class NegatedFactor(Expression):
         visitor.visit_negated_expression(self)
 
 
-@dataclass
+@dataclass(slots=True)
 class IdentifierExpression(Expression):
     name: str
     position: Position
+    # scope and slot of the variable, set by the Resolver
+    depth: Optional[int] = field(default=None, compare=False, repr=False)
+    slot: Optional[int] = field(default=None, compare=False, repr=False)
 
     def accept(self, visitor: "Visitor"):
         visitor.visit_identifier_expression(self)
 
 
-@dataclass
+@dataclass(slots=True)
 class CaseIdentifier(Expression):
     identifier: CaseOperator | Literal | LiteralType
     position: Position
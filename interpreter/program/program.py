@@ -5,7 +5,7 @@ from interpreter.program.statement import Statement
 from interpreter.visitor.visitable import Visitable
 
 
-@dataclass
+@dataclass(slots=True)
 class Program(Visitable):
     statements: List[Statement]
 
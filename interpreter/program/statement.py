@@ -1,28 +1,30 @@
 from abc import ABC, abstractmethod
-from dataclasses import dataclass
-from typing import List
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
 
 from interpreter.position import Position
 from interpreter.visitor.visitable import Visitable
 
 
-@dataclass()
+@dataclass(slots=True)
 class Statement(Visitable, ABC):
     @abstractmethod
     def accept(self, visitor: "Visitor"):
         visitor.visit_statement(self)
 
 
-@dataclass
+@dataclass(slots=True)
 class Parameter(Statement):
     name: str
     mut: bool = False
+    # slot of the variable in the current frame, set by the Resolver
+    slot: Optional[int] = field(default=None, compare=False, repr=False)
 
     def accept(self, visitor: "Visitor"):
         visitor.visit_parameter(self)
 
 
-@dataclass
+@dataclass(slots=True)
 class Block(Statement):
     statements: List[Statement]
 
@@ -30,28 +32,46 @@ class Block(Statement):
         visitor.visit_block(self)
 
 
-@dataclass
+@dataclass(slots=True)
+class LazyBlock(Statement):
+    """
+    Function body that was only brace-matched, kept as its tokens from "{"
+    up to the matching "}" followed by EOF until parse_lazy_block parses it.
+    """
+
+    tokens: List["Token"]
+    block: Optional[Block] = None
+
+    def accept(self, visitor: "Visitor"):
+        visitor.visit_lazy_block(self)
+
+
+@dataclass(slots=True)
 class VarDefinition(Statement):
     name: str
     expression: "Expression"
     position: Position
     mut: bool = False
+    # slot of the variable in the current frame, set by the Resolver
+    slot: Optional[int] = field(default=None, compare=False, repr=False)
 
     def accept(self, visitor: "Visitor"):
         visitor.visit_var_definition(self)
 
 
-@dataclass
+@dataclass(slots=True)
 class Assignment(Statement):
     name: str
     expression: "Expression"
     position: Position
+    # slot of the variable in the current frame, set by the Resolver
+    slot: Optional[int] = field(default=None, compare=False, repr=False)
 
     def accept(self, visitor: "Visitor"):
         visitor.visit_assignment(self)
 
 
-@dataclass
+@dataclass(slots=True)
 class ConditionalStatement(Statement):
     condition: "Expression"
     if_block: Block
@@ -61,7 +81,7 @@ class ConditionalStatement(Statement):
         visitor.visit_conditional_statement(self)
 
 
-@dataclass
+@dataclass(slots=True)
 class LoopStatement(Statement):
     condition: "Expression"
     body: Block
@@ -70,7 +90,7 @@ class LoopStatement(Statement):
         visitor.visit_loop_statement(self)
 
 
-@dataclass
+@dataclass(slots=True)
 class CaseStatement(Statement):
     identifier: "CaseIdentifier"
     params: List[Parameter]
@@ -80,7 +100,7 @@ class CaseStatement(Statement):
         visitor.visit_case_statement(self)
 
 
-@dataclass
+@dataclass(slots=True)
 class CaseDefaultStatement(Statement):
     params: List[Parameter]
     body: Block
@@ -89,7 +109,7 @@ class CaseDefaultStatement(Statement):
         visitor.visit_case_default_statement(self)
 
 
-@dataclass
+@dataclass(slots=True)
 class MatchStatement(Statement):
     args: List["Expression"]
     case_stmts: List[CaseStatement]
@@ -100,28 +120,36 @@ class MatchStatement(Statement):
         visitor.visit_match_statement(self)
 
 
-@dataclass
+@dataclass(slots=True)
 class FunctionDefinitionStatement(Statement):
     name: str
     params: List[Parameter]
-    body: Block
+    body: Block | LazyBlock
+    # slot of the function in the current frame and the slots of the frame
+    # of its calls by name, set by the Resolver, the latter once the body
+    # is parsed
+    slot: Optional[int] = field(default=None, compare=False, repr=False)
+    locals: Optional[Dict[str, int]] = field(default=None, compare=False, repr=False)
 
     def accept(self, visitor: "Visitor"):
         visitor.visit_function_definition_statement(self)
 
 
-@dataclass
+@dataclass(slots=True)
 class FunctionCallStatement(Statement):
     name: str
     arguments: List["Expression"]
     position: Position
     r_position: Position
+    # scope and slot of the function, set by the Resolver
+    depth: Optional[int] = field(default=None, compare=False, repr=False)
+    slot: Optional[int] = field(default=None, compare=False, repr=False)
 
     def accept(self, visitor: "Visitor"):
         visitor.visit_function_call_statement(self)
 
 
-@dataclass
+@dataclass(slots=True)
 class ReturnStatement(Statement):
     expression: "Expression" = None
 
@@ -129,13 +157,13 @@ class ReturnStatement(Statement):
         visitor.visit_return_statement(self)
 
 
-@dataclass
+@dataclass(slots=True)
 class ContinueStatement(Statement):
     def accept(self, visitor: "Visitor"):
         visitor.visit_continue_statement(self)
 
 
-@dataclass
+@dataclass(slots=True)
 class BreakStatement(Statement):
     def accept(self, visitor: "Visitor"):
         visitor.visit_break_statement(self)
@@ -1 +1,5 @@
 from interpreter.reader.reader import Reader
+from interpreter.reader.buffer_reader import BufferReader
+from interpreter.reader.mmap_reader import MmapReader
+from interpreter.reader.memory_reader import BytesReader, StringReader
+from interpreter.reader.stream_reader import StreamReader
@@ -0,0 +1,35 @@
+from typing import Optional
+
+from interpreter.reader.line_index import LineIndex
+from interpreter.reader.reader import Reader
+
+
+class BufferReader(Reader):
+    """
+    Reader over a source that is available as a single contiguous buffer,
+    so it is never refilled and its line index is built in one pass.
+    """
+
+    def __init__(self, file_path: Optional[str] = None):
+        super().__init__(file_path)
+        self._eof = True
+        self._line_index = None
+
+    def _set_buffer(self, buffer) -> None:
+        self._buffer = memoryview(buffer)
+
+    def _fill(self) -> bool:
+        return False
+
+    @property
+    def line_index(self) -> LineIndex:
+        if self._line_index is None:
+            self._line_index = LineIndex()
+            self._line_index.scan(self._buffer, final=True)
+        return self._line_index
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        pass
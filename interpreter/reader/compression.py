@@ -0,0 +1,42 @@
+import bz2
+import gzip
+import lzma
+from typing import BinaryIO, Callable, Dict, Optional
+
+MAGIC_NUMBERS: Dict[bytes, Callable[[BinaryIO], BinaryIO]] = {
+    b"\x1f\x8b": lambda stream: gzip.GzipFile(fileobj=stream, mode="rb"),
+    b"BZh": lambda stream: bz2.BZ2File(stream, mode="rb"),
+    b"\xfd7zXZ\x00": lambda stream: lzma.LZMAFile(stream, mode="rb"),
+}
+MAGIC_LENGTH = max(len(magic) for magic in MAGIC_NUMBERS)
+
+
+def open_decompressed(stream: BinaryIO) -> BinaryIO:
+    """
+    Recognize a gzip, bzip2 or xz compressed source by its magic number.
+
+    :return: stream decompressing the source on the fly, or the given stream
+        itself when the source is not compressed
+    """
+    decompressor = find_decompressor(_peek(stream, MAGIC_LENGTH))
+    if decompressor is None:
+        return stream
+    return decompressor(stream)
+
+
+def find_decompressor(head: bytes) -> Optional[Callable[[BinaryIO], BinaryIO]]:
+    for magic, decompressor in MAGIC_NUMBERS.items():
+        if head.startswith(magic):
+            return decompressor
+    return None
+
+
+def _peek(stream: BinaryIO, size: int) -> bytes:
+    if hasattr(stream, "peek"):
+        return stream.peek(size)[:size]
+    if stream.seekable():
+        offset = stream.tell()
+        head = stream.read(size)
+        stream.seek(offset)
+        return head
+    return b""
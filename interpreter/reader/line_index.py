@@ -0,0 +1,92 @@
+import re
+from array import array
+from bisect import bisect_right
+from typing import Optional, Tuple
+
+CR = ord("\r")
+
+NEWLINE_PATTERN = re.compile(rb"\r\n?|\n")
+NEWLINE_SYMBOL_PATTERNS = {
+    symbol: re.compile(re.escape(symbol)) for symbol in (b"\n", b"\r", b"\r\n")
+}
+
+
+class LineIndex:
+    """
+    Byte offsets of the line starts of a source.
+
+    Newlines are located with a regex pass per chunk rather than byte by byte.
+    Like Reader, only the first newline symbol found in the source (LF, CR or
+    CRLF) is treated as a line break.
+    """
+
+    def __init__(self):
+        self._starts = array("Q", [0])
+        self._newline_symbol: Optional[bytes] = None
+        self._carry = b""
+        self._size = 0
+
+    def scan(self, data: bytes | memoryview, final: bool = False) -> None:
+        """
+        Index the next chunk of the source. A trailing CR that may be the
+        first half of a CRLF split between chunks is held back until the next
+        call or until the index is finalized.
+        """
+        base = self._size - len(self._carry)
+        self._size += len(data)
+        if self._carry:
+            data = self._carry + bytes(data)
+            self._carry = b""
+
+        if self._newline_symbol is None:
+            match = NEWLINE_PATTERN.search(data)
+            if match is None:
+                return
+            if match.end() == len(data) and match.group() == b"\r" and not final:
+                self._carry = bytes(data[match.start() :])
+                return
+            self._newline_symbol = match.group()
+
+        end = len(data)
+        if self._newline_symbol == b"\r\n" and not final and end and data[-1] == CR:
+            end -= 1
+            self._carry = b"\r"
+        pattern = NEWLINE_SYMBOL_PATTERNS[self._newline_symbol]
+        self._starts.extend(base + m.end() for m in pattern.finditer(data, 0, end))
+
+    def finalize(self) -> None:
+        self.scan(b"", final=True)
+
+    @property
+    def newline_symbol(self) -> Optional[bytes]:
+        return self._newline_symbol
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    def __len__(self) -> int:
+        return len(self._starts)
+
+    def line_start(self, row: int) -> int:
+        if row > len(self._starts):
+            return self._size
+        return self._starts[row - 1]
+
+    def line_bounds(self, row: int) -> Tuple[int, int]:
+        """
+        :return: byte range of the given 1-based row, without its line break
+        """
+        if row > len(self._starts):
+            return self._size, self._size
+        start = self._starts[row - 1]
+        if row == len(self._starts):
+            return start, self._size
+        return start, self._starts[row] - len(self._newline_symbol)
+
+    def locate(self, offset: int) -> Tuple[int, int]:
+        """
+        :return: row and column of the Reader once offset bytes have been read
+        """
+        row = bisect_right(self._starts, offset)
+        return row, offset - self._starts[row - 1] + 1
@@ -0,0 +1,16 @@
+from interpreter.reader.buffer_reader import BufferReader
+
+
+class BytesReader(BufferReader):
+    """
+    Reader over an in-memory source, e.g. a script received over the network.
+    """
+
+    def __init__(self, data: bytes | bytearray | memoryview):
+        super().__init__()
+        self._set_buffer(data)
+
+
+class StringReader(BytesReader):
+    def __init__(self, source: str):
+        super().__init__(source.encode())
@@ -0,0 +1,42 @@
+import mmap
+from typing import Optional
+
+from interpreter.reader.buffer_reader import BufferReader
+from interpreter.reader.compression import MAGIC_LENGTH, find_decompressor
+
+
+class MmapReader(BufferReader):
+    """
+    Reader mode which maps the whole source file into memory instead of
+    issuing a read/seek per character. A compressed source cannot be mapped,
+    so it is decompressed into memory instead.
+    """
+
+    _mmap: Optional[mmap.mmap]
+
+    def __init__(self, file_path: str):
+        super().__init__(file_path)
+        self._mmap = None
+
+    def __enter__(self):
+        self._file_handler = open(self.path, "rb")
+        try:
+            self._mmap = mmap.mmap(
+                self._file_handler.fileno(), 0, access=mmap.ACCESS_READ
+            )
+        except ValueError:
+            # empty files cannot be mapped
+            self._set_buffer(b"")
+        else:
+            decompressor = find_decompressor(self._mmap[:MAGIC_LENGTH])
+            if decompressor is None:
+                self._set_buffer(self._mmap)
+            else:
+                self._set_buffer(decompressor(self._file_handler).read())
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self._buffer.release()
+        if self._mmap is not None:
+            self._mmap.close()
+        self._file_handler.close()
@@ -1,110 +1,379 @@
-from typing import IO, Optional, Literal, List, Tuple
+import re
+from typing import IO, Callable, Optional, Literal, Tuple
 from pathlib import Path
 
 from interpreter.position import Position
+from interpreter.reader.compression import open_decompressed
+from interpreter.reader.line_index import LineIndex
 
 NEWLINE_SYMBOLS = Literal[b"\n", b"\r", b"\r\n"]
 DEFAULT_NEW_LINE_SYMBOL = "\n"
 CODE_LINE_WIDTH = 79
+CHUNK_SIZE = 64 * 1024
+
+LF = ord("\n")
+CR = ord("\r")
+REPLACEMENT_CHARACTER = "\ufffd"
+LINE_BREAK_PATTERN = re.compile(rb"[\r\n]")
+ASCII_DIGITS_PATTERN = re.compile(rb"[0-9]*")
+# bytes that are not valid UTF-8 are decoded as lone surrogates, so that each
+# of them still stands for one character, and reported as U+FFFD
+INVALID_BYTE_PATTERN = re.compile("[\udc80-\udcff]")
+INVALID_BYTES = {code: REPLACEMENT_CHARACTER for code in range(0xDC80, 0xDD00)}
+
+
+def _utf8_sequence_length(lead_byte: int) -> int:
+    if lead_byte < 0x80:
+        return 1
+    if 0xC2 <= lead_byte <= 0xDF:
+        return 2
+    if 0xE0 <= lead_byte <= 0xEF:
+        return 3
+    if 0xF0 <= lead_byte <= 0xF4:
+        return 4
+    return 0
+
+
+# length of the UTF-8 sequence introduced by each lead byte, 0 for invalid ones
+UTF8_SEQUENCE_LENGTH = bytes(_utf8_sequence_length(byte) for byte in range(256))
 
 
 class Reader:
+    """
+    Reads the source in fixed-size chunks and walks the current chunk with an
+    integer cursor. The stream is never seeked while reading, so pipes work as
+    well as regular files. Compressed sources are decompressed on the fly.
+    """
+
+    _file: IO
     _file_handler: IO
-    _position: int
+    _read_chunk: Callable[[int], bytes]
+    _buffer: bytearray | memoryview
+    _buffer_start: int
+    _cursor: int
+    _lookahead: int
+    _line_start: int
     _column: int
     _row: int
-    _valid_position: bool
+    _char_position: int
+    _eof: bool
     _newline_symbol: Optional[NEWLINE_SYMBOLS]
-    _lines: List[int]
+    _line_index: Optional[LineIndex]
 
-    def __init__(self, file_path: str):
-        self.path = Path(file_path)
-        self._position = 0
+    def __init__(self, file_path: Optional[str] = None):
+        self.path = Path(file_path) if file_path is not None else None
+        self._buffer = bytearray()
+        self._buffer_start = 0
+        self._cursor = 0
+        self._lookahead = 0
+        self._line_start = 0
         self._column = 1
         self._row = 1
-        self._valid_position = False
+        self._char_position = 0
+        self._eof = False
         self._newline_symbol = None
-        self._lines = []
+        self._line_index = LineIndex()
 
     def get_char(self) -> Optional[str]:
-        if not self._valid_position:
-            self._file_handler.seek(self._position, 0)
-            self._valid_position = True
-        char = self._file_handler.read(1)
-        if char == b"":
-            self._lines.append(self._position)
-            return None
-        if self._is_new_line(char):
+        cursor = self._cursor
+        if cursor >= len(self._buffer):
+            if self._peek() is None:
+                return None
+            cursor = self._cursor
+        byte = self._buffer[cursor]
+        if (byte == LF or byte == CR) and (length := self._new_line_length(0)):
+            cursor = self._cursor
             self._row += 1
             self._column = 1
-            if self._newline_symbol == b"\r\n":
-                self._position += 2
-                self._file_handler.seek(self._position, 0)
-            else:
-                self._position += 1
-            self._lines.append(self._position)
+            self._char_position += 1
+            self._cursor = self._lookahead = cursor + length
+            self._line_start = self._buffer_start + self._cursor
             return DEFAULT_NEW_LINE_SYMBOL
-        else:
-            self._column += 1
-            self._position += 1
-            return char.decode()
-
-    def _is_new_line(self, char) -> bool:
-        if self._newline_symbol is None:
-            return self._find_new_line_symbol(char)
-        if self._newline_symbol == b"\n" and char == b"\n":
-            return True
-        if self._newline_symbol == b"\r" and char == b"\r":
-            return True
-        if self._newline_symbol == b"\r\n" and char == b"\r":
-            if self._file_handler.read(1) == b"\n":
-                return True
-            else:
-                self._file_handler.seek(-1, 1)
-                return False
-        return False
-
-    def _find_new_line_symbol(self, char) -> bool:
-        if char == b"\n":
-            self._newline_symbol = b"\n"
-            return True
-        if char == b"\r":
-            if self._file_handler.read(1) == b"\n":
-                self._newline_symbol = b"\r\n"
-            else:
-                self._newline_symbol = b"\r"
-                self._file_handler.seek(-1, 1)
-            return True
-        return False
+        self._column += 1
+        self._char_position += 1
+        if byte < 0x80:
+            # looking for a line break may have read a chunk and moved the cursor
+            self._cursor = self._lookahead = self._cursor + 1
+            return chr(byte)
+        char, length = self._decode(0)
+        self._cursor = self._lookahead = self._cursor + length
+        return char
 
     def read_char(self) -> Optional[str]:
-        self._valid_position = False
-        char = self._file_handler.read(1)
-        if char == b"":
+        """
+        Look one character further ahead without consuming it. Consecutive
+        calls walk further ahead; the next get_char resumes at the position.
+        """
+        offset = self._lookahead - self._cursor
+        byte = self._peek(offset)
+        if byte is None:
+            return None
+        if (byte == LF or byte == CR) and (length := self._new_line_length(offset)):
+            self._lookahead = self._cursor + offset + length
+            return DEFAULT_NEW_LINE_SYMBOL
+        if byte < 0x80:
+            self._lookahead = self._cursor + offset + 1
+            return chr(byte)
+        char, length = self._decode(offset)
+        self._lookahead = self._cursor + offset + length
+        return char
+
+    def peek_char(self) -> Optional[str]:
+        """
+        :return: the character get_char would return next, without consuming it
+        """
+        byte = self._peek()
+        if byte is None:
             return None
-        if self._is_new_line(char):
+        if (byte == LF or byte == CR) and self._new_line_length(0):
             return DEFAULT_NEW_LINE_SYMBOL
+        return chr(byte) if byte < 0x80 else self._decode(0)[0]
+
+    def _peek(self, offset: int = 0) -> Optional[int]:
+        """
+        :return: byte at the given distance from the cursor, reading further
+            chunks when it lies past the buffer
+        """
+        while self._cursor + offset >= len(self._buffer):
+            if not self._fill():
+                return None
+        return self._buffer[self._cursor + offset]
+
+    def _new_line_length(self, offset: int) -> int:
+        """
+        :return: length of the line break starting at the given distance from
+            the cursor, 0 when there is none
+        """
+        byte = self._peek(offset)
+        if self._newline_symbol is None:
+            if byte == LF:
+                self._newline_symbol = b"\n"
+                return 1
+            if byte == CR:
+                if self._peek(offset + 1) == LF:
+                    self._newline_symbol = b"\r\n"
+                    return 2
+                self._newline_symbol = b"\r"
+                return 1
+            return 0
+        if self._newline_symbol == b"\n":
+            return 1 if byte == LF else 0
+        if self._newline_symbol == b"\r":
+            return 1 if byte == CR else 0
+        return 2 if byte == CR and self._peek(offset + 1) == LF else 0
+
+    def _fill(self) -> bool:
+        """
+        Read the next chunk into the buffer. Bytes before the start of the
+        current line are dropped so the line stays available for error messages.
+
+        :return: False once the stream is exhausted
+        """
+        if self._eof:
+            return False
+        chunk = self._read_chunk(CHUNK_SIZE)
+        if not chunk:
+            self._eof = True
+            self._line_index.finalize()
+            return False
+        self._line_index.scan(chunk)
+        drop = self._line_start - self._buffer_start
+        # both are done in place, a line many chunks long is not copied
+        # again for each of them
+        del self._buffer[:drop]
+        self._buffer += chunk
+        self._buffer_start += drop
+        self._cursor -= drop
+        self._lookahead -= drop
+        return True
+
+    def _decode(self, offset: int) -> Tuple[str, int]:
+        """
+        Decode the multi-byte UTF-8 character at the given distance from the
+        cursor. Invalid bytes are decoded one at a time as U+FFFD.
+
+        :return: the character and its length in bytes
+        """
+        length = UTF8_SEQUENCE_LENGTH[self._buffer[self._cursor + offset]]
+        if length == 0 or self._peek(offset + length - 1) is None:
+            return REPLACEMENT_CHARACTER, 1
+        index = self._cursor + offset
+        try:
+            return bytes(self._buffer[index : index + length]).decode(), length
+        except UnicodeDecodeError:
+            return REPLACEMENT_CHARACTER, 1
+
+    def read_digits(self) -> str:
+        """
+        Consume the run of digits that follows, as told by str.isdigit. ASCII
+        digits are matched in the buffer in one step.
+
+        :return: the digits
+        """
+        digits = ""
+        while True:
+            cursor = self._cursor
+            end = ASCII_DIGITS_PATTERN.match(self._buffer, cursor).end()
+            if end > cursor:
+                digits += bytes(self._buffer[cursor:end]).decode()
+                self._column += end - cursor
+                self._char_position += end - cursor
+                self._cursor = self._lookahead = end
+            if end < len(self._buffer) and self._buffer[end] < 0x80:
+                return digits
+            # a non-ASCII digit or the end of the buffer
+            char = self.peek_char()
+            if char is None or not char.isdigit():
+                return digits
+            digits += self.get_char()
+
+    def skip_line(self) -> None:
+        """
+        Consume the characters up to the next line break or "\\n", which is
+        left for get_char, without decoding them one by one.
+        """
+        offset = 0
+        while True:
+            match = LINE_BREAK_PATTERN.search(self._buffer, self._cursor + offset)
+            if match is None:
+                offset = len(self._buffer) - self._cursor
+                if not self._fill():
+                    break
+                continue
+            offset = match.start() - self._cursor
+            if match.group() == b"\n" or self._new_line_length(offset):
+                break
+            offset += 1
+        self._advance(offset)
+
+    def skip_to(self, terminator: bytes) -> bool:
+        """
+        Consume the characters up to the next occurrence of the terminator,
+        which is left for get_char, without decoding them one by one.
+
+        :return: False when the source ended first, everything is consumed
+        """
+        search = re.compile(re.escape(terminator)).search
+        offset = 0
+        while (match := search(self._buffer, self._cursor + offset)) is None:
+            offset = max(len(self._buffer) - self._cursor - len(terminator) + 1, 0)
+            if not self._fill():
+                self._advance(len(self._buffer) - self._cursor)
+                return False
+        self._advance(match.start() - self._cursor)
+        return True
+
+    def read_until(self, pattern: re.Pattern) -> str:
+        """
+        Consume the characters up to the first match of the pattern, which
+        is left for get_char, or up to the end of the source.
+
+        :return: the characters as get_char would have returned them
+        """
+        offset = 0
+        while (match := pattern.search(self._buffer, self._cursor + offset)) is None:
+            offset = len(self._buffer) - self._cursor
+            if not self._fill():
+                break
+        end = len(self._buffer) if match is None else match.start()
+        text = self._advance(end - self._cursor)
+        if INVALID_BYTE_PATTERN.search(text):
+            text = text.translate(INVALID_BYTES)
+        symbol = self._newline_symbol
+        if symbol is not None and symbol != b"\n" and symbol.decode() in text:
+            text = text.replace(symbol.decode(), DEFAULT_NEW_LINE_SYMBOL)
+        return text
+
+    def _advance(self, length: int) -> str:
+        """
+        Consume the given number of bytes, updating the position as get_char
+        would have.
+
+        :return: the bytes decoded, invalid ones as lone surrogates
+        """
+        data = bytes(self._buffer[self._cursor : self._cursor + length])
+        if self._newline_symbol is None and (match := LINE_BREAK_PATTERN.search(data)):
+            self._new_line_length(match.start())
+        symbol = self._newline_symbol
+        lines = data.count(symbol) if symbol is not None else 0
+        text = data.decode(errors="surrogateescape")
+        self._char_position += len(text)
+        if lines:
+            # a line break counts as one character
+            self._char_position -= lines * (len(symbol) - 1)
+            line_start = data.rfind(symbol) + len(symbol)
+            self._row += lines
+            self._column = len(data[line_start:].decode(errors="surrogateescape")) + 1
+            self._line_start = self._buffer_start + self._cursor + line_start
         else:
-            return char.decode()
+            self._column += len(text)
+        self._cursor = self._lookahead = self._cursor + length
+        return text
+
+    def read_remaining(self) -> bytes:
+        """
+        Consume the rest of the source at once, for lexers that scan the whole
+        text with regular expressions instead of walking it char by char.
+        """
+        while self._fill():
+            pass
+        data = bytes(self._buffer[self._cursor :])
+        if self._newline_symbol is None:
+            self._newline_symbol = self.line_index.newline_symbol
+        self._char_position += len(data.decode(errors="surrogateescape"))
+        if self._newline_symbol == b"\r\n":
+            self._char_position -= data.count(b"\r\n")
+        self._cursor = self._lookahead = len(self._buffer)
+        self._row, self._column = self.locate(self._buffer_start + self._cursor)
+        self._line_start = self.line_index.line_start(self._row)
+        return data
 
     def get_line_n_offset(self, position: Position) -> Tuple[str, int]:
-        self._valid_position = False
-        start = (
-            self._lines[position.row - 2]
-            if position.row > 1 and len(self._lines) > 1
-            else 0
+        start, end = self._line_bounds(position.row)
+        line = self._read_range(start, end)
+        offset = position.position - start
+        if line.isascii():
+            return line.decode(), offset
+        # offset in characters, so that the caret lines up with the text
+        offset = len(line[:offset].decode(errors="replace")) + max(
+            offset - len(line), 0
         )
-        line = ""
-        self._file_handler.seek(start)
-        if position.row - 1 < len(self._lines):
-            offset = self._lines[position.row - 1] - start
-            line += self._file_handler.read(offset).decode().strip()
-        else:
-            char = self._file_handler.read(1)
-            while not (char == b"" or self._is_new_line(char)):
-                line += char.decode()
-                char = self._file_handler.read(1)
-        return line, position.position - start
+        return line.decode(errors="replace"), offset
+
+    def locate(self, offset: int) -> Tuple[int, int]:
+        """
+        :return: row and column (in characters) of the given byte offset,
+            the row is found by bisection
+        """
+        row, column = self.line_index.locate(offset)
+        start = self.line_index.line_start(row)
+        line = self._read_range(start, offset)
+        if not line.isascii():
+            column = len(line.decode(errors="replace")) + 1
+        return row, column
+
+    @property
+    def line_index(self) -> LineIndex:
+        return self._line_index
+
+    def _line_bounds(self, row: int) -> Tuple[int, int]:
+        while len(self.line_index) <= row and self._fill():
+            pass
+        return self.line_index.line_bounds(row)
+
+    def _read_range(self, start: int, end: int) -> bytes:
+        buffer_start = self._buffer_start
+        if start >= buffer_start and end <= buffer_start + len(self._buffer):
+            return bytes(self._buffer[start - buffer_start : end - buffer_start])
+        if self._file_handler.seekable():
+            offset = self._file_handler.tell()
+            self._file_handler.seek(start)
+            data = self._file_handler.read(end - start)
+            self._file_handler.seek(offset)
+            return data
+        # the line has already been dropped from the buffer of a pipe
+        start = max(start - buffer_start, 0)
+        return bytes(self._buffer[start : max(end - buffer_start, start)])
 
     @property
     def newline_symbol(self) -> Optional[NEWLINE_SYMBOLS]:
@@ -112,7 +381,14 @@ class Reader:
 
     @property
     def position(self) -> Position:
-        return Position(self._position, self._row, self._column)
+        return Position(self._buffer_start + self._cursor, self._row, self._column)
+
+    @property
+    def char_position(self) -> int:
+        """
+        :return: number of characters read so far, a line break counts as one
+        """
+        return self._char_position
 
     def __iter__(self):
         return self
@@ -124,8 +400,13 @@ class Reader:
         return char
 
     def __enter__(self):
-        self._file_handler = open(self.path, "rb")
+        self._file = open(self.path, "rb")
+        self._file_handler = open_decompressed(self._file)
+        self._read_chunk = getattr(self._file_handler, "read1", None) or (
+            self._file_handler.read
+        )
         return self
 
     def __exit__(self, exc_type, exc_val, exc_tb):
         self._file_handler.close()
+        self._file.close()
@@ -0,0 +1,24 @@
+from typing import BinaryIO
+
+from interpreter.reader.compression import open_decompressed
+from interpreter.reader.reader import Reader
+
+
+class StreamReader(Reader):
+    """
+    Reader over an already open binary stream, e.g. stdin. The stream is
+    consumed chunk by chunk and is left open on exit.
+    """
+
+    def __init__(self, stream: BinaryIO):
+        super().__init__()
+        self._file_handler = open_decompressed(stream)
+        self._read_chunk = getattr(self._file_handler, "read1", None) or (
+            self._file_handler.read
+        )
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        pass
@@ -0,0 +1 @@
+from interpreter.resolver.resolver import Resolver, LOCAL, GLOBAL, UNRESOLVED
@@ -0,0 +1,291 @@
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+from interpreter.error_handler import ErrorHandler
+from interpreter.interpreter.builtins import BUILTINS
+from interpreter.program import (
+    IdentifierExpression,
+    Literal,
+    LiteralType,
+    FunctionCallStatement,
+    FunctionDefinitionStatement,
+    MatchStatement,
+    CaseDefaultStatement,
+    CaseStatement,
+    CaseIdentifier,
+    LoopStatement,
+    ConditionalStatement,
+    Assignment,
+    Block,
+    LazyBlock,
+    Parameter,
+    NegatedFactor,
+    MultiplicativeExpression,
+    AdditiveExpression,
+    RelationalExpression,
+    AndExpression,
+    OrExpression,
+    Statement,
+    ReturnStatement,
+    VarDefinition,
+)
+from interpreter.program.program import Program
+from interpreter.program.statement import BreakStatement, ContinueStatement
+from interpreter.visitor.visitor import Visitor
+
+# depths of a resolved variable: the frame of the running call, the globals
+# outside of any, or the globals
+LOCAL = 0
+GLOBAL = 1
+# a name of the top level no statement defines, which is not defined when it
+# is read
+UNRESOLVED = 2
+
+
+class Resolver(Visitor):
+    """
+    Binds the variables of statements to slots, a (depth, slot) pair where
+    they are read, before they are run.
+
+    Blocks do not open scopes: a function has a slot in the frame of its
+    calls for each of its parameters, its own name and every name it defines
+    or assigns to, anywhere in its body. Any other name it uses is a global.
+    As the scopes of Interpreter do, a local name reads the global of the
+    same name until the function sets it.
+
+    A statement of the top level failing before it evaluates anything is
+    reported while resolving it: an assignment to or a call of a name none of
+    the statements so far defines, or a definition of a variable an earlier
+    one always defined. Any other error is left to the runtime checks, a
+    name which cannot be resolved is marked UNRESOLVED.
+    """
+
+    def __init__(self, error_handler: ErrorHandler):
+        self._error_handler = error_handler
+        self.global_slots: Dict[str, int] = {}
+        # globals some statement of the top level defines
+        self._global_names: Set[str] = set()
+        # globals certainly defined
+        self._globals_defined: Set[str] = set()
+        # slots of the function being resolved, None at the top level
+        self._locals: Optional[Dict[str, int]] = None
+        # how many conditionally run blocks the statement is in
+        self._nesting: int = 0
+        for builtin in BUILTINS:
+            name = builtin().name
+            self._global_slot(name)
+            self._global_names.add(name)
+            self._globals_defined.add(name)
+
+    def resolve(self, statement: Statement) -> None:
+        """
+        Resolve a statement of the top level, after the ones before it.
+        """
+        self._global_names.update(_defined_names([statement], assignments=False))
+        self._check(statement)
+        statement.accept(self)
+
+    def _check(self, statement: Statement) -> None:
+        match statement:
+            case VarDefinition() if statement.name in self._globals_defined:
+                self._error_handler.already_defined(statement.position, statement.name)
+            case Assignment() | FunctionCallStatement() if (
+                statement.name not in self._global_names
+            ):
+                self._error_handler.not_defined(statement.position, statement.name)
+
+    def resolve_function(self, statement: FunctionDefinitionStatement) -> None:
+        """
+        Resolve the body of a function, once it is parsed.
+        """
+        body = statement.body
+        if isinstance(body, LazyBlock):
+            body = body.block
+        names = [param.name for param in statement.params] + [statement.name]
+        names.extend(_defined_names(body.statements, assignments=True))
+
+        enclosing = self._locals, self._nesting
+        self._locals = {}
+        for name in names:
+            self._locals.setdefault(name, len(self._locals))
+        self._nesting = 0
+        try:
+            for param in statement.params:
+                self._accept(param)
+            body.accept(self)
+            statement.locals = self._locals
+        finally:
+            self._locals, self._nesting = enclosing
+
+    def _global_slot(self, name: str) -> int:
+        slot = self.global_slots.get(name)
+        if slot is None:
+            slot = self.global_slots[name] = len(self.global_slots)
+        return slot
+
+    def _local_slot(self, name: str) -> int:
+        if self._locals is None:
+            return self._global_slot(name)
+        return self._locals[name]
+
+    def _look_up(self, name: str) -> Tuple[int, Optional[int]]:
+        if self._locals is not None:
+            slot = self._locals.get(name)
+            if slot is not None:
+                return LOCAL, slot
+            # defined by the top level later on, or never
+            return GLOBAL, self._global_slot(name)
+        if name not in self._global_names:
+            return UNRESOLVED, None
+        return LOCAL, self._global_slot(name)
+
+    def _define(self, name: str) -> None:
+        if self._locals is None and self._nesting == 0:
+            self._globals_defined.add(name)
+
+    def _accept(self, node: Optional[Statement]) -> None:
+        # the parser leaves out some operands without reporting it, they
+        # only fail once they run
+        if node is not None:
+            node.accept(self)
+
+    def _accept_nested(self, statement: Optional[Statement]) -> None:
+        self._nesting += 1
+        self._accept(statement)
+        self._nesting -= 1
+
+    def visit_program(self, program: Program):
+        for statement in program.statements:
+            self.resolve(statement)
+
+    def visit_identifier_expression(self, expression: IdentifierExpression):
+        expression.depth, expression.slot = self._look_up(expression.name)
+
+    def visit_literal(self, expression: Literal):
+        pass
+
+    def visit_or_expression(self, expression: OrExpression):
+        self._accept(expression.left)
+        self._accept(expression.right)
+
+    def visit_and_expression(self, expression: AndExpression):
+        self._accept(expression.left)
+        self._accept(expression.right)
+
+    def visit_relational_expression(self, expression: RelationalExpression):
+        self._accept(expression.left)
+        self._accept(expression.right)
+
+    def visit_additive_expression(self, expression: AdditiveExpression):
+        self._accept(expression.left)
+        self._accept(expression.right)
+
+    def visit_multiplicative_expression(self, expression: MultiplicativeExpression):
+        self._accept(expression.left)
+        self._accept(expression.right)
+
+    def visit_negated_expression(self, expression: NegatedFactor):
+        self._accept(expression.factor)
+
+    def visit_parameter(self, parameter: Parameter):
+        parameter.slot = self._local_slot(parameter.name)
+
+    def visit_block(self, statements: Block):
+        for statement in statements.statements:
+            statement.accept(self)
+
+    def visit_lazy_block(self, block: LazyBlock):
+        pass
+
+    def visit_conditional_statement(self, statement: ConditionalStatement):
+        self._accept(statement.condition)
+        self._accept_nested(statement.if_block)
+        self._accept_nested(statement.else_block)
+
+    def visit_loop_statement(self, statement: LoopStatement):
+        self._accept(statement.condition)
+        self._accept_nested(statement.body)
+
+    def visit_case_identifier(self, identifier: CaseIdentifier):
+        pass
+
+    def visit_data_type(self, statement: LiteralType):
+        pass
+
+    def visit_case_statement(self, statement: CaseStatement):
+        for param in statement.params:
+            self._accept(param)
+        statement.body.accept(self)
+
+    def visit_case_default_statement(self, statement: CaseDefaultStatement):
+        for param in statement.params:
+            self._accept(param)
+        statement.body.accept(self)
+
+    def visit_match_statement(self, statement: MatchStatement):
+        for arg in statement.args:
+            self._accept(arg)
+        for case in statement.case_stmts:
+            self._accept_nested(case)
+        self._accept_nested(statement.default_stmt)
+
+    def visit_function_definition_statement(
+        self, statement: FunctionDefinitionStatement
+    ):
+        statement.slot = self._local_slot(statement.name)
+        self._define(statement.name)
+        # a lazily parsed body is resolved on the first call
+        if isinstance(statement.body, Block):
+            self.resolve_function(statement)
+
+    def visit_function_call_statement(self, statement: FunctionCallStatement):
+        statement.depth, statement.slot = self._look_up(statement.name)
+        for argument in statement.arguments:
+            self._accept(argument)
+
+    def visit_return_statement(self, statement: ReturnStatement):
+        self._accept(statement.expression)
+
+    def visit_var_definition(self, statement: VarDefinition):
+        self._accept(statement.expression)
+        statement.slot = self._local_slot(statement.name)
+        self._define(statement.name)
+
+    def visit_assignment(self, statement: Assignment):
+        statement.slot = self._local_slot(statement.name)
+        self._accept(statement.expression)
+
+    def visit_continue_statement(self, statement: ContinueStatement):
+        pass
+
+    def visit_break_statement(self, statement: BreakStatement):
+        pass
+
+
+def _defined_names(statements: List[Statement], assignments: bool) -> Iterator[str]:
+    """
+    :param assignments: whether assigned names count, as they do in
+        functions, where an assignment sets a local variable
+    :return: names the statements define in the current scope, in order
+    """
+    for statement in statements:
+        match statement:
+            case VarDefinition() | FunctionDefinitionStatement():
+                yield statement.name
+            case Assignment() if assignments:
+                yield statement.name
+            case ConditionalStatement():
+                yield from _defined_names(statement.if_block.statements, assignments)
+                if statement.else_block is not None:
+                    else_statements = statement.else_block.statements
+                    yield from _defined_names(else_statements, assignments)
+            case LoopStatement():
+                yield from _defined_names(statement.body.statements, assignments)
+            case MatchStatement():
+                cases = statement.case_stmts + [statement.default_stmt]
+                for case in cases:
+                    if case is None:
+                        continue
+                    yield from (param.name for param in case.params)
+                    yield from _defined_names(case.body.statements, assignments)
+            case Block():
+                yield from _defined_names(statement.statements, assignments)
@@ -0,0 +1,99 @@
+import pytest
+
+from interpreter.compiler import VirtualMachine
+from interpreter.error_handler import ErrorHandler, CriticalError
+from interpreter.interpreter.interpreter import Interpreter
+from interpreter.lexer import Lexer
+from interpreter.parser import Parser
+from interpreter.reader.memory_reader import BytesReader
+
+# programs the backends have to run exactly as Interpreter does
+PROGRAMS = [
+    b"let mut i = 0; let mut s = 0;"
+    b"while i < 50 { i = i + 1; if i % 3 == 0 { continue; } s = s + i;"
+    b" if s > 300 { break; } }",
+    b"fn fib(n) { if n < 2 { return n; } return fib(n - 1) + fib(n - 2); }"
+    b"print(to_str(fib(10)));",
+    b"let a = true or false and not false; let b = -3 * 2 / 4;"
+    b"let c = 'a' + 'b'; let d = 1 != 2; let e = 7 % 4 >= 3;",
+    b"let a = false or false; let b = true and false; let c = not (1 < 2);",
+    # a function without a return results in the last value it computed
+    b"fn f(a) { let b = a * 2; } let x = f(2); fn g(a) {} let y = g(1);",
+    b"fn h(a, b) { fn i(c) {} } let z = h(1, 2);",
+    # a break leaks out of the function it happened in
+    b"fn f() { let mut i = 0; while true { i = i + 1; if i > 2 { break; } }"
+    b" return 5; } let mut a = 0; fn g() { a = f(); a = 7; } g();",
+    # and skips every block until the next loop, even outside of a loop
+    b"fn f() { break; print('a'); } f(); print('b'); if true { print('c'); }"
+    b" while false {} if true { print('d'); }",
+    # so does a continue in the last iteration of a loop
+    b"let mut i = 0; fn g() { while i < 3 { i = i + 1; continue; } print('x'); }"
+    b" g(); print(to_str(i));",
+    b"let mut i = 0; fn c(i) { if i == 2 { continue; } return i < 4; }"
+    b" while c(i) { i = i + 1; }",
+    # the else block runs whatever the condition
+    b"let x = 5; if x < 10 { print('small'); } else { print('big'); }",
+    b"let mut a = 0; if true { a = 1; } else { a = 2; }",
+    b"let mut a = 1; fn f() { a = 2; return a; } let b = f(); let c = a;",
+    b"fn g(n) { if n { return 1; } else { return 2; } }"
+    b"let d = g(true); let e = g(false);",
+    b"fn g(n) { if n { return 1; } return 2; } let d = g(true); let e = g(false);",
+    # the statements of a case run despite a return
+    b"fn m(x) { match x: case 1: { return 1; print('after'); } default: {} }"
+    b"let a = m(1); let b = m(2);",
+    b"let mut a = 2; match a: case 1: {a = a + 1;} default: {a = a + 2;}"
+    b"match a, 3: case isEven: {a = a + 10;} default: {a = 1;}",
+    b"fn m(x, y) { match x, y: case isQuarterO: p, q { return p + q; }"
+    b" case str: { return 0; } default: { return -1; } }"
+    b"let a = m(1, 2); let b = m(-1, 2); let c = m(-1, -2);",
+    b"let a = to_str(1.5); let b = to_str(2); let c = to_str(null);"
+    b"let d = to_str(true); let e = to_str('s');",
+    # an expression left out only fails once it is evaluated
+    b"fn f(n) { let u = --1; return; } print('x');",
+]
+
+
+def global_variables(backend) -> dict:
+    if isinstance(backend, Interpreter):
+        scope = backend._scope
+        return {name: scope.glob[slot] for name, slot in scope.global_slots.items()}
+    if isinstance(backend, VirtualMachine):
+        return backend._globals
+    return backend._scope.glob.var
+
+
+@pytest.fixture(params=PROGRAMS)
+def program(request) -> bytes:
+    return request.param
+
+
+@pytest.fixture
+def run_backend(capsys):
+    """
+    Run a source with a backend statement by statement.
+
+    :return: what it printed, the values of its globals and the error it
+        stopped on
+    """
+
+    def run(backend, source: bytes, lazy: bool = False):
+        error_handler = ErrorHandler()
+        lexer = Lexer(BytesReader(source), error_handler, skip_comments=True)
+        program = Parser(lexer, error_handler, lazy).parse()
+        assert error_handler.errors == []
+        interpreter = backend(error_handler)
+        error = None
+        try:
+            for statement in program.statements:
+                interpreter.execute(statement)
+        except CriticalError as critical_error:
+            error = critical_error
+        out, _ = capsys.readouterr()
+        variables = {
+            name: var.value
+            for name, var in global_variables(interpreter).items()
+            if hasattr(var, "value")
+        }
+        return out, variables, error
+
+    return run
@@ -0,0 +1,62 @@
+import pytest
+
+from interpreter.error_handler import ErrorHandler
+from interpreter.error_handler.error import *
+from interpreter.interpreter.closure_compiler import ClosureCompiler
+from interpreter.interpreter.interpreter import Interpreter
+from interpreter.lexer import Lexer
+from interpreter.parser import Parser
+from interpreter.reader.memory_reader import BytesReader
+
+
+def test_same_as_interpreter(program, run_backend):
+    expected = run_backend(Interpreter, program)
+    assert expected[2] is None
+    assert run_backend(ClosureCompiler, program) == expected
+    assert run_backend(ClosureCompiler, program, lazy=True) == expected
+
+
+@pytest.mark.parametrize(
+    "source, error_type",
+    [
+        (b"let a = 1; let b = a + 'a';", OperationBadTypes),
+        (b"let a = 1 / 0;", ZeroDivision),
+        (b"fn f() { return b; } f();", NotDefined),
+        (b"let a = 1; a();", NotCallable),
+        (b"fn f(a, b) {} f(1);", MissingParameter),
+        (b"fn f(a) {} f(1, 2);", UnexpectedArgument),
+        (b"let a = 1; a = 2;", AssignMut),
+        (b"let a = 1 or true;", UnexpectedType),
+        (b"let a = 1; fn f() { let a = 2; } f();", AlreadyDefined),
+        (b"print(1);", UnexpectedType),
+        (b"fn f() { let a = ; } f();", InvalidFunctionBody),
+    ],
+)
+def test_same_errors_as_interpreter(source, error_type, run_backend):
+    lazy = error_type is InvalidFunctionBody
+    if lazy:
+        error_handler = ErrorHandler()
+        lexer = Lexer(BytesReader(source), error_handler)
+        program = Parser(lexer, error_handler, lazy_functions=True).parse()
+        with pytest.raises(InvalidFunctionBody):
+            ClosureCompiler(error_handler).run(program)
+        return
+
+    _, _, expected = run_backend(Interpreter, source)
+    _, _, error = run_backend(ClosureCompiler, source)
+    assert type(expected) is error_type
+    assert type(error) is error_type
+    assert (error.position, error.msg) == (expected.position, expected.msg)
+
+
+def test_compile_once():
+    error_handler = ErrorHandler()
+    source = b"let mut a = 0;"
+    program = Parser(Lexer(BytesReader(source), error_handler), error_handler).parse()
+    compiler = ClosureCompiler(error_handler)
+    compiler.run(program)
+    lexer = Lexer(BytesReader(b"a = a + 1;"), error_handler)
+    code = compiler.compile(Parser(lexer, error_handler).parse().statements[0])
+    for _ in range(3):
+        code()
+    assert compiler._scope.look_up("a").value.value == 3
@@ -0,0 +1,50 @@
+import bz2
+import gzip
+import io
+import lzma
+
+import pytest
+
+from interpreter.position import Position
+from interpreter.reader.compression import open_decompressed
+from interpreter.reader.mmap_reader import MmapReader
+from interpreter.reader.reader import Reader
+from interpreter.reader.stream_reader import StreamReader
+
+SOURCE = "let a = 'ż';\r\nprint(a);\r\n".encode()
+
+
+@pytest.mark.parametrize("compress", [gzip.compress, bz2.compress, lzma.compress])
+def test_reader_compressed(mocker, compress):
+    mocker.patch("interpreter.reader.reader.CHUNK_SIZE", 3)
+    mocker.patch("builtins.open", return_value=io.BytesIO(compress(SOURCE)))
+    with Reader("path") as reader:
+        assert "".join(reader) == "let a = 'ż';\nprint(a);\n"
+        assert reader.position == Position(len(SOURCE), 3, 1)
+        assert reader.get_line_n_offset(Position(15, 2, 1)) == ("print(a);", 0)
+
+
+def test_reader_uncompressed(mocker):
+    mocker.patch("builtins.open", return_value=io.BytesIO(b"\x1fa"))
+    with Reader("path") as reader:
+        assert list(reader) == ["\x1f", "a"]
+
+
+def test_open_decompressed_keeps_plain_stream():
+    stream = io.BytesIO(SOURCE)
+    assert open_decompressed(stream) is stream
+    assert stream.tell() == 0
+
+
+def test_stream_reader_compressed():
+    stream = io.BufferedReader(io.BytesIO(gzip.compress(SOURCE)))
+    with StreamReader(stream) as reader:
+        assert "".join(reader) == "let a = 'ż';\nprint(a);\n"
+
+
+def test_mmap_reader_compressed(tmp_path):
+    path = tmp_path / "source.xz"
+    path.write_bytes(lzma.compress(SOURCE))
+    with MmapReader(f"{path}") as reader:
+        assert "".join(reader) == "let a = 'ż';\nprint(a);\n"
+        assert reader.get_line_n_offset(Position(15, 2, 1)) == ("print(a);", 0)
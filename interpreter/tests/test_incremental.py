@@ -0,0 +1,68 @@
+from interpreter.error_handler.error import ErrorType
+from interpreter.lexer import incremental
+from interpreter.lexer.incremental import Edit, relex
+from interpreter.lexer.token_buffer import TokenBuffer, tokenize_all
+from interpreter.position import Position
+from interpreter.reader.memory_reader import BytesReader
+from interpreter.token import Token, TokenType
+
+SOURCE = b"let a = 1;\nlet b = 'x';\nprint(a, b);\n"
+
+
+def entries(buffer: TokenBuffer):
+    return [buffer[index] for index in range(len(buffer))], buffer.errors
+
+
+def edited(source: bytes, start: int, end: int, text: bytes):
+    return source[:start] + text + source[end:], Edit(start, end, start + len(text))
+
+
+def test_relex_same_as_tokenize_all():
+    source, edit = edited(SOURCE, 4, 5, b"abc")
+    buffer = relex(tokenize_all(BytesReader(SOURCE)), source, edit)
+    assert entries(buffer) == entries(tokenize_all(BytesReader(source)))
+    assert buffer[1] == Token(TokenType.IDENTIFIER, Position(5, 1, 6), "abc")
+    assert buffer[len(buffer) - 1] == Token(TokenType.EOF, Position(39, 4, 1))
+
+
+def test_relex_shifts_rows():
+    source, edit = edited(SOURCE, 11, 11, b"\n\n")
+    buffer = relex(tokenize_all(BytesReader(SOURCE)), source, edit)
+    assert entries(buffer) == entries(tokenize_all(BytesReader(source)))
+    assert buffer[5].position == Position(14, 4, 2)
+
+
+def test_relex_only_lexes_up_to_a_known_token(mocker):
+    source = b"let a = 1;" * 1000
+    new_source, edit = edited(source, 24, 25, b"22")
+    mocker.patch("interpreter.lexer.incremental.WINDOW", 16)
+    source_spy = mocker.spy(incremental, "Source")
+    buffer = relex(tokenize_all(BytesReader(source)), new_source, edit)
+    assert entries(buffer) == entries(tokenize_all(BytesReader(new_source)))
+    assert [len(call.args[0]) for call in source_spy.call_args_list] == [23]
+
+
+def test_relex_string_opened():
+    source, edit = edited(SOURCE, 8, 9, b"'")
+    buffer = relex(tokenize_all(BytesReader(SOURCE)), source, edit)
+    assert entries(buffer) == entries(tokenize_all(BytesReader(source)))
+    assert buffer[3] == Token(TokenType.STR, Position(9, 1, 10), ";\nlet b = ")
+
+
+def test_relex_shifts_errors():
+    source = b"let a = 1;\nlet b = 01;"
+    new_source, edit = edited(source, 0, 0, b"x; ")
+    buffer = relex(tokenize_all(BytesReader(source)), new_source, edit)
+    assert entries(buffer) == entries(tokenize_all(BytesReader(new_source)))
+    index, error = buffer.errors[0]
+    assert buffer[index] is None
+    assert error.type == ErrorType.LEADING_ZERO
+    assert error.position == Position(24, 2, 11)
+
+
+def test_relex_newline_symbol_changed():
+    source = b"a;\nb;"
+    new_source, edit = edited(source, 0, 0, b"\r\n")
+    buffer = relex(tokenize_all(BytesReader(source)), new_source, edit)
+    assert entries(buffer) == entries(tokenize_all(BytesReader(new_source)))
+    assert buffer.newline_symbol == "\r\n"
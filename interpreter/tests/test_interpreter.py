@@ -8,12 +8,14 @@ from interpreter.comments_filter import CommentsFilter
 from interpreter.error_handler.error_handler import ErrorHandler
 from interpreter.interpreter import Var, DataType, Value, Function
 from interpreter.interpreter.interpreter import Interpreter
+from interpreter.interpreter.value import TRUE, FALSE, NULL
 from interpreter.lexer.ilexer import ILexer
 from interpreter.lexer.lexer import Lexer
 from interpreter.parser.parser import Parser
 from interpreter.program import CaseIdentifier, LiteralType, Literal
 from interpreter.program.operator import CaseOperator
 from interpreter.program.statement import *
+from interpreter.reader.memory_reader import BytesReader
 from interpreter.reader.reader import Reader
 from interpreter.token import Token, TokenType
 from interpreter.error_handler.error import *
@@ -544,3 +546,84 @@ def test_print(mocker, capsys):
     out, err = capsys.readouterr()
     assert out == "s"
     assert len(m.interpreter._scope.stack) == 0
+
+
+def run_lazy(source: bytes, error_handler: ErrorHandler) -> Interpreter:
+    lexer = Lexer(BytesReader(source), error_handler)
+    program = Parser(lexer, error_handler, lazy_functions=True).parse()
+    interpreter = Interpreter(error_handler)
+    program.accept(interpreter)
+    return interpreter
+
+
+def test_lazy_function_call():
+    error_handler = ErrorHandler()
+    interpreter = run_lazy(
+        b"fn a(n){return n + 1;} let b = a(1); let c = a(b);", error_handler
+    )
+    assert interpreter._scope.look_up("c").value.value == 3
+    assert isinstance(interpreter._scope.look_up("a").body, Block)
+
+
+def test_lazy_function_call_invalid_body():
+    error_handler = ErrorHandler()
+    with pytest.raises(InvalidFunctionBody):
+        run_lazy(b"fn a(){let b = ;} fn c(){let d = ;} a();", error_handler)
+    assert [error.type for error in error_handler.errors] == [
+        ErrorType.EXPRESSION_EXPECTED
+    ]
+
+
+def run(source: bytes, error_handler: ErrorHandler) -> Interpreter:
+    program = Parser(Lexer(BytesReader(source), error_handler), error_handler).parse()
+    interpreter = Interpreter(error_handler)
+    program.accept(interpreter)
+    return interpreter
+
+
+def test_literal_values_shared():
+    lexer = Lexer(
+        BytesReader(b"let a = 1; let b = true; let c = null;"), ErrorHandler()
+    )
+    program = Parser(lexer, ErrorHandler()).parse()
+    interpreter = Interpreter(ErrorHandler())
+    program.accept(interpreter)
+
+    let_a = program.statements[0]
+    assert interpreter._scope.look_up("a").value is let_a.expression.constant
+    assert interpreter._scope.look_up("b").value is TRUE
+    assert interpreter._scope.look_up("c").value is NULL
+
+    interpreter = run(b"let a = 1 < 2; let b = not true and true;", ErrorHandler())
+    assert interpreter._scope.look_up("a").value is TRUE
+    assert interpreter._scope.look_up("b").value is FALSE
+
+
+def test_nested_arithmetic():
+    interpreter = run(
+        b"let a = -(1 + 2) * 3 % 2; let b = 2 * 3 < 10 - 3; let c = 'a' + 'b';",
+        ErrorHandler(),
+    )
+    assert interpreter._scope.look_up("a").value == Value(DataType.NUM, 1)
+    assert interpreter._scope.look_up("b").value is TRUE
+    assert interpreter._scope.look_up("c").value == Value(DataType.NUM, "ab")
+
+    with pytest.raises(OperationBadTypes):
+        run(b"let a = 1 + 2 * not true;", ErrorHandler())
+    with pytest.raises(OperationBadTypes):
+        run(b"let a = 'a' < 1 + 1;", ErrorHandler())
+    with pytest.raises(ZeroDivision):
+        run(b"let a = 1 + 1 / (2 - 2);", ErrorHandler())
+
+
+def test_untyped_operand():
+    # to_str of a str results in the Var of its argument, an operation only
+    # fails on it once its other operand has been evaluated
+    with pytest.raises(UnexpectedArgument):
+        run(b"fn g() { return 1; } let a = to_str('s') <= g(null);", ErrorHandler())
+    with pytest.raises(NotDefined):
+        run(b"let a = to_str('s'); let b = a + c;", ErrorHandler())
+    with pytest.raises(AttributeError):
+        run(b"let a = to_str('s'); let b = 1 + a;", ErrorHandler())
+    with pytest.raises(AttributeError):
+        run(b"let a = -to_str('s');", ErrorHandler())
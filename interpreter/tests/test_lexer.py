@@ -1,11 +1,12 @@
 import io
 
 from interpreter.lexer.lexer import Lexer
+from interpreter.lexer.symbol_table import SymbolTable
 from interpreter.position import Position
 from interpreter.reader.reader import Reader
 from interpreter.error_handler.error_handler import ErrorHandler
 from interpreter.error_handler.error import ErrorType
-from interpreter.token import TokenType
+from interpreter.token import Token, TokenType
 
 
 def test__build_base(mocker):
@@ -36,11 +37,12 @@ def test__build_base_overflow(mocker):
         assert error_handler[0].type == ErrorType.NUM_OVERFLOW_ERROR
 
 
-def test__build_fraction(mocker):
-    mocker.patch("builtins.open", return_value=io.BytesIO(b"0123"))
+def test__build_digit_sequence(mocker):
+    mocker.patch("builtins.open", return_value=io.BytesIO(b"0123a"))
     with Reader("path") as reader:
         lexer = Lexer(reader, ErrorHandler())
-        assert lexer._build_fraction() == 0.0123
+        assert lexer._build_digit_sequence() == "0123"
+        assert lexer._char == "a"
 
 
 def test__build_num_no_fraction(mocker):
@@ -70,6 +72,24 @@ def test__build_num_fraction(mocker):
         assert num.value == 123.0123
 
 
+def test__build_num_correctly_rounded(mocker):
+    mocker.patch("builtins.open", return_value=io.BytesIO(b"1668.614324732"))
+    with Reader("path") as reader:
+        lexer = Lexer(reader, ErrorHandler())
+        assert lexer._build_num().value == float("1668.614324732")
+
+
+def test__build_num_fraction_overflow(mocker):
+    mocker.patch("builtins.open", return_value=io.BytesIO(b"1." + b"9" * 45 + b"a"))
+    with Reader("path") as reader:
+        error_handler = ErrorHandler()
+        lexer = Lexer(reader, error_handler)
+        assert lexer._build_num() is None
+        assert lexer._char == "a"
+        assert error_handler.errors[0].type == ErrorType.NUM_OVERFLOW_ERROR
+        assert error_handler.errors[0].position == Position(42, 1, 43)
+
+
 def test__build_num_leading_zero(mocker):
     mocker.patch("builtins.open", return_value=io.BytesIO(b"0123.0123"))
     with Reader("path") as reader:
@@ -188,6 +208,19 @@ def test__build_str_quote_escape_characters(mocker):
         assert token.value == "a\\a\na\ra\ta\ba\f\\q\\w"
 
 
+def test__build_str_quote_across_chunks(mocker):
+    mocker.patch("interpreter.reader.reader.CHUNK_SIZE", 3)
+    mocker.patch(
+        "builtins.open",
+        return_value=io.BytesIO(b"'a\xc5\xbc\r\nb\\n\xff\r\n' x"),
+    )
+    with Reader("path") as reader:
+        lexer = Lexer(reader, ErrorHandler())
+        token = lexer._build_str_quote("'")
+        assert token.value == "a\u017c\nb\n\ufffd\n"
+        assert lexer.next_token().position == Position(15, 3, 4)
+
+
 def test__build_str_quote_unexpected_eof(mocker):
     mocker.patch("builtins.open", return_value=io.BytesIO(b"'asd"))
     with Reader("path") as reader:
@@ -369,3 +402,43 @@ def test_next_token_condition(mocker):
         assert lexer.next_token().token_type == TokenType.SEMICOLON
         assert lexer.next_token().token_type == TokenType.RIGHT_CURLY_BRACKET
         assert lexer.next_token().token_type == TokenType.EOF
+
+
+def test_identifiers_are_interned(mocker):
+    mocker.patch("builtins.open", return_value=io.BytesIO(b"abc abc 'x' 'x'"))
+    with Reader("path") as reader:
+        symbol_table = SymbolTable(max_string_length=1)
+        lexer = Lexer(reader, ErrorHandler(), symbol_table)
+        tokens = [lexer.next_token() for _ in range(4)]
+        assert tokens[0].value is tokens[1].value
+        assert tokens[2].value is tokens[3].value
+        assert list(symbol_table) == ["abc", "x"]
+        assert lexer.symbol_table is symbol_table
+
+
+def test_skip_comments(mocker):
+    mocker.patch(
+        "builtins.open", return_value=io.BytesIO(b"a // b\r\n/* c\r\nd */ / e //")
+    )
+    with Reader("path") as reader:
+        lexer = Lexer(reader, ErrorHandler(), skip_comments=True)
+        assert lexer.next_token() == Token(TokenType.IDENTIFIER, Position(1, 1, 2), "a")
+        assert lexer.next_token() == Token(
+            TokenType.DIVISION_OPERATOR, Position(20, 3, 7)
+        )
+        assert lexer.next_token() == Token(
+            TokenType.IDENTIFIER, Position(22, 3, 9), "e"
+        )
+        assert lexer.next_token().token_type == TokenType.EOF
+
+
+def test_skip_comments_unexpected_eof(mocker):
+    mocker.patch("builtins.open", return_value=io.BytesIO(b"a /* b"))
+    with Reader("path") as reader:
+        error_handler = ErrorHandler()
+        lexer = Lexer(reader, error_handler, skip_comments=True)
+        assert lexer.next_token().token_type == TokenType.IDENTIFIER
+        assert lexer.next_token() is None
+        assert error_handler.errors[0].type == ErrorType.UNEXPECTED_END_OF_TEXT
+        assert error_handler.errors[0].position == Position(3, 1, 4)
+        assert lexer.next_token().token_type == TokenType.EOF
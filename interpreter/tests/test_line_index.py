@@ -0,0 +1,78 @@
+import io
+
+from interpreter.position import Position
+from interpreter.reader.line_index import LineIndex
+from interpreter.reader.reader import Reader
+
+
+def build(*chunks: bytes) -> LineIndex:
+    line_index = LineIndex()
+    for chunk in chunks:
+        line_index.scan(chunk)
+    line_index.finalize()
+    return line_index
+
+
+def test_scan_lf():
+    line_index = build(b"a\nbc\n\nd")
+    assert line_index.newline_symbol == b"\n"
+    assert len(line_index) == 4
+    assert line_index.line_bounds(2) == (2, 4)
+    assert line_index.line_bounds(3) == (5, 5)
+    assert line_index.line_bounds(4) == (6, 7)
+
+
+def test_scan_crlf():
+    line_index = build(b"a\r\nbc\r\nd")
+    assert line_index.newline_symbol == b"\r\n"
+    assert line_index.line_bounds(1) == (0, 1)
+    assert line_index.line_bounds(2) == (3, 5)
+    assert line_index.line_bounds(3) == (7, 8)
+
+
+def test_scan_only_first_symbol_is_a_line_break():
+    line_index = build(b"a\rb\nc\rd")
+    assert line_index.newline_symbol == b"\r"
+    assert len(line_index) == 3
+    assert line_index.line_bounds(2) == (2, 5)
+
+
+def test_scan_crlf_split_between_chunks():
+    line_index = build(b"a\r", b"\nb\r", b"\nc")
+    assert line_index.newline_symbol == b"\r\n"
+    assert len(line_index) == 3
+    assert line_index.line_bounds(3) == (6, 7)
+
+
+def test_scan_trailing_cr():
+    line_index = build(b"ab\r")
+    assert line_index.newline_symbol == b"\r"
+    assert line_index.line_bounds(2) == (3, 3)
+
+
+def test_line_bounds_out_of_range():
+    assert build(b"a\nb").line_bounds(5) == (3, 3)
+
+
+def test_locate():
+    line_index = build(b"ab\ncd\nef")
+    assert line_index.locate(1) == (1, 2)
+    assert line_index.locate(3) == (2, 1)
+    assert line_index.locate(5) == (2, 3)
+    assert line_index.locate(8) == (3, 3)
+
+
+def test_reader_get_line_before_reading(mocker):
+    mocker.patch("builtins.open", return_value=io.BytesIO(b"a\n  bcd\ne"))
+    with Reader("path") as reader:
+        assert reader.get_char() == "a"
+        assert reader.get_line_n_offset(Position(5, 2, 4)) == ("  bcd", 3)
+        assert reader.get_char() == "\n"
+        assert reader.get_char() == " "
+
+
+def test_reader_locate(mocker):
+    mocker.patch("builtins.open", return_value=io.BytesIO(b"x\r\nlet"))
+    with Reader("path") as reader:
+        list(reader)
+        assert reader.locate(reader.position.position) == (2, 4)
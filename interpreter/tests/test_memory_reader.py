@@ -0,0 +1,68 @@
+from interpreter.error_formatter import ErrorFormatter
+from interpreter.error_handler import ErrorHandler
+from interpreter.lexer import Lexer
+from interpreter.position import Position
+from interpreter.reader.memory_reader import BytesReader, StringReader
+from interpreter.token import TokenType
+
+
+def test_bytes_reader_get_char_crlf():
+    reader = BytesReader(b"x\r\nlet")
+    assert reader.get_char() == "x"
+    assert reader.get_char() == "\n"
+    assert reader.newline_symbol == b"\r\n"
+    assert reader.position == Position(3, 2, 1)
+    assert list(reader) == ["l", "e", "t"]
+    assert reader.get_char() is None
+
+
+def test_bytes_reader_read_char():
+    with BytesReader(b"let") as reader:
+        assert reader.get_char() == "l"
+        assert reader.read_char() == "e"
+        assert reader.read_char() == "t"
+        assert reader.read_char() is None
+        assert reader.position == Position(1, 1, 2)
+        assert reader.get_char() == "e"
+
+
+def test_bytes_reader_accepts_bytearray():
+    assert list(BytesReader(bytearray(b"ab"))) == ["a", "b"]
+
+
+def test_string_reader():
+    reader = StringReader("a\rb")
+    assert list(reader) == ["a", "\n", "b"]
+    assert reader.newline_symbol == b"\r"
+    assert reader.position == Position(3, 2, 2)
+
+
+def test_string_reader_get_line():
+    reader = StringReader("a\nb\nc\nd\n")
+    list(reader)
+    assert reader.get_line_n_offset(Position(4, 3, 1)) == ("c", 0)
+
+
+def test_string_reader_lexer():
+    lexer = Lexer(StringReader("let mut x = 1;"), ErrorHandler())
+    token_types = []
+    while (token := lexer.next_token()).token_type != TokenType.EOF:
+        token_types.append(token.token_type)
+    assert token_types == [
+        TokenType.LET,
+        TokenType.MUT,
+        TokenType.IDENTIFIER,
+        TokenType.ASSIGNMENT_OPERATOR,
+        TokenType.NUM,
+        TokenType.SEMICOLON,
+    ]
+
+
+def test_string_reader_error_formatter():
+    reader = StringReader("let a = 1;\nlet b = 0123;")
+    error_handler = ErrorHandler()
+    lexer = Lexer(reader, error_handler)
+    while (token := lexer.next_token()) is None or token.token_type != TokenType.EOF:
+        pass
+    msg = ErrorFormatter(reader).get_error_msg(error_handler[0])
+    assert " 2 | let b = 0123;\n" in msg
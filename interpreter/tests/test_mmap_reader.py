@@ -0,0 +1,93 @@
+from collections.abc import Iterable
+
+from interpreter.position import Position
+from interpreter.reader.mmap_reader import MmapReader
+
+
+def write_source(tmp_path, content: bytes) -> str:
+    path = tmp_path / "source"
+    path.write_bytes(content)
+    return f"{path}"
+
+
+def test_get_char_lf(tmp_path):
+    with MmapReader(write_source(tmp_path, b"x\nlet")) as reader:
+        assert reader.get_char() == "x"
+        assert reader.position == Position(1, 1, 2)
+
+        assert reader.get_char() == "\n"
+        assert reader.position == Position(2, 2, 1)
+
+        assert reader.get_char() == "l"
+        assert reader.get_char() == "e"
+        assert reader.position == Position(4, 2, 3)
+
+
+def test_get_char_cr(tmp_path):
+    with MmapReader(write_source(tmp_path, b"x\rlet")) as reader:
+        assert reader.get_char() == "x"
+        assert reader.get_char() == "\n"
+        assert reader.newline_symbol == b"\r"
+        assert reader.position == Position(2, 2, 1)
+
+
+def test_get_char_crlf(tmp_path):
+    with MmapReader(write_source(tmp_path, b"x\r\nlet")) as reader:
+        assert reader.get_char() == "x"
+        assert reader.get_char() == "\n"
+        assert reader.newline_symbol == b"\r\n"
+        assert reader.position == Position(3, 2, 1)
+
+        assert reader.get_char() == "l"
+        assert reader.get_char() == "e"
+        assert reader.position == Position(5, 2, 3)
+
+
+def test_get_char_lone_cr_after_lf(tmp_path):
+    with MmapReader(write_source(tmp_path, b"\na\rb")) as reader:
+        assert list(reader) == ["\n", "a", "\r", "b"]
+        assert reader.position == Position(4, 2, 4)
+
+
+def test_empty_file(tmp_path):
+    with MmapReader(write_source(tmp_path, b"")) as reader:
+        assert reader.get_char() is None
+        assert reader.position == Position(0, 1, 1)
+
+
+def test_iterator(tmp_path):
+    with MmapReader(write_source(tmp_path, b"asd")) as reader:
+        assert isinstance(iter(reader), Iterable)
+        assert list(reader) == ["a", "s", "d"]
+
+
+def test_read_char(tmp_path):
+    with MmapReader(write_source(tmp_path, b"let")) as reader:
+        assert reader.get_char() == "l"
+        assert reader.position == Position(1, 1, 2)
+
+        assert reader.read_char() == "e"
+        assert reader.position == Position(1, 1, 2)
+        reader.read_char()
+        assert reader.read_char() is None
+        assert reader.get_char() == "e"
+
+
+def test_get_line(tmp_path):
+    with MmapReader(write_source(tmp_path, b"\na\nb\n")) as reader:
+        list(reader)
+        assert reader.get_line_n_offset(Position(2, 2, 1))[0] == "a"
+        assert reader.get_line_n_offset(Position(1, 1, 1))[0] == ""
+
+
+def test_get_line_last_line(tmp_path):
+    with MmapReader(write_source(tmp_path, b"a\nb\n")) as reader:
+        list(reader)
+        assert reader.get_line_n_offset(Position(3, 2, 1)) == ("b", 1)
+        assert reader.get_line_n_offset(Position(4, 3, 1))[0] == ""
+
+
+def test_get_line_not_read_yet(tmp_path):
+    with MmapReader(write_source(tmp_path, b"ab\r\ncd")) as reader:
+        reader.get_char()
+        assert reader.get_line_n_offset(Position(1, 1, 2)) == ("ab", 1)
@@ -0,0 +1,53 @@
+import pytest
+
+from interpreter.error_handler import ErrorHandler
+from interpreter.lexer import Lexer
+from interpreter.lexer.parallel import tokenize_parallel
+from interpreter.lexer.symbol_table import SymbolTable
+from interpreter.lexer.token_buffer import tokenize_all, TokenBufferLexer
+from interpreter.reader.memory_reader import BytesReader
+from interpreter.token import TokenType
+
+
+def entries(buffer):
+    return [
+        (buffer.token_type(index), buffer.position(index), buffer.value(index))
+        for index in range(len(buffer))
+    ]
+
+
+@pytest.mark.parametrize(
+    "source",
+    [
+        b"fn f(n) { return n * f(n - 1); }\r\nlet x = f(3) + 'x';\r\nprint(x);",
+        b"let s = 'a; b } c'; /* ; } */ let t = s; // ;\nlet u = t;",
+        b"let a = 0123; let b = " + b"9" * 45 + b"; let c = \xc5\xbc\xff;",
+        b"let a = 1; let s = 'unterminated; let b = 2;",
+        b"let a = 1; @ let b = 2; let c = 3;",
+        b"let a = 1; /* unterminated; let b = 2;",
+    ],
+)
+def test_same_buffer_as_tokenize_all(source):
+    symbol_table = SymbolTable(4)
+    buffer = tokenize_parallel(BytesReader(source), symbol_table, 2, chunk_size=4)
+    expected_table = SymbolTable(4)
+    expected = tokenize_all(BytesReader(source), expected_table)
+    assert entries(buffer) == entries(expected)
+    assert buffer.errors == expected.errors
+    assert buffer.values == expected.values
+    assert list(symbol_table) == list(expected_table)
+
+
+def test_same_tokens_as_lexer():
+    source = b"let a = 1;\nfn f() { return a; }\nprint(f());" * 20
+    lexer = Lexer(BytesReader(source), ErrorHandler())
+    buffer = tokenize_parallel(BytesReader(source), workers=2, chunk_size=64)
+    adapter = TokenBufferLexer(buffer, ErrorHandler())
+    while (token := lexer.next_token()).token_type != TokenType.EOF:
+        assert adapter.next_token() == token
+    assert adapter.next_token() == token
+
+
+def test_identifiers_are_interned_across_chunks():
+    buffer = tokenize_parallel(BytesReader(b"abc; abc;"), workers=2, chunk_size=1)
+    assert buffer.value(0) is buffer.value(2)
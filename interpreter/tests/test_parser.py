@@ -5,17 +5,29 @@ import pytest
 
 from interpreter.error_handler import ErrorType
 from interpreter.error_handler.error_handler import ErrorHandler
+from interpreter.lexer import Lexer
 from interpreter.lexer.ilexer import ILexer
-from interpreter.parser.parser import Parser
+from interpreter.parser.parser import Parser, parse_lazy_block
 from interpreter.program import (
     CaseIdentifier,
     LiteralType,
     Literal,
     Expression,
     OrExpression,
+    AndExpression,
+    RelationalExpression,
+    AdditiveExpression,
+    NegatedFactor,
+    IdentifierExpression,
+)
+from interpreter.program.operator import (
+    CaseOperator,
+    RelationalOperator,
+    AdditiveOperator,
+    MultiplicativeOperator,
 )
-from interpreter.program.operator import CaseOperator
 from interpreter.program.statement import *
+from interpreter.reader.memory_reader import BytesReader
 from interpreter.reader.reader import Reader
 from interpreter.token import Token, TokenType
 
@@ -65,7 +77,7 @@ def test__consume_if_false(_mocker):
 
 
 @patch("builtins.open")
-def test_consume_if_iter_list(_mocker):
+def test_consume_if_any_list(_mocker):
     with Reader("path") as _reader:
         position = Position(0, 0, 0)
         lexer = LexerMock(
@@ -75,12 +87,12 @@ def test_consume_if_iter_list(_mocker):
             ]
         )
         parser = Parser(lexer, ErrorHandler())
-        assert parser._consume_if([TokenType.ELSE, TokenType.IDENTIFIER])
+        assert parser._consume_if_any([TokenType.ELSE, TokenType.IDENTIFIER])
         assert lexer.token.token_type == TokenType.LESS_OPERATOR
 
 
 @patch("builtins.open")
-def test_consume_if_iter_tuple(_mocker):
+def test_consume_if_any_tuple(_mocker):
     with Reader("path") as _reader:
         position = Position(0, 0, 0)
         lexer = LexerMock(
@@ -90,12 +102,12 @@ def test_consume_if_iter_tuple(_mocker):
             ]
         )
         parser = Parser(lexer, ErrorHandler())
-        assert parser._consume_if((TokenType.ELSE, TokenType.IDENTIFIER))
+        assert parser._consume_if_any((TokenType.ELSE, TokenType.IDENTIFIER))
         assert lexer.token.token_type == TokenType.LESS_OPERATOR
 
 
 @patch("builtins.open")
-def test_consume_if_iter_false(_mocker):
+def test_consume_if_any_false(_mocker):
     with Reader("path") as _reader:
         position = Position(0, 0, 0)
         lexer = LexerMock(
@@ -104,25 +116,10 @@ def test_consume_if_iter_false(_mocker):
             ]
         )
         parser = Parser(lexer, ErrorHandler())
-        assert parser._consume_if([TokenType.ELSE, TokenType.IDENTIFIER]) is False
+        assert parser._consume_if_any([TokenType.ELSE, TokenType.IDENTIFIER]) is False
         assert lexer.token.token_type == TokenType.LESS_OPERATOR
 
 
-@patch("builtins.open")
-def test_consume_if_iter_unknown_type(_mocker):
-    with pytest.raises(Exception):
-        with Reader("path") as _reader:
-            position = Position(0, 0, 0)
-            lexer = LexerMock(
-                [
-                    Token(TokenType.IDENTIFIER, position),
-                    Token(TokenType.LESS_OPERATOR, position),
-                ]
-            )
-            parser = Parser(lexer, ErrorHandler())
-            parser._consume_if(1)
-
-
 @patch("builtins.open")
 def test__parse_var_definition(_mocker):
     with Reader("path") as _reader:
@@ -1388,3 +1385,194 @@ def test__parse_parenthesis_no_right_bracket(_mocker):
         parser = Parser(lexer, error_handler)
         expr = parser._parse_parenthesis()
         assert expr is None
+
+
+def parser_for(source: bytes, error_handler: ErrorHandler) -> Parser:
+    return Parser(Lexer(BytesReader(source), error_handler), error_handler)
+
+
+def test__parse_expression_precedence():
+    error_handler = ErrorHandler()
+    parser = parser_for(b"a or not b and c < d + e * f", error_handler)
+    stmt = parser._parse_expression()
+    assert isinstance(stmt, OrExpression)
+    assert stmt.position == Position(3, 1, 4)
+    assert isinstance(stmt.right, AndExpression)
+    assert isinstance(stmt.right.left, NegatedFactor)
+    relational = stmt.right.right
+    assert isinstance(relational, RelationalExpression)
+    assert relational.operator == RelationalOperator.LESS
+    additive = relational.right
+    assert isinstance(additive, AdditiveExpression)
+    assert additive.left == IdentifierExpression("d", Position(22, 1, 23))
+    assert additive.right.operator == MultiplicativeOperator.MULTIPLICATION
+    assert error_handler.errors == []
+
+
+def test__parse_expression_left_associative():
+    error_handler = ErrorHandler()
+    parser = parser_for(b"a - b - c", error_handler)
+    stmt = parser._parse_expression()
+    assert stmt.right == IdentifierExpression("c", Position(9, 1, 10))
+    assert stmt.position == Position(7, 1, 8)
+    assert stmt.left.left == IdentifierExpression("a", Position(3, 1, 4))
+    assert stmt.left.right == IdentifierExpression("b", Position(7, 1, 8))
+    assert stmt.left.position == Position(3, 1, 4)
+
+
+def test__parse_expression_missing_operand_not_extended():
+    error_handler = ErrorHandler()
+    parser = parser_for(b"a + * b", error_handler)
+    stmt = parser._parse_expression()
+    assert stmt == AdditiveExpression(
+        AdditiveOperator.ADDITION,
+        IdentifierExpression("a", Position(3, 1, 4)),
+        None,
+        Position(3, 1, 4),
+    )
+    assert parser._token.token_type == TokenType.MULTIPLICATION_OPERATOR
+    assert error_handler.errors[0].type == ErrorType.EXPRESSION_EXPECTED
+
+
+def test__parse_expression_nested_brackets():
+    error_handler = ErrorHandler()
+    parser = parser_for(b"(" * 150 + b"1" + b")" * 150, error_handler)
+    stmt = parser._parse_expression()
+    assert stmt == Literal(LiteralType.NUM, 1.0, Position(152, 1, 153))
+
+
+def test__parse_statement_dispatch():
+    error_handler = ErrorHandler()
+    parser = parser_for(b"let a = 1; while a { break; } f(a); fn g() {}", error_handler)
+    statements = parser.parse().statements
+    assert [type(statement) for statement in statements] == [
+        VarDefinition,
+        LoopStatement,
+        FunctionCallStatement,
+        FunctionDefinitionStatement,
+    ]
+    assert error_handler.errors == []
+
+
+def test__parse_statement_bare_identifier():
+    error_handler = ErrorHandler()
+    parser = parser_for(b"a return 1; b let c = 1;", error_handler)
+    statements = parser.parse().statements
+    assert [type(statement) for statement in statements] == [
+        ReturnStatement,
+        VarDefinition,
+    ]
+    assert [error.type for error in error_handler.errors] == [ErrorType.NO_EFFECT] * 2
+
+
+def test_parse_reports_every_error():
+    error_handler = ErrorHandler()
+    source = b"""let a = ;
+let b = 1 2 3;
+while a { ) let c = 1; }
+} f(a);
+print(a)"""
+    parser = parser_for(source, error_handler)
+    statements = parser.parse().statements
+    assert [type(statement) for statement in statements] == [
+        VarDefinition,
+        VarDefinition,
+        LoopStatement,
+        FunctionCallStatement,
+        FunctionCallStatement,
+    ]
+    assert statements[2].body.statements[0].name == "c"
+    assert [(error.type, error.position.row) for error in error_handler.errors] == [
+        (ErrorType.EXPRESSION_EXPECTED, 1),
+        (ErrorType.SEMICOLON_EXPECTED, 2),
+        (ErrorType.STATEMENT_EXPECTED, 3),
+        (ErrorType.STATEMENT_EXPECTED, 4),
+        (ErrorType.SEMICOLON_EXPECTED, 5),
+    ]
+
+
+def test_parse_stops_at_lexer_error():
+    error_handler = ErrorHandler()
+    source = b"a = b(); a = 7 < x if % 1 > 's'; let mut g 's c < false;"
+    parser = parser_for(source, error_handler)
+    statements = parser.parse().statements
+    assert [type(statement) for statement in statements] == [
+        Assignment,
+        Assignment,
+        ConditionalStatement,
+        VarDefinition,
+    ]
+    assert [error.type for error in error_handler.errors][:4] == [
+        ErrorType.SEMICOLON_EXPECTED,
+        ErrorType.EXPRESSION_EXPECTED,
+        ErrorType.CODE_BLOCK_EXPECTED,
+        ErrorType.UNEXPECTED_END_OF_TEXT,
+    ]
+    assert parser._token.token_type == TokenType.EOF
+
+    error_handler = ErrorHandler()
+    parser = parser_for(b"while 1 < 's", error_handler)
+    assert [type(statement) for statement in parser.parse().statements] == [
+        LoopStatement
+    ]
+    assert error_handler.errors[0].type == ErrorType.UNEXPECTED_END_OF_TEXT
+
+    error_handler = ErrorHandler()
+    lexer = Lexer(BytesReader(b"fn f() {} 's"), error_handler)
+    parser = Parser(lexer, error_handler, lazy_functions=True)
+    assert [type(statement) for statement in parser.parse().statements] == [
+        FunctionDefinitionStatement
+    ]
+
+
+def test_parse_skips_nested_block():
+    error_handler = ErrorHandler()
+    parser = parser_for(b"fn f() { 1 { let a = 1; } let b = 2; }", error_handler)
+    statements = parser.parse().statements
+    assert [s.name for s in statements[0].body.statements] == ["b"]
+    assert [error.type for error in error_handler.errors] == [
+        ErrorType.STATEMENT_EXPECTED
+    ]
+
+
+LAZY_SOURCE = b"""fn outer(a) {
+    fn inner(b) { if b { return { 1 }; } return b; }
+    return inner(a);
+}
+let x = outer(1);
+fn empty() {}"""
+
+
+def test_parse_lazy_functions():
+    error_handler = ErrorHandler()
+    eager = parser_for(LAZY_SOURCE, error_handler).parse()
+    lexer = Lexer(BytesReader(LAZY_SOURCE), error_handler)
+    lazy = Parser(lexer, error_handler, lazy_functions=True).parse()
+    assert isinstance(lazy.statements[0].body, LazyBlock)
+    assert isinstance(lazy.statements[1], VarDefinition)
+    assert isinstance(lazy.statements[2].body, LazyBlock)
+
+    outer = parse_lazy_block(lazy.statements[0].body, error_handler)
+    assert parse_lazy_block(lazy.statements[0].body, error_handler) is outer
+    assert isinstance(outer.statements[0].body, LazyBlock)
+    inner = parse_lazy_block(outer.statements[0].body, error_handler)
+    assert inner == eager.statements[0].body.statements[0].body
+    outer.statements[0].body = inner
+    assert outer == eager.statements[0].body
+    assert parse_lazy_block(lazy.statements[2].body, error_handler) == Block([])
+
+
+def test_parse_lazy_functions_reports_errors_on_demand():
+    error_handler = ErrorHandler()
+    lexer = Lexer(
+        BytesReader(b"fn f() { let a = ; } fn g() { let b = 1"), error_handler
+    )
+    program = Parser(lexer, error_handler, lazy_functions=True).parse()
+    # the unclosed body is parsed right away, as eager parsing would
+    assert program.statements[1].body is None
+    assert [error.type for error in error_handler.errors] == [
+        ErrorType.SEMICOLON_EXPECTED,
+        ErrorType.RIGHT_CURLY_BRACKET_EXPECTED,
+    ]
+    parse_lazy_block(program.statements[0].body, error_handler)
+    assert error_handler.errors[2].type == ErrorType.EXPRESSION_EXPECTED
@@ -0,0 +1,34 @@
+import pickle
+
+import pytest
+
+from interpreter.position import Position
+from interpreter.program import Literal, LiteralType
+
+
+def test_fields():
+    position = Position(1 << 40, 70000, 1 << 31)
+    assert position.position == 1 << 40
+    assert position.row == 70000
+    assert position.column == 1 << 31
+    assert repr(Position(3, 1, 4)) == "Position(position=3, row=1, column=4)"
+
+
+def test_eq():
+    assert Position(3, 1, 4) == Position(3, 1, 4)
+    assert Position(3, 1, 4) != Position(3, 2, 4)
+    assert Position(3, 1, 4) != int(Position(3, 1, 4))
+    assert Position(0, 0, 0)
+
+
+def test_out_of_range():
+    with pytest.raises(ValueError):
+        Position(-1, 1, 1)
+    with pytest.raises(ValueError):
+        Position(0, 1 << 32, 1)
+
+
+def test_pickle():
+    literal = Literal(LiteralType.NUM, 1.0, Position(3, 1, 4))
+    assert pickle.loads(pickle.dumps(literal)) == literal
+    assert not hasattr(literal, "__dict__")
@@ -0,0 +1,85 @@
+import json
+
+from interpreter.error_handler import ErrorHandler
+from interpreter.lexer import Lexer
+from interpreter.parser import Parser
+from interpreter.program.cache import ProgramCache, CACHE_DIRECTORY
+from interpreter.reader import BytesReader
+
+SOURCE = b"fn f(a) { return a * 2; }\nlet b = f(3) + 1;\nprint(b);"
+
+
+def parse(source: bytes):
+    error_handler = ErrorHandler()
+    with BytesReader(source) as reader:
+        return Parser(Lexer(reader, error_handler), error_handler).parse()
+
+
+def write_source(tmp_path, content: bytes):
+    path = tmp_path / "source"
+    path.write_bytes(content)
+    return path
+
+
+def test_store_load(tmp_path):
+    path = write_source(tmp_path, SOURCE)
+    program = parse(SOURCE)
+    ProgramCache(path).store(program)
+    assert ProgramCache(path).path.parent == tmp_path / CACHE_DIRECTORY
+    assert ProgramCache(path).load() == program
+
+
+def test_load_not_cached(tmp_path):
+    path = write_source(tmp_path, SOURCE)
+    assert ProgramCache(path).load() is None
+
+
+def test_load_source_changed(tmp_path):
+    path = write_source(tmp_path, SOURCE)
+    ProgramCache(path).store(parse(SOURCE))
+    path.write_bytes(SOURCE + b" ")
+    assert ProgramCache(path).load() is None
+
+
+def test_load_other_version(tmp_path, mocker):
+    path = write_source(tmp_path, SOURCE)
+    ProgramCache(path).store(parse(SOURCE))
+    mocker.patch("interpreter.program.cache.CACHE_TAG", "interpreter-0")
+    assert ProgramCache(path).load() is None
+
+
+def test_load_corrupted(tmp_path):
+    path = write_source(tmp_path, SOURCE)
+    cache = ProgramCache(path)
+    cache.store(parse(SOURCE))
+    cache.path.write_bytes(cache.path.read_bytes()[:-10])
+    assert ProgramCache(path).load() is None
+
+
+def test_store_unwritable_directory(tmp_path):
+    path = write_source(tmp_path, SOURCE)
+    (tmp_path / CACHE_DIRECTORY).write_bytes(b"")
+    ProgramCache(path).store(parse(SOURCE))
+    assert ProgramCache(path).load() is None
+
+
+def test_store_load_lazy(tmp_path):
+    path = write_source(tmp_path, SOURCE)
+    error_handler = ErrorHandler()
+    with BytesReader(SOURCE) as reader:
+        program = Parser(Lexer(reader, error_handler), error_handler, True).parse()
+    ProgramCache(path, lazy=True).store(program)
+    assert ProgramCache(path, lazy=True).load() == program
+    assert ProgramCache(path).load() is None
+
+
+def test_load_only_makes_nodes(tmp_path):
+    path = write_source(tmp_path, SOURCE)
+    cache = ProgramCache(path)
+    cache.store(parse(SOURCE))
+    data = cache.path.read_bytes()
+    assert json.loads(data[len(cache.digest) :])["Program"]
+    cache.path.write_bytes(cache.digest + b'{"Program": [[{"system": ["ls"]}]]}')
+    assert ProgramCache(path).load() is None
+    cache.path.write_bytes(cache.digest + b'{"Program": [[{"Token": []}]]}')
+    assert ProgramCache(path).load() is None
@@ -1,3 +1,4 @@
+import re
 import io
 from collections.abc import Iterable
 
@@ -8,7 +9,7 @@ from interpreter.reader.reader import Reader
 def test__is_new_line_lf_no_symbol(mocker):
     mocker.patch("builtins.open", return_value=io.BytesIO(b"\n"))
     with Reader("path") as reader:
-        reader._find_new_line_symbol(b"\n")
+        assert reader.peek_char() == "\n"
         assert reader.newline_symbol == b"\n"
 
 
@@ -22,7 +23,7 @@ def test__is_new_line_lf(mocker):
 def test__is_new_line_cr_no_symbol(mocker):
     mocker.patch("builtins.open", return_value=io.BytesIO(b"\r"))
     with Reader("path") as reader:
-        reader._find_new_line_symbol(b"\r")
+        assert reader.peek_char() == "\n"
         assert reader.newline_symbol == b"\r"
 
 
@@ -36,9 +37,9 @@ def test__is_new_line_cr(mocker):
 def test__is_new_line_crlf_no_symbol(mocker):
     mocker.patch("builtins.open", return_value=io.BytesIO(b"\r\n"))
     with Reader("path") as reader:
-        reader._file_handler.read(1)
-        reader._find_new_line_symbol(b"\r")
+        assert reader.peek_char() == "\n"
         assert reader.newline_symbol == b"\r\n"
+        assert reader.position == Position(0, 1, 1)
 
 
 def test__is_new_line_crlf(mocker):
@@ -160,3 +161,170 @@ def test_get_line_last_line_no_trailing_newline(mocker):
     with Reader("path") as reader:
         list(reader)
         assert reader.get_line_n_offset(Position(3, 2, 1))[0] == "b"
+
+
+class PipeMock(io.BytesIO):
+    def seekable(self):
+        return False
+
+    def seek(self, *args):
+        raise io.UnsupportedOperation("seek")
+
+
+def test_peek_char(mocker):
+    mocker.patch("builtins.open", return_value=io.BytesIO(b"ab"))
+    with Reader("path") as reader:
+        assert reader.peek_char() == "a"
+        assert reader.get_char() == "a"
+        assert reader.peek_char() == "b"
+        assert reader.peek_char() == "b"
+        assert reader.get_char() == "b"
+        assert reader.peek_char() is None
+
+
+def test_get_char_crlf_split_between_chunks(mocker):
+    mocker.patch("interpreter.reader.reader.CHUNK_SIZE", 1)
+    mocker.patch("builtins.open", return_value=io.BytesIO(b"x\r\nl\r\n"))
+    with Reader("path") as reader:
+        assert list(reader) == ["x", "\n", "l", "\n"]
+        assert reader.newline_symbol == b"\r\n"
+        assert reader.position == Position(6, 3, 1)
+
+
+def test_get_char_bare_cr_at_chunk_end(mocker):
+    mocker.patch("interpreter.reader.reader.CHUNK_SIZE", 5)
+    mocker.patch("builtins.open", return_value=io.BytesIO(b"a\r\nb\rc"))
+    with Reader("path") as reader:
+        assert list(reader) == ["a", "\n", "b", "\r", "c"]
+
+
+def test_read_digits(mocker):
+    mocker.patch("interpreter.reader.reader.CHUNK_SIZE", 2)
+    mocker.patch("builtins.open", return_value=io.BytesIO(b"123\xd9\xa345a"))
+    with Reader("path") as reader:
+        assert reader.read_digits() == "123\u066345"
+        assert reader.position == Position(7, 1, 7)
+        assert reader.get_char() == "a"
+
+
+def test_read_until(mocker):
+    mocker.patch("interpreter.reader.reader.CHUNK_SIZE", 2)
+    mocker.patch("builtins.open", return_value=io.BytesIO(b"a\r\n\xc5\xbc\xff'b"))
+    with Reader("path") as reader:
+        assert reader.read_until(re.compile(b"'")) == "a\n\u017c\ufffd"
+        assert reader.position == Position(6, 2, 3)
+        assert reader.get_char() == "'"
+        assert reader.read_until(re.compile(b"'")) == "b"
+
+
+def test_skip_line(mocker):
+    mocker.patch("interpreter.reader.reader.CHUNK_SIZE", 2)
+    mocker.patch("builtins.open", return_value=io.BytesIO(b"// \xc5\xbc\r\rx\r\ny"))
+    with Reader("path") as reader:
+        reader.skip_line()
+        assert reader.position == Position(5, 1, 5)
+        assert reader.newline_symbol == b"\r"
+        assert list(reader) == ["\n", "\n", "x", "\n", "\n", "y"]
+
+
+def test_skip_to(mocker):
+    mocker.patch("interpreter.reader.reader.CHUNK_SIZE", 3)
+    mocker.patch("builtins.open", return_value=io.BytesIO(b"a\r\n\xc5\xbc\r\nbc*/d"))
+    with Reader("path") as reader:
+        assert reader.skip_to(b"*/")
+        assert reader.position == Position(9, 3, 3)
+        assert reader.char_position == 6
+        assert list(reader) == ["*", "/", "d"]
+        assert not reader.skip_to(b"*/")
+
+
+def test_read_char_across_chunks(mocker):
+    mocker.patch("interpreter.reader.reader.CHUNK_SIZE", 2)
+    mocker.patch("builtins.open", return_value=io.BytesIO(b"let x"))
+    with Reader("path") as reader:
+        assert reader.get_char() == "l"
+        assert [reader.read_char() for _ in range(5)] == ["e", "t", " ", "x", None]
+        assert reader.get_char() == "e"
+        assert reader.position == Position(2, 1, 3)
+
+
+def test_chunked_reading_matches_single_chunk(mocker):
+    source = b"fn a() {\r\n  return 'b\\\\';\r\n}\r\n/* c\r\n*/\rd\n"
+    mocker.patch("builtins.open", return_value=io.BytesIO(source))
+    with Reader("path") as reader:
+        expected = [(char, reader.position) for char in reader]
+    for chunk_size in range(1, 6):
+        mocker.patch("interpreter.reader.reader.CHUNK_SIZE", chunk_size)
+        mocker.patch("builtins.open", return_value=io.BytesIO(source))
+        with Reader("path") as reader:
+            assert [(char, reader.position) for char in reader] == expected
+
+
+def test_non_seekable_stream(mocker):
+    mocker.patch("interpreter.reader.reader.CHUNK_SIZE", 4)
+    mocker.patch("builtins.open", return_value=PipeMock(b"ab\ncd\nef"))
+    with Reader("path") as reader:
+        assert list(reader) == ["a", "b", "\n", "c", "d", "\n", "e", "f"]
+        assert reader.get_line_n_offset(Position(8, 3, 3)) == ("ef", 2)
+        assert reader.get_line_n_offset(Position(4, 2, 2)) == ("cd", 1)
+        assert reader.get_line_n_offset(Position(1, 1, 2)) == ("", 1)
+
+
+def test_line_longer_than_chunks(mocker):
+    line = b"let a = '" + b"x" * 100 + b"';"
+    mocker.patch("interpreter.reader.reader.CHUNK_SIZE", 4)
+    mocker.patch("builtins.open", return_value=PipeMock(line + b"\nb"))
+    with Reader("path") as reader:
+        assert "".join(reader.get_char() for _ in line) == line.decode()
+        assert reader.get_line_n_offset(Position(9, 1, 10)) == (line.decode(), 9)
+        assert list(reader) == ["\n", "b"]
+        assert reader.get_line_n_offset(reader.position) == ("b", 1)
+        # the long line is dropped once the next one has been read
+        assert reader._buffer_start == len(line) + 1
+
+
+def test_get_char_utf8(mocker):
+    mocker.patch("builtins.open", return_value=io.BytesIO("ża€😀\n".encode()))
+    with Reader("path") as reader:
+        assert reader.get_char() == "ż"
+        assert reader.position == Position(2, 1, 2)
+        assert reader.read_char() == "a"
+        assert reader.read_char() == "€"
+        assert reader.peek_char() == "a"
+        assert list(reader) == ["a", "€", "😀", "\n"]
+        assert reader.position == Position(11, 2, 1)
+        assert reader.char_position == 5
+
+
+def test_get_char_utf8_split_between_chunks(mocker):
+    source = "zażółć 😀\r\ngęślą".encode()
+    mocker.patch("interpreter.reader.reader.CHUNK_SIZE", 1)
+    mocker.patch("builtins.open", return_value=io.BytesIO(source))
+    with Reader("path") as reader:
+        assert "".join(reader) == "zażółć 😀\ngęślą"
+        assert reader.position == Position(len(source), 2, 6)
+
+
+def test_get_char_invalid_utf8(mocker):
+    mocker.patch("builtins.open", return_value=io.BytesIO(b"a\xff\xe2\x82b"))
+    with Reader("path") as reader:
+        assert list(reader) == ["a", "�", "�", "�", "b"]
+
+
+def test_get_line_offset_in_characters(mocker):
+    mocker.patch("builtins.open", return_value=io.BytesIO("x\n'żółw' y".encode()))
+    with Reader("path") as reader:
+        list(reader)
+        assert reader.position == Position(13, 2, 9)
+        assert reader.get_line_n_offset(reader.position) == ("'żółw' y", 8)
+        assert reader.locate(13) == (2, 9)
+
+
+def test_read_remaining(mocker):
+    mocker.patch("builtins.open", return_value=io.BytesIO(b"a\r\nb\xc4\x85c"))
+    with Reader("path") as reader:
+        assert reader.get_char() == "a"
+        assert reader.read_remaining() == b"\r\nb\xc4\x85c"
+        assert reader.position == Position(7, 2, 4)
+        assert reader.char_position == 5
+        assert reader.get_char() is None
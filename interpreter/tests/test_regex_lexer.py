@@ -0,0 +1,117 @@
+import io
+from typing import List, Optional, Tuple
+
+import pytest
+
+from interpreter.error_handler import ErrorHandler
+from interpreter.error_handler.error import ErrorType
+from interpreter.lexer import Lexer, RegexLexer
+from interpreter.lexer.symbol_table import SymbolTable
+from interpreter.position import Position
+from interpreter.reader import Reader
+from interpreter.reader.memory_reader import BytesReader
+from interpreter.token import Token, TokenType
+
+
+def tokenize(lexer_cls, source: bytes) -> Tuple[List[Optional[Token]], list]:
+    error_handler = ErrorHandler()
+    lexer = lexer_cls(BytesReader(source), error_handler)
+    tokens = [lexer.next_token()]
+    while len(tokens) < 100 and (
+        tokens[-1] is None or tokens[-1].token_type != TokenType.EOF
+    ):
+        tokens.append(lexer.next_token())
+    return tokens, error_handler.errors
+
+
+@pytest.mark.parametrize(
+    "source",
+    [
+        b"fn factorial(n) { if n < 0 { return null; } return n * factorial(n - 1); }",
+        b"let mut x_1 = 12.5 / 3;\nx_1 = x_1 % 2 >= 1 != false is not true;",
+        b"let s = \"a\\tb\\\"c\\\\d\\q\";\r\nprint('it\\'s');\r\n",
+        b"// one line\rlet a = 1; /* multi\rline */ let b = a;\r",
+        b"// lone \r is kept\nx;",
+        b"let zero = 0; let frac = 0.05; let trail = 1.a;",
+        b"let \xc5\xbc\xc3\xb3\xc5\x82w = '\xc4\x85\xc4\x99'; \xe2\x80\xa8 x",
+        b"let a = 0123;",
+        b"let a = " + b"9" * 45 + b";",
+        b"let a = 1." + b"9" * 45 + b"a; let b = 1668.614324732;",
+        b"let s = 'unterminated",
+        b"let s = 'escaped end\\",
+        b"let a = 1 @ 2;",
+        b"let a = \xff;",
+        b"",
+    ],
+)
+def test_same_tokens_as_lexer(source):
+    assert tokenize(RegexLexer, source) == tokenize(Lexer, source)
+
+
+def test_num_position_after_following_char():
+    tokens, _ = tokenize(RegexLexer, b"12\r\n+3")
+    assert tokens[0] == Token(TokenType.NUM, Position(4, 2, 1), 12.0)
+    assert tokens[1].position == Position(5, 2, 2)
+    assert tokens[2] == Token(TokenType.NUM, Position(6, 2, 3), 3.0)
+
+
+def test_leading_zero():
+    tokens, errors = tokenize(RegexLexer, b"0123;")
+    assert tokens[0] is None
+    assert tokens[1] == Token(TokenType.NUM, Position(5, 1, 6), 123.0)
+    assert errors[0].type == ErrorType.LEADING_ZERO
+    assert errors[0].position == Position(2, 1, 3)
+
+
+def test_overflow():
+    tokens, errors = tokenize(RegexLexer, b"9" * 99 + b"a")
+    assert tokens[0] == Token(TokenType.IDENTIFIER, Position(100, 1, 101), "a")
+    assert errors[0].type == ErrorType.NUM_OVERFLOW_ERROR
+    assert errors[0].position == Position(40, 1, 41)
+
+
+def test_unterminated_comment():
+    tokens, errors = tokenize(RegexLexer, b"a /* b")
+    assert tokens[1:] == [None, Token(TokenType.EOF, Position(6, 1, 7))]
+    assert errors[0].type == ErrorType.UNEXPECTED_END_OF_TEXT
+    assert errors[0].position == Position(3, 1, 4)
+
+
+def test_unknown_char_is_not_consumed():
+    lexer = RegexLexer(BytesReader(b" @"), ErrorHandler())
+    assert lexer.next_token() is None
+    assert lexer.next_token() is None
+
+
+def test_reader(mocker):
+    mocker.patch("builtins.open", return_value=io.BytesIO(b"let\na"))
+    with Reader("path") as reader:
+        lexer = RegexLexer(reader, ErrorHandler())
+        assert lexer.next_token() == Token(TokenType.LET, Position(1, 1, 2))
+        assert lexer.next_token() == Token(TokenType.IDENTIFIER, Position(5, 2, 2), "a")
+        assert reader.get_line_n_offset(Position(5, 2, 2)) == ("a", 1)
+
+
+def test_identifiers_are_interned():
+    symbol_table = SymbolTable()
+    lexer = RegexLexer(BytesReader(b"abc abc"), ErrorHandler(), symbol_table)
+    assert lexer.next_token().value is lexer.next_token().value
+    assert len(symbol_table) == 1
+
+
+@pytest.mark.parametrize(
+    "source",
+    [
+        b"a // b\r\n/* c\r\nd */ / e //",
+        b"x /* \xc5\xbc */ y // \xff\n z",
+        b"a /* b",
+    ],
+)
+def test_skip_comments_same_tokens_as_lexer(source):
+    def lexer_cls(reader, error_handler):
+        return RegexLexer(reader, error_handler, skip_comments=True)
+
+    def expected_cls(reader, error_handler):
+        return Lexer(reader, error_handler, skip_comments=True)
+
+    assert tokenize(lexer_cls, source) == tokenize(expected_cls, source)
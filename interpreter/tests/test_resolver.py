@@ -0,0 +1,150 @@
+import pytest
+
+from interpreter.error_handler import ErrorHandler
+from interpreter.error_handler.error import *
+from interpreter.interpreter.interpreter import Interpreter
+from interpreter.lexer import Lexer
+from interpreter.parser import Parser
+from interpreter.program import Block
+from interpreter.reader.memory_reader import BytesReader
+from interpreter.resolver import Resolver, LOCAL, GLOBAL, UNRESOLVED
+
+
+def parse(source: bytes, lazy: bool = False):
+    error_handler = ErrorHandler()
+    lexer = Lexer(BytesReader(source), error_handler)
+    program = Parser(lexer, error_handler, lazy_functions=lazy).parse()
+    assert error_handler.errors == []
+    return program
+
+
+def run(source: bytes, lazy: bool = False) -> Interpreter:
+    interpreter = Interpreter(ErrorHandler())
+    parse(source, lazy).accept(interpreter)
+    return interpreter
+
+
+def test_resolve_slots():
+    program = parse(b"let a = 1; fn f(x) { let y = x + a; return f(y); }")
+    resolver = Resolver(ErrorHandler())
+    program.accept(resolver)
+
+    let_a, fn_f = program.statements
+    assert let_a.slot == resolver.global_slots["a"]
+    assert fn_f.slot == resolver.global_slots["f"]
+    # parameters first, then the function itself and its variables
+    assert fn_f.locals == {"x": 0, "f": 1, "y": 2}
+    assert fn_f.params[0].slot == 0
+
+    let_y, return_f = fn_f.body.statements
+    assert let_y.slot == 2
+    x, a = let_y.expression.left, let_y.expression.right
+    assert (x.depth, x.slot) == (LOCAL, 0)
+    assert (a.depth, a.slot) == (GLOBAL, resolver.global_slots["a"])
+    call = return_f.expression
+    assert (call.depth, call.slot) == (LOCAL, 1)
+
+
+def test_resolve_blocks_share_the_frame():
+    program = parse(
+        b"fn f(n) { if n { let a = 1; } else { b = 2; }"
+        b" match n: case 1: p { let c = p; } default: {} }"
+    )
+    Resolver(ErrorHandler()).resolve(program.statements[0])
+    assert program.statements[0].locals == {
+        "n": 0,
+        "f": 1,
+        "a": 2,
+        "b": 3,
+        "p": 4,
+        "c": 5,
+    }
+
+
+def test_lazy_body_resolved_on_first_call():
+    interpreter = run(b"fn f(n) { let m = n * 2; return m; } let a = f(2);", True)
+    fn = interpreter._scope.look_up("f")
+    assert isinstance(fn.body, Block)
+    assert fn.definition.locals == {"n": 0, "f": 1, "m": 2}
+    assert interpreter._scope.look_up("a").value.value == 4
+
+
+@pytest.mark.parametrize(
+    "source, error_type",
+    [
+        # the statement fails before it evaluates anything
+        (b"a = 1;", NotDefined),
+        (b"f(1);", NotDefined),
+        (b"let a = 1; let a = 2;", AlreadyDefined),
+        (b"fn f() {} let f = 1;", AlreadyDefined),
+        (b"let print = 1;", AlreadyDefined),
+    ],
+)
+def test_static_errors(source, error_type):
+    *statements, failing = parse(source).statements
+    resolver = Resolver(ErrorHandler())
+    for statement in statements:
+        resolver.resolve(statement)
+    with pytest.raises(error_type):
+        resolver.resolve(failing)
+
+
+@pytest.mark.parametrize(
+    "source",
+    [
+        b"let mut i = 0;"
+        b"while i < 2 { if i == 1 { let b = a; } if i == 0 { let a = 1; } i = i + 1; }",
+        b"fn f() { return a; } let a = 1; let b = f();",
+        b"if true { let a = 1; } else { let b = 2; } let a = 3;",
+        b"fn f() { let a = 1; } fn g() { let a = 2; } f(); g();",
+        # only fail when they run
+        b"let x = 1; if false { let x = 2; }",
+        b"if false { print(undefinedvar); }",
+        b"let a = 1; if false { a = b; }",
+        b"if false { f(); }",
+        b"let a = print(to_str(1)) + b;",
+        b"fn f(a) { let a = 1; }",
+        b"let a = 1; fn f() { let a = 2; }",
+    ],
+)
+def test_no_static_errors(source):
+    program = parse(source)
+    Resolver(ErrorHandler()).visit_program(program)
+
+
+@pytest.mark.parametrize(
+    "source",
+    [b"let x = 1; if false { let x = 2; }", b"if false { print(undefinedvar); }"],
+)
+def test_branch_not_taken_runs(source, capsys):
+    run(b"print('run');" + source)
+    assert capsys.readouterr().out == "run"
+
+
+def test_unresolved_name():
+    program = parse(b"if false { print(b); }")
+    Resolver(ErrorHandler()).resolve(program.statements[0])
+    b = program.statements[0].if_block.statements[0].arguments[0]
+    assert (b.depth, b.slot) == (UNRESOLVED, None)
+
+
+def test_local_reads_global_until_set():
+    interpreter = run(
+        b"let mut a = 1; fn f() { let b = a; a = a + 1; return a + b; } let c = f();"
+    )
+    assert interpreter._scope.look_up("a").value.value == 1
+    assert interpreter._scope.look_up("c").value.value == 3
+
+
+def test_runtime_errors_still_raised():
+    with pytest.raises(NotDefined):
+        run(b"fn f() { return b; } f();")
+    with pytest.raises(NotDefined):
+        run(b"if true { print(b); }")
+    with pytest.raises(AlreadyDefined):
+        run(b"let x = 1; if true { let x = 2; }")
+    with pytest.raises(AlreadyDefined):
+        run(
+            b"fn f() { let a = 1; } let mut b = 0; while b < 2 { f(); b = b + 1; }"
+            b" let a = 1; f();"
+        )
@@ -0,0 +1,49 @@
+from interpreter.interpreter import SlotScope, Var, DataType, Value
+
+
+def test_grow():
+    slots = {"a": 0}
+    ss = SlotScope(slots)
+    assert ss.glob == [None]
+    slots["b"] = 1
+    ss.grow()
+    assert ss.glob == [None, None]
+
+
+def test_update_empty():
+    ss = SlotScope({"a": 0})
+    var = Var("a", Value(DataType.NULL, None), False)
+    ss.update(var)
+    assert ss.glob[0] == var
+    assert ss.frame is ss.glob
+
+
+def test_look_up():
+    ss = SlotScope({"a": 0, "b": 1})
+    glob = Var("a", Value(DataType.NULL, None), False)
+    ss.update(glob)
+    var = Var("b", Value(DataType.NULL, None), False)
+    ss.fn_call([None, var], {"a": 0, "b": 1})
+    # a local variable not set yet is looked up among the globals
+    assert ss.look_up("a") == glob
+    assert ss.look_up("b") == var
+    assert ss.look_up("c") is None
+
+
+def test_fn_call():
+    ss = SlotScope({})
+    frame = [Var("a", Value(DataType.NULL, None), False)]
+    ss.fn_call(frame, {"a": 0})
+    assert ss.frame is frame
+    assert len(ss.stack) == 1
+
+
+def test_fn_return():
+    ss = SlotScope({})
+    ss.fn_call([], {})
+    ss.fn_call([], {})
+    assert ss.fn_return()
+    assert ss.frame is ss.stack[0][0]
+    assert ss.fn_return()
+    assert ss.frame is ss.glob
+    assert not ss.fn_return()
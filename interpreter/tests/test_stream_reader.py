@@ -0,0 +1,47 @@
+import io
+
+from interpreter.comments_filter import CommentsFilter
+from interpreter.error_handler import ErrorHandler
+from interpreter.lexer import Lexer
+from interpreter.parser import Parser
+from interpreter.position import Position
+from interpreter.program.statement import VarDefinition
+from interpreter.reader.stream_reader import StreamReader
+
+
+class PipeMock(io.RawIOBase):
+    def __init__(self, chunks):
+        self.chunks = list(chunks)
+        self.reads = 0
+
+    def readable(self):
+        return True
+
+    def read1(self, size=-1):
+        self.reads += 1
+        return self.chunks.pop(0) if self.chunks else b""
+
+
+def test_stream_reader():
+    stream = PipeMock([b"ab\r", b"\ncd"])
+    with StreamReader(stream) as reader:
+        assert list(reader) == ["a", "b", "\n", "c", "d"]
+        assert reader.position == Position(6, 2, 3)
+        assert reader.get_line_n_offset(Position(6, 2, 3)) == ("cd", 2)
+    assert not stream.closed
+
+
+def test_stream_reader_reads_incrementally():
+    stream = PipeMock([b"let a = 1;", b" let b = 2;", b" let c = 3;"])
+    error_handler = ErrorHandler()
+    reader = StreamReader(stream)
+    parser = Parser(CommentsFilter(Lexer(reader, error_handler)), error_handler)
+    statements = parser.iter_statements()
+
+    statement = next(statements)
+    assert isinstance(statement, VarDefinition)
+    assert statement.name == "a"
+    assert stream.reads == 2
+
+    assert [s.name for s in statements] == ["b", "c"]
+    assert len(error_handler.errors) == 0
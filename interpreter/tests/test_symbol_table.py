@@ -0,0 +1,31 @@
+from interpreter.lexer.symbol_table import SymbolTable
+
+
+def test_intern_shares_one_object():
+    symbol_table = SymbolTable()
+    first = symbol_table.intern("".join(["na", "me"]))
+    assert symbol_table.intern("".join(["na", "me"])) is first
+    assert len(symbol_table) == 1
+
+
+def test_names_in_interning_order():
+    symbol_table = SymbolTable()
+    for name in ["b", "a", "b"]:
+        symbol_table.intern(name)
+    assert list(symbol_table) == ["b", "a"]
+    assert "b" in symbol_table
+    assert "c" not in symbol_table
+
+
+def test_intern_string_only_short_ones():
+    symbol_table = SymbolTable(max_string_length=3)
+    short = symbol_table.intern_string("".join(["a", "b"]))
+    assert symbol_table.intern_string("".join(["a", "b"])) is short
+    symbol_table.intern_string("abcd")
+    assert "abcd" not in symbol_table
+
+
+def test_strings_are_not_interned_by_default():
+    symbol_table = SymbolTable()
+    symbol_table.intern_string("a")
+    assert len(symbol_table) == 0
@@ -0,0 +1,81 @@
+from interpreter.comments_filter import CommentsFilter
+from interpreter.error_handler import ErrorHandler
+from interpreter.error_handler.error import ErrorType
+from interpreter.lexer import Lexer
+from interpreter.lexer.token_buffer import tokenize_all, TokenBufferLexer
+from interpreter.parser import Parser
+from interpreter.position import Position
+from interpreter.reader.memory_reader import BytesReader
+from interpreter.token import Token, TokenType
+
+SOURCE = b"fn f(n) { return n * f(n - 1); } // done\r\nlet x = f(3) + 'x';"
+
+
+def test_tokenize_all_arrays():
+    buffer = tokenize_all(BytesReader(b"let a = a;\nb"))
+    assert len(buffer) == 7
+    assert buffer.types.typecode == "B"
+    assert list(buffer.rows) == [1, 1, 1, 1, 1, 2, 2]
+    assert list(buffer.columns) == [2, 6, 8, 10, 11, 2, 2]
+    assert list(buffer.offsets) == [1, 5, 7, 9, 10, 12, 12]
+    assert buffer[1] == Token(TokenType.IDENTIFIER, Position(5, 1, 6), "a")
+    assert buffer.token_type(6) == TokenType.EOF
+
+
+def test_tokenize_all_stores_values_once():
+    buffer = tokenize_all(BytesReader(b"a a 1 1 'a'"))
+    assert buffer.values == [None, "a", 1.0]
+    assert list(buffer.value_ids) == [1, 1, 2, 2, 1, 0]
+
+
+def test_adapter_same_tokens_as_lexer():
+    lexer = Lexer(BytesReader(SOURCE), ErrorHandler())
+    adapter = TokenBufferLexer(tokenize_all(BytesReader(SOURCE)), ErrorHandler())
+    while (token := lexer.next_token()).token_type != TokenType.EOF:
+        assert adapter.next_token() == token
+    assert adapter.next_token() == token
+    assert adapter.next_token() == token
+
+
+def test_adapter_reports_errors_when_reached():
+    error_handler = ErrorHandler()
+    adapter = TokenBufferLexer(tokenize_all(BytesReader(b"a 01 'b")), error_handler)
+    assert adapter.next_token().token_type == TokenType.IDENTIFIER
+    assert error_handler.errors == []
+    assert adapter.next_token() is None
+    assert [error.type for error in error_handler.errors] == [ErrorType.LEADING_ZERO]
+    assert adapter.next_token().token_type == TokenType.NUM
+    assert adapter.next_token() is None
+    assert error_handler[1].type == ErrorType.UNEXPECTED_END_OF_TEXT
+
+
+def test_adapter_stuck_on_unknown_char():
+    buffer = tokenize_all(BytesReader(b"a @ b"))
+    assert len(buffer) == 2
+    adapter = TokenBufferLexer(buffer, ErrorHandler())
+    assert adapter.next_token().token_type == TokenType.IDENTIFIER
+    assert adapter.next_token() is None
+    assert adapter.next_token() is None
+
+
+def test_parser_on_adapter():
+    program = Parser(
+        CommentsFilter(Lexer(BytesReader(SOURCE), ErrorHandler())), ErrorHandler()
+    ).parse()
+    adapter = TokenBufferLexer(tokenize_all(BytesReader(SOURCE)), ErrorHandler())
+    assert Parser(CommentsFilter(adapter), ErrorHandler()).parse() == program
+
+
+def test_adapter_skip_block_like_lexer():
+    source = b"fn f() { if a { b(); } } let c = 1; fn g() { {"
+    for start in (5, 24):
+        lexer = Lexer(BytesReader(source), ErrorHandler())
+        adapter = TokenBufferLexer(tokenize_all(BytesReader(source)), ErrorHandler())
+        for _ in range(start):
+            token = lexer.next_token()
+            assert adapter.next_token() == token
+        tokens, closed, after = lexer.skip_block(token)
+        block, adapter_closed, adapter_after = adapter.skip_block(token)
+        assert [block[i] for i in range(len(block))] == tokens
+        assert (adapter_closed, adapter_after) == (closed, after)
+        assert adapter.next_token() == lexer.next_token()
@@ -0,0 +1,122 @@
+import pytest
+
+from interpreter.compiler import Compiler, VirtualMachine
+from interpreter.error_handler import ErrorHandler
+from interpreter.error_handler.error import *
+from interpreter.interpreter.interpreter import Interpreter
+from interpreter.lexer import Lexer
+from interpreter.parser import Parser
+from interpreter.reader.memory_reader import BytesReader
+
+
+def test_same_as_interpreter(program, run_backend):
+    expected = run_backend(Interpreter, program)
+    assert expected[2] is None
+    assert run_backend(VirtualMachine, program) == expected
+    assert run_backend(VirtualMachine, program, lazy=True) == expected
+
+
+@pytest.mark.parametrize(
+    "source, error_type",
+    [
+        (b"let a = 1; let b = a + 'a';", OperationBadTypes),
+        (b"let a = 1 / 0;", ZeroDivision),
+        (b"let a = 1 % 0;", ZeroDivision),
+        (b"fn f() { return b; } f();", NotDefined),
+        (b"let a = 1; a();", NotCallable),
+        (b"fn f(a, b) {} f(1);", MissingParameter),
+        (b"fn f(a) {} f(1, 2);", UnexpectedArgument),
+        (b"let a = 1; a = 2;", AssignMut),
+        (b"let a = 1 or true;", UnexpectedType),
+        (b"let a = true and 1;", UnexpectedType),
+        (b"let a = -true;", OperationBadTypes),
+        (b"let a = 1; fn f() { let a = 2; } f();", AlreadyDefined),
+        (b"print(1);", UnexpectedType),
+        (b"match 'a': case isEven: {} default: {}", UnexpectedType),
+        # a break leaks out of f, so that it results in the loop condition
+        (
+            b"fn f() { while true { break; } return 1; } let mut a = 0;"
+            b"while a < 3 { a = a + f(); }",
+            OperationBadTypes,
+        ),
+        # builtin calls count towards the recursion depth for good
+        (
+            b"let mut i = 0; while i < 1000 { print(''); i = i + 1; }",
+            AlreadyDefined,
+        ),
+    ],
+)
+def test_same_errors_as_interpreter(source, error_type, run_backend):
+    _, _, expected = run_backend(Interpreter, source)
+    _, _, error = run_backend(VirtualMachine, source)
+    assert type(expected) is error_type
+    assert type(error) is error_type
+    assert (error.position, error.msg) == (expected.position, expected.msg)
+
+
+def test_invalid_function_body():
+    error_handler = ErrorHandler()
+    program = Parser(
+        Lexer(BytesReader(b"fn f() { let a = ; } f();"), error_handler),
+        error_handler,
+        lazy_functions=True,
+    ).parse()
+    with pytest.raises(InvalidFunctionBody):
+        VirtualMachine(error_handler).run(program)
+
+
+@pytest.mark.parametrize(
+    "source",
+    [b"let a = --1;", b"fn f() { return; } let a = f();"],
+)
+def test_missing_expression(source, run_backend):
+    for backend in (Interpreter, VirtualMachine):
+        with pytest.raises(AttributeError):
+            run_backend(backend, source)
+
+
+def test_deep_recursion(run_backend):
+    source = b"fn f(n) { if n == 0 { return 0; } return 1 + f(n - 1); } let a = f(800);"
+    _, variables, error = run_backend(VirtualMachine, source)
+    assert error is None
+    assert variables["a"].value == 800
+
+    _, _, error = run_backend(VirtualMachine, b"fn f() { return f(); } f();")
+    assert type(error) is AlreadyDefined
+
+
+def test_compile():
+    error_handler = ErrorHandler()
+    source = b"let mut a = 1;\nwhile a < 10 { a = a * 2; }"
+    program = Parser(Lexer(BytesReader(source), error_handler), error_handler).parse()
+    code = Compiler(error_handler).compile_program(program)
+    assert code.disassemble().split("\n") == [
+        "   0 CHECK_UNDEFINED      1 (a)",
+        "   2 LOAD_CONST           0 (1.0)",
+        "   4 DEFINE_NAME          1 (a)",
+        "   6 LOAD_NAME            0 (a)",
+        "   8 LOAD_CONST           1 (10.0)",
+        "  10 COMPARE_OP           0",
+        "  12 CLEAR_FLAGS          2",
+        "  14 POP_JUMP_IF_FALSE    38",
+        "  16 CLEAR_FLAGS          4",
+        "  18 JUMP_IF_UNWINDING    30",
+        "  20 CHECK_ASSIGNABLE     0 (a)",
+        "  22 LOAD_NAME            0 (a)",
+        "  24 LOAD_CONST           2 (2.0)",
+        "  26 BINARY_OP            2",
+        "  28 STORE_NAME           0 (a)",
+        "  30 LOAD_NAME            0 (a)",
+        "  32 LOAD_CONST           1 (10.0)",
+        "  34 COMPARE_OP           0",
+        "  36 POP_JUMP_IF_TRUE     18",
+        "  38 END                  0",
+    ]
+    assert code.position(0) == program.statements[0].position
+    assert code.position(4) == program.statements[0].position
+    assert code.position(10) == program.statements[1].condition.position
+
+    vm = VirtualMachine(error_handler)
+    # the last value is the condition which ended the loop
+    assert vm.run_code(code).value is False
+    assert vm._globals["a"].value.value == 16
@@ -67,7 +67,7 @@ class TokenType(Enum):
     EOF = (auto(),)
 
 
-@dataclass
+@dataclass(slots=True)
 class Token:
     token_type: TokenType
     position: Position
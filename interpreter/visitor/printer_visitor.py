@@ -14,6 +14,7 @@ from interpreter.program import (
     ConditionalStatement,
     Assignment,
     Block,
+    LazyBlock,
     Parameter,
     NegatedFactor,
     MultiplicativeExpression,
@@ -25,6 +26,8 @@ from interpreter.program import (
     ReturnStatement,
     VarDefinition,
 )
+from interpreter.error_handler import ErrorHandler
+from interpreter.parser.parser import parse_lazy_block
 from interpreter.program.program import Program
 from interpreter.program.statement import BreakStatement, ContinueStatement
 from interpreter.visitor.visitor import Visitor
@@ -119,6 +122,11 @@ class PrinterVisitor(Visitor):
         for stmt in block.statements:
             stmt.accept(self)
 
+    def visit_lazy_block(self, block: LazyBlock):
+        parsed = parse_lazy_block(block, ErrorHandler())
+        if parsed is not None:
+            parsed.accept(self)
+
     @_make_indent
     def visit_return_statement(self, statement: ReturnStatement):
         if statement.expression is not None:
@@ -2,6 +2,8 @@ from abc import ABC, abstractmethod
 
 
 class Visitable(ABC):
+    __slots__ = ()
+
     @abstractmethod
     def accept(self, visitor: "Visitor"):
         ...
@@ -13,6 +13,7 @@ from interpreter.program import (
     ConditionalStatement,
     Assignment,
     Block,
+    LazyBlock,
     VarDefinition,
     Parameter,
     Literal,
@@ -73,6 +74,10 @@ class Visitor(ABC):
     def visit_block(self, statements: Block):
         ...
 
+    @abstractmethod
+    def visit_lazy_block(self, block: LazyBlock):
+        ...
+
     @abstractmethod
     def visit_assignment(self, statement: Assignment):
         ...